@@ -2,11 +2,14 @@ import json
 import os
 import time
 
-import httpx
 from dotenv import load_dotenv
-from oci_openai import OciUserPrincipalAuth
 from openai import OpenAI
 
+from oci_ai.client import build_openai_client, close_client
+from oci_ai.lazy import Lazy
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
+
 load_dotenv()
 
 
@@ -70,24 +73,18 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 
 def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+    return build_openai_client(
+        OCI_BASE_URL,
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
 
 
 def _close_client(client: OpenAI) -> None:
-    http_client = getattr(client, "http_client", None)
-    if http_client is not None:
-        http_client.close()
+    close_client(client)
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 SYSTEM_PROMPT = "Você é um assistente útil."
 USER_PROMPT = "Explique como listar todos os arquivos de um diretório usando Python."
@@ -114,20 +111,10 @@ def stream_with_chat_completions() -> None:
             for chunk in stream:
                 _print_pretty_json(chunk)
         else:
-            last_usage = None
-            for chunk in stream:
-                if not chunk.choices:
-                    last_usage = getattr(chunk, "usage", None) or last_usage
-                    continue
-                if (
-                    hasattr(chunk.choices[0].delta, "content")
-                    and chunk.choices[0].delta.content
-                ):
-                    text = chunk.choices[0].delta.content
-                    print(text, end="", flush=True)
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage({"usage": last_usage})
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Completions]: {exc}")
     finally:
@@ -196,15 +183,10 @@ def stream_with_responses_api() -> None:
                 if getattr(event, "type", None) == "response.completed":
                     _print_usage(getattr(event, "response", None))
         else:
-            last_usage = None
-            for event in stream:
-                if getattr(event, "type", None) == "response.output_text.delta":
-                    print(event.delta, end="", flush=True)
-                elif getattr(event, "type", None) == "response.completed":
-                    last_usage = getattr(event, "response", None) or last_usage
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage(last_usage)
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
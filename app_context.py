@@ -1,13 +1,22 @@
 import json
 import os
+import sys
 import time
+from functools import lru_cache
 
-import httpx
-import pdfplumber
 from dotenv import load_dotenv
-from oci_openai import OciUserPrincipalAuth
 from openai import OpenAI
 
+from oci_ai.client import build_openai_client, close_client
+from oci_ai.lazy import Lazy
+from oci_ai.mapreduce import MAP_CHUNK_TOKENS, MapReduce, print_progress
+from oci_ai.pipeline import build_prompt
+from oci_ai.planner import ContextPlan, plan_context
+from oci_ai.retrieval import CONTEXT_MODE, retrieval_prompt
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
+from oci_ai.textcache import DEFAULT_TEXT_CACHE
+
 load_dotenv()
 
 
@@ -18,14 +27,45 @@ def _require_env(name: str) -> str:
     return value
 
 
-def extract_pdf_text(file_path: str) -> str:
-    chunks = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            if text:
-                chunks.append(text)
-    return "\n".join(chunks).strip()
+@lru_cache(maxsize=1)
+def _context_plan() -> ContextPlan | None:
+    if CONTEXT_MODE != "auto":
+        return None
+    # Estima os tokens antes de enviar e escolhe full, bm25 ou mapreduce.
+    plan = plan_context(PDF_PATH, USER_PROMPT, MODEL_ID, instructions=SYSTEM_PROMPT)
+    print(plan.explain(), file=sys.stderr)
+    return plan
+
+
+def _context_mode() -> str:
+    plan = _context_plan()
+    return plan.strategy if plan is not None else CONTEXT_MODE
+
+
+@lru_cache(maxsize=1)
+def _book_prompt() -> str:
+    mode = _context_mode()
+    if mode == "bm25":
+        # Só os trechos mais relevantes para a pergunta (índice BM25 em cache).
+        return retrieval_prompt(PDF_PATH, USER_PROMPT)
+    if mode == "corpus":
+        # Trechos de todos os PDFs do corpus; reindexa antes o que mudou no diretório.
+        from oci_ai.corpus import CORPUS_DIR, DEFAULT_CORPUS, corpus_prompt
+
+        if CORPUS_DIR:
+            DEFAULT_CORPUS.ingest(CORPUS_DIR)
+        return corpus_prompt(USER_PROMPT)
+    if mode == "vector":
+        # Trechos mais próximos da pergunta no índice de embeddings (mmap em disco).
+        from oci_ai.vectors import default_embedder, vector_prompt
+
+        return vector_prompt(PDF_PATH, USER_PROMPT, default_embedder(client))
+    # Monta o prompt direto das páginas: uma única cópia do texto do livro.
+    return build_prompt(
+        DEFAULT_TEXT_CACHE.iter_pages(PDF_PATH),
+        prefix="Texto do livro:\n",
+        suffix=f"\n\n{USER_PROMPT}",
+    )
 
 
 def _print_pretty_json(payload: object) -> None:
@@ -73,34 +113,30 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 
 def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+    return build_openai_client(
+        OCI_BASE_URL,
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
 
 
 def _close_client(client: OpenAI) -> None:
-    http_client = getattr(client, "http_client", None)
-    if http_client is not None:
-        http_client.close()
+    close_client(client)
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 SYSTEM_PROMPT = "Você é um especialista em livros."
 USER_PROMPT = "Me descreva em tópicos as lições principais do livro"
 PDF_PATH = "A-ARTE-DA-GUERRA.pdf"
-PDF_TEXT = extract_pdf_text(PDF_PATH)
 
 PRINT_RAW = False
 
 
 def run_with_responses_api() -> None:
+    if _context_mode() == "mapreduce":
+        stream_with_map_reduce()
+        return
     start_time = time.time()
     try:
         response = client.responses.create(
@@ -112,7 +148,7 @@ def run_with_responses_api() -> None:
                     "content": [
                         {
                             "type": "input_text",
-                            "text": f"Texto do livro:\n{PDF_TEXT}\n\n{USER_PROMPT}",
+                            "text": _book_prompt(),
                         }
                     ],
                 }
@@ -130,7 +166,44 @@ def run_with_responses_api() -> None:
         print(f"\n⏱️ Tempo (responses.create): {elapsed:.2f}s")
 
 
+def stream_with_map_reduce() -> None:
+    # Livro maior que a janela: chunks respondidos em paralelo e reduzidos em níveis.
+    start_time = time.time()
+    try:
+        plan = _context_plan()
+        # No modo auto, chunks do tamanho que o planejador calculou para o modelo.
+        max_tokens = plan.chunk_tokens if plan and plan.chunk_tokens else MAP_CHUNK_TOKENS
+        result = MapReduce(
+            client,
+            MODEL_ID,
+            SYSTEM_PROMPT,
+            max_tokens=max_tokens,
+            on_progress=print_progress,
+        ).run(DEFAULT_TEXT_CACHE.iter_pages(PDF_PATH), USER_PROMPT, on_text=echo)
+        print()
+        print(
+            f"\n🧩 {result.chunks} chunks, {result.levels} níveis de redução, "
+            f"{result.calls} chamadas ({result.cached} do cache)"
+        )
+        _print_usage(
+            {
+                "usage": {
+                    "input_tokens": result.input_tokens,
+                    "output_tokens": result.output_tokens,
+                }
+            }
+        )
+    except Exception as exc:
+        print(f"\n[ERRO map-reduce]: {exc!r}")
+    finally:
+        elapsed = time.time() - start_time
+        print(f"\n⏱️ Tempo (map-reduce): {elapsed:.2f}s")
+
+
 def stream_with_responses_api() -> None:
+    if _context_mode() == "mapreduce":
+        stream_with_map_reduce()
+        return
     start_time = time.time()
     try:
         stream = client.responses.create(
@@ -142,7 +215,7 @@ def stream_with_responses_api() -> None:
                     "content": [
                         {
                             "type": "input_text",
-                            "text": f"Texto do livro:\n{PDF_TEXT}\n\n{USER_PROMPT}",
+                            "text": _book_prompt(),
                         }
                     ],
                 }
@@ -156,15 +229,10 @@ def stream_with_responses_api() -> None:
                 if getattr(event, "type", None) == "response.completed":
                     _print_usage(getattr(event, "response", None))
         else:
-            last_usage = None
-            for event in stream:
-                if getattr(event, "type", None) == "response.output_text.delta":
-                    print(event.delta, end="", flush=True)
-                elif getattr(event, "type", None) == "response.completed":
-                    last_usage = getattr(event, "response", None) or last_usage
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage(last_usage)
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
@@ -3,7 +3,17 @@ import os
 import time
 
 from dotenv import load_dotenv
-from oci_openai import OciOpenAI, OciUserPrincipalAuth
+from oci_openai import OciOpenAI
+
+from oci_ai.regions import (
+    RegionalClients,
+    RegionSelector,
+    inference_url,
+    region_of_ocid,
+    regions_from_env,
+)
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
 
 load_dotenv()
 
@@ -55,30 +65,25 @@ def _print_usage(payload: object) -> None:
 COMPARTMENT_ID = _require_env("OCI_COMPARTMENT_ID")
 CONVERSATION_STORE_ID = _require_env("OCI_CONVERSATION_STORE_ID")
 OCI_CONFIG_FILE = os.path.expanduser(_require_env("OCI_CONFIG_FILE"))
-REGION = "us-chicago-1"
+# Regiões candidatas (OCI_REGIONS=us-chicago-1,sa-saopaulo-1,...): usa a de menor
+# latência que oferece o modelo e troca de região em caso de erro.
+OCI_REGIONS = regions_from_env()
+# Conversas ficam no Conversation Store, que pertence a uma única região.
+CONVERSATION_REGION = region_of_ocid(CONVERSATION_STORE_ID) or OCI_REGIONS[0]
 MODEL_ID = _require_env("OCI_MODEL_ID")
-OCI_BASE_URL = (
-    "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com/openai/v1"
-)
 
 
-def _build_client() -> OciOpenAI:
+def _build_client(region: str) -> OciOpenAI:
     return OciOpenAI(
-        region=REGION,
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+        region=region,
+        auth=oci_auth(OCI_CONFIG_FILE),
         compartment_id=COMPARTMENT_ID,
         conversation_store_id=CONVERSATION_STORE_ID,
-        base_url=OCI_BASE_URL,
+        base_url=inference_url(region, "/openai/v1"),
     )
 
 
-def _close_client(client: OciOpenAI) -> None:
-    close_fn = getattr(client, "close", None)
-    if callable(close_fn):
-        close_fn()
-
-
-client = _build_client()
+clients = RegionalClients(RegionSelector(OCI_REGIONS), _build_client)
 
 SYSTEM_PROMPT = "Você é um assistente útil."
 USER_PROMPT = "Explique como listar todos os arquivos de um diretório usando Python."
@@ -89,10 +94,13 @@ PRINT_RAW = False
 def run_with_responses_api() -> None:
     start_time = time.time()
     try:
-        response = client.responses.create(
-            model=MODEL_ID,
-            instructions=SYSTEM_PROMPT,
-            input=USER_PROMPT,
+        response = clients.call(
+            MODEL_ID,
+            lambda client: client.responses.create(
+                model=MODEL_ID,
+                instructions=SYSTEM_PROMPT,
+                input=USER_PROMPT,
+            ),
         )
         if PRINT_RAW:
             _print_pretty_json(response)
@@ -109,12 +117,15 @@ def run_with_responses_api() -> None:
 def stream_with_responses_api() -> None:
     start_time = time.time()
     try:
-        stream = client.responses.create(
-            model=MODEL_ID,
-            instructions=SYSTEM_PROMPT,
-            input=USER_PROMPT,
-            stream=True,
-            stream_options={"include_usage": True},
+        stream = clients.call(
+            MODEL_ID,
+            lambda client: client.responses.create(
+                model=MODEL_ID,
+                instructions=SYSTEM_PROMPT,
+                input=USER_PROMPT,
+                stream=True,
+                stream_options={"include_usage": True},
+            ),
         )
         if PRINT_RAW:
             for event in stream:
@@ -122,15 +133,10 @@ def stream_with_responses_api() -> None:
                 if getattr(event, "type", None) == "response.completed":
                     _print_usage(getattr(event, "response", None))
         else:
-            last_usage = None
-            for event in stream:
-                if getattr(event, "type", None) == "response.output_text.delta":
-                    print(event.delta, end="", flush=True)
-                elif getattr(event, "type", None) == "response.completed":
-                    last_usage = getattr(event, "response", None) or last_usage
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage(last_usage)
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
@@ -141,6 +147,7 @@ def stream_with_responses_api() -> None:
 def run_with_conversation_memory() -> None:
     start_time = time.time()
     try:
+        client = clients.client_for_region(CONVERSATION_REGION)
         conversation = client.conversations.create(
             metadata={"topic": "demo"},
             items=[
@@ -181,8 +188,10 @@ def run_with_conversation_memory() -> None:
 
 if __name__ == "__main__":
     try:
+        if len(OCI_REGIONS) > 1:
+            clients.selector.probe()
         # run_with_responses_api()
         # stream_with_responses_api()
         run_with_conversation_memory()
     finally:
-        _close_client(client)
+        clients.close()
@@ -1,13 +1,16 @@
-import base64
 import json
 import os
 import time
 
-import httpx
 from dotenv import load_dotenv
-from oci_openai import OciUserPrincipalAuth
 from openai import OpenAI
 
+from oci_ai.client import build_openai_client, close_client
+from oci_ai.lazy import Lazy
+from oci_ai.multimodal import input_image
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
+
 load_dotenv()
 
 
@@ -18,11 +21,6 @@ def _require_env(name: str) -> str:
     return value
 
 
-def encode_file(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
-
-
 def _print_pretty_json(payload: object) -> None:
     if hasattr(payload, "model_dump"):
         payload = payload.model_dump()
@@ -68,28 +66,22 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 
 def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+    return build_openai_client(
+        OCI_BASE_URL,
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
 
 
 def _close_client(client: OpenAI) -> None:
-    http_client = getattr(client, "http_client", None)
-    if http_client is not None:
-        http_client.close()
+    close_client(client)
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 SYSTEM_PROMPT = "Você é um especialista em imagens."
 USER_PROMPT = "Me descreva de forma sucita imagem e me conte como essa imagem mudou o mundo do processamento de imagens"
-BASE64_IMAGE = encode_file("LENNA.png")
+IMAGE_PATH = "LENNA.png"
 
 PRINT_RAW = False
 
@@ -105,10 +97,7 @@ def run_with_responses_api() -> None:
                     "role": "user",
                     "content": [
                         {"type": "input_text", "text": USER_PROMPT},
-                        {
-                            "type": "input_image",
-                            "image_url": f"data:image/jpeg;base64,{BASE64_IMAGE}",
-                        },
+                        input_image(IMAGE_PATH),
                     ],
                 }
             ],
@@ -136,10 +125,7 @@ def stream_with_responses_api() -> None:
                     "role": "user",
                     "content": [
                         {"type": "input_text", "text": USER_PROMPT},
-                        {
-                            "type": "input_image",
-                            "image_url": f"data:image/png;base64,{BASE64_IMAGE}",
-                        },
+                        input_image(IMAGE_PATH),
                     ],
                 }
             ],
@@ -152,15 +138,10 @@ def stream_with_responses_api() -> None:
                 if getattr(event, "type", None) == "response.completed":
                     _print_usage(getattr(event, "response", None))
         else:
-            last_usage = None
-            for event in stream:
-                if getattr(event, "type", None) == "response.output_text.delta":
-                    print(event.delta, end="", flush=True)
-                elif getattr(event, "type", None) == "response.completed":
-                    last_usage = getattr(event, "response", None) or last_usage
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage(last_usage)
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
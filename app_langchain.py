@@ -14,7 +14,10 @@ warnings.filterwarnings(
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_oci import ChatOCIOpenAI
-from oci_openai import OciUserPrincipalAuth
+
+from oci_ai.lazy import Lazy
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
 
 load_dotenv()
 
@@ -71,7 +74,7 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 def _build_client() -> ChatOCIOpenAI:
     return ChatOCIOpenAI(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+        auth=oci_auth(OCI_CONFIG_FILE),
         service_endpoint=OCI_SERVICE_ENDPOINT,
         compartment_id=COMPARTMENT_ID,
         model=MODEL_ID,
@@ -97,7 +100,7 @@ def _extract_chunk_text(chunk: object) -> str:
     return ""
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 SYSTEM_PROMPT = "Você é um assistente útil."
 USER_PROMPT = "Explique como listar todos os arquivos de um diretório usando Python."
@@ -140,12 +143,10 @@ def stream_with_responses_api() -> None:
                 _print_pretty_json(chunk)
                 last_usage = chunk
         else:
-            for chunk in client.stream(messages):
-                text = _extract_chunk_text(chunk)
-                if text:
-                    print(text, end="", flush=True)
-                last_usage = chunk
+            result = consume(client.stream(messages), on_text=echo)
             print()
+            if result.usage is not None:
+                last_usage = {"usage": result.usage}
         if last_usage is not None:
             _print_usage(last_usage)
     except Exception as exc:
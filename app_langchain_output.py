@@ -15,9 +15,12 @@ from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage
 from langchain_oci import ChatOCIOpenAI
-from oci_openai import OciUserPrincipalAuth
 from pydantic import BaseModel, Field
 
+from oci_ai.lazy import Lazy
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
+
 load_dotenv()
 
 
@@ -204,7 +207,7 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 def _build_client() -> ChatOCIOpenAI:
     return ChatOCIOpenAI(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+        auth=oci_auth(OCI_CONFIG_FILE),
         service_endpoint=OCI_SERVICE_ENDPOINT,
         compartment_id=COMPARTMENT_ID,
         model=MODEL_ID,
@@ -243,10 +246,12 @@ SYSTEM_PROMPT = "Extraia as informações de contato."
 
 PRINT_RAW = False
 
-client = _build_client()
+client = Lazy(_build_client)
 
-graph = create_agent(
-    model=client, response_format=ContactList, system_prompt=SYSTEM_PROMPT
+graph = Lazy(
+    lambda: create_agent(
+        model=client.get(), response_format=ContactList, system_prompt=SYSTEM_PROMPT
+    )
 )
 
 
@@ -298,32 +303,16 @@ def stream_with_responses_api() -> None:
                 last_usage = chunk
         else:
             formatter = _JsonStreamFormatter()
-            for chunk in graph.stream({"messages": messages}, stream_mode="messages"):
-                text = _extract_chunk_text(chunk)
-                if text:
-                    formatted = formatter.feed(text)
-                    if formatted:
-                        print(formatted, end="", flush=True)
-                if getattr(chunk, "usage_metadata", None) or getattr(
-                    chunk, "usage", None
-                ):
-                    last_usage = chunk
-                elif isinstance(chunk, dict) and (
-                    "usage_metadata" in chunk or "usage" in chunk
-                ):
-                    last_usage = chunk
-                elif isinstance(chunk, (list, tuple)):
-                    for item in chunk:
-                        if getattr(item, "usage_metadata", None) or getattr(
-                            item, "usage", None
-                        ):
-                            last_usage = item
-                            break
-                        if isinstance(item, dict) and (
-                            "usage_metadata" in item or "usage" in item
-                        ):
-                            last_usage = item
-                            break
+
+            def _echo_formatted(text: str) -> None:
+                formatted = formatter.feed(text)
+                if formatted:
+                    echo(formatted)
+
+            consume(
+                graph.stream({"messages": messages}, stream_mode="messages"),
+                on_text=_echo_formatted,
+            )
         if not PRINT_RAW:
             print()
         if PRINT_RAW and last_usage is not None:
@@ -16,7 +16,11 @@ from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_oci import ChatOCIOpenAI
-from oci_openai import OciUserPrincipalAuth
+
+from oci_ai.langchain_tracing import TracingCallbackHandler
+from oci_ai.lazy import Lazy
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
 
 load_dotenv()
 
@@ -104,7 +108,7 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 def _build_client() -> ChatOCIOpenAI:
     return ChatOCIOpenAI(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+        auth=oci_auth(OCI_CONFIG_FILE),
         service_endpoint=OCI_SERVICE_ENDPOINT,
         compartment_id=COMPARTMENT_ID,
         model=MODEL_ID,
@@ -171,17 +175,22 @@ def get_current_time() -> str:
     return datetime.now().isoformat(timespec="seconds")
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 SYSTEM_PROMPT = "Você é um assistente útil."
 USER_PROMPT = "Que horas são agora? Me responda com um cumprimento cordial conforme o horário. Me conte uma história usando esse horário."
 
 PRINT_RAW = False
 
-graph = create_agent(
-    model=client,
-    tools=[get_current_time],
-    system_prompt=SYSTEM_PROMPT,
+# Spans agent.run > agent.step > llm.call / tool.execute (OCI_AI_TRACING).
+RUN_CONFIG = {"callbacks": [TracingCallbackHandler()]}
+
+graph = Lazy(
+    lambda: create_agent(
+        model=client.get(),
+        tools=[get_current_time],
+        system_prompt=SYSTEM_PROMPT,
+    )
 )
 
 
@@ -192,7 +201,7 @@ def run_with_responses_api() -> None:
 
     start_time = time.time()
     try:
-        response = graph.invoke({"messages": messages})
+        response = graph.invoke({"messages": messages}, config=RUN_CONFIG)
         if PRINT_RAW:
             _print_pretty_json(response)
         else:
@@ -214,35 +223,19 @@ def stream_with_responses_api() -> None:
     try:
         last_usage = None
         if PRINT_RAW:
-            for chunk in graph.stream({"messages": messages}, stream_mode="messages"):
+            for chunk in graph.stream(
+                {"messages": messages}, config=RUN_CONFIG, stream_mode="messages"
+            ):
                 _print_pretty_json(chunk)
                 last_usage = chunk
         else:
-            for chunk in graph.stream({"messages": messages}, stream_mode="messages"):
-                text = _extract_chunk_text(chunk)
-                if text:
-                    print(text, end="", flush=True)
-                if getattr(chunk, "usage_metadata", None) or getattr(
-                    chunk, "usage", None
-                ):
-                    last_usage = chunk
-                elif isinstance(chunk, dict) and (
-                    "usage_metadata" in chunk or "usage" in chunk
-                ):
-                    last_usage = chunk
-                elif isinstance(chunk, (list, tuple)):
-                    for item in chunk:
-                        if getattr(item, "usage_metadata", None) or getattr(
-                            item, "usage", None
-                        ):
-                            last_usage = item
-                            break
-                        if isinstance(item, dict) and (
-                            "usage_metadata" in item or "usage" in item
-                        ):
-                            last_usage = item
-                            break
+            stream = graph.stream(
+                {"messages": messages}, config=RUN_CONFIG, stream_mode="messages"
+            )
+            result = consume(stream, on_text=echo)
             print()
+            if result.usage is not None:
+                last_usage = {"usage": result.usage}
         if last_usage is not None:
             _print_usage(last_usage)
     except Exception as exc:
@@ -3,10 +3,13 @@ import os
 import time
 import warnings
 
-import httpx
 from dotenv import load_dotenv
-from oci_openai import OciUserPrincipalAuth
 from openai import OpenAI
+
+from oci_ai.client import build_openai_client, close_client
+from oci_ai.lazy import Lazy
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import consume, echo
 from pydantic import BaseModel
 
 load_dotenv()
@@ -65,24 +68,18 @@ MODEL_ID = _require_env("OCI_MODEL_ID")
 
 
 def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+    return build_openai_client(
+        OCI_BASE_URL,
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
 
 
 def _close_client(client: OpenAI) -> None:
-    http_client = getattr(client, "http_client", None)
-    if http_client is not None:
-        http_client.close()
+    close_client(client)
 
 
-client = _build_client()
+client = Lazy(_build_client)
 
 
 class CalendarEvent(BaseModel):
@@ -134,15 +131,10 @@ def stream_with_responses_api() -> None:
                     if getattr(event, "type", None) == "response.completed":
                         _print_usage(getattr(event, "response", None))
             else:
-                last_usage = None
-                for event in stream:
-                    if getattr(event, "type", None) == "response.output_text.delta":
-                        print(event.delta, end="", flush=True)
-                    elif getattr(event, "type", None) == "response.completed":
-                        last_usage = getattr(event, "response", None) or last_usage
+                result = consume(stream, on_text=echo)
                 print()
-                if last_usage is not None:
-                    _print_usage(last_usage)
+                if result.usage is not None:
+                    _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
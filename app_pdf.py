@@ -1,13 +1,24 @@
-import base64
 import json
 import os
 import time
 
-import httpx
 from dotenv import load_dotenv
-from oci_openai import OciOpenAI, OciUserPrincipalAuth
+from oci_openai import OciOpenAI
 from openai import OpenAI
 
+from oci_ai.client import build_openai_client
+from oci_ai.files import DEFAULT_FILE_REGISTRY
+from oci_ai.planner import FULL, plan_context
+from oci_ai.regions import (
+    RegionalClients,
+    RegionSelector,
+    inference_url,
+    regions_from_env,
+)
+from oci_ai.signing import oci_auth
+from oci_ai.subset import choose_pages, subset_file
+from oci_ai.streaming import consume, echo
+
 load_dotenv()
 
 
@@ -18,11 +29,6 @@ def _require_env(name: str) -> str:
     return value
 
 
-def encode_file(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
-
-
 def _print_pretty_json(payload: object) -> None:
     if hasattr(payload, "model_dump"):
         payload = payload.model_dump()
@@ -67,74 +73,83 @@ HTTP_CLIENT_HEADERS = {
     "opc-compartment-id": COMPARTMENT_ID,
     "opc-conversation-store-id": CONVERSATION_STORE_ID,
 }
-# OCI_BASE_URL = _require_env("OCI_BASE_URL")
-OCI_BASE_URL = (
-    "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com/openai/v1"
-)
+# Regiões candidatas (OCI_REGIONS=us-chicago-1,sa-saopaulo-1,...): usa a de menor
+# latência que oferece o modelo e troca de região em caso de erro.
+OCI_REGIONS = regions_from_env()
 OCI_CONFIG_FILE = os.path.expanduser(_require_env("OCI_CONFIG_FILE"))
 MODEL_ID = _require_env("OCI_MODEL_ID")
+PDF_MODEL_ID = "openai.gpt-5"
 
 
-def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+def _build_client(region: str) -> OpenAI:
+    return build_openai_client(
+        inference_url(region, "/openai/v1"),
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
-
 
-def _close_client(client: OpenAI) -> None:
-    http_client = getattr(client, "http_client", None)
-    if http_client is not None:
-        http_client.close()
 
-
-client = _build_client()
+clients = RegionalClients(RegionSelector(OCI_REGIONS), _build_client)
 
 SYSTEM_PROMPT = "Você é um especialista em analises."
 USER_PROMPT = "O que você pode me dizer sobre o conteúdo deste PDF?"
-BASE64_PDF = encode_file("A-ARTE-DA-GUERRA.pdf")
+PDF_PATH = "A-ARTE-DA-GUERRA.pdf"
+# OCI_AI_PDF_PAGES: vazio envia o PDF inteiro; "1-5,12" só essas páginas; "auto" as
+# páginas dos trechos BM25 mais relevantes para a pergunta.
+PDF_PAGES = os.getenv("OCI_AI_PDF_PAGES", "")
 
 PRINT_RAW = False
 
 
+def _ask_pdf(client: OpenAI, part: dict):
+    return client.responses.create(
+        model=PDF_MODEL_ID,
+        # model=MODEL_ID,
+        instructions=SYSTEM_PROMPT,
+        reasoning={"effort": "low", "summary": "auto"},
+        input=[
+            {
+                "role": "user",
+                "content": [{"type": "input_text", "text": USER_PROMPT}, part],
+            }
+        ],
+        # input=[
+        #     {
+        #         "role": "user",
+        #         "content": [
+        #             {"type": "input_text", "text": USER_PROMPT},
+        #             {
+        #                 "type": "input_file",
+        #                 "file_url": "https://www.berkshirehathaway.com/letters/2024ltr.pdf",
+        #             },
+        #         ],
+        #     }
+        # ],
+    )
+
+
 def run_with_responses_api() -> None:
     start_time = time.time()
     try:
-        response = client.responses.create(
-            model="openai.gpt-5",
-            # model=MODEL_ID,
-            instructions=SYSTEM_PROMPT,
-            reasoning={"effort": "low", "summary": "auto"},
-            input=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": USER_PROMPT},
-                        {
-                            "type": "input_file",
-                            "filename": "filename.pdf",
-                            "file_data": f"data:application/pdf;base64,{BASE64_PDF}",
-                        },
-                    ],
-                }
-            ],
-            # input=[
-            #     {
-            #         "role": "user",
-            #         "content": [
-            #             {"type": "input_text", "text": USER_PROMPT},
-            #             {
-            #                 "type": "input_file",
-            #                 "file_url": "https://www.berkshirehathaway.com/letters/2024ltr.pdf",
-            #             },
-            #         ],
-            #     }
-            # ],
+        # OCI_AI_PDF_PAGES inválido ou PDF ilegível caem no mesmo tratamento de erro.
+        pdf_path = subset_file(PDF_PATH, choose_pages(PDF_PATH, PDF_PAGES, USER_PROMPT))
+        # Estimativa local antes do upload: um PDF grande demais só falharia depois de enviado.
+        plan = plan_context(
+            pdf_path, USER_PROMPT, PDF_MODEL_ID, instructions=SYSTEM_PROMPT
+        )
+        if plan.strategy != FULL:
+            print(f"\n[PDF não cabe no contexto de {PDF_MODEL_ID}]\n{plan.explain()}")
+            return
+        # Enviado uma vez pela Files API (ou inline, sem ela); um file_id que o
+        # servidor não conhece mais é descartado e o PDF vai de novo.
+        response = clients.call(
+            PDF_MODEL_ID,
+            lambda client: DEFAULT_FILE_REGISTRY.with_file(
+                client,
+                pdf_path,
+                lambda part: _ask_pdf(client, part),
+                "filename.pdf",
+            ),
         )
         if PRINT_RAW:
             _print_pretty_json(response)
@@ -151,23 +166,26 @@ def run_with_responses_api() -> None:
 def stream_with_responses_api() -> None:
     start_time = time.time()
     try:
-        stream = client.responses.create(
-            model="openai.gpt-5",
-            instructions=SYSTEM_PROMPT,
-            input=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": USER_PROMPT},
-                        {
-                            "type": "input_file",
-                            "file_url": "https://www.berkshirehathaway.com/letters/2024ltr.pdf",
-                        },
-                    ],
-                }
-            ],
-            stream=True,
-            stream_options={"include_usage": True},
+        stream = clients.call(
+            PDF_MODEL_ID,
+            lambda client: client.responses.create(
+                model=PDF_MODEL_ID,
+                instructions=SYSTEM_PROMPT,
+                input=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "input_text", "text": USER_PROMPT},
+                            {
+                                "type": "input_file",
+                                "file_url": "https://www.berkshirehathaway.com/letters/2024ltr.pdf",
+                            },
+                        ],
+                    }
+                ],
+                stream=True,
+                stream_options={"include_usage": True},
+            ),
         )
         if PRINT_RAW:
             for event in stream:
@@ -175,15 +193,10 @@ def stream_with_responses_api() -> None:
                 if getattr(event, "type", None) == "response.completed":
                     _print_usage(getattr(event, "response", None))
         else:
-            last_usage = None
-            for event in stream:
-                if getattr(event, "type", None) == "response.output_text.delta":
-                    print(event.delta, end="", flush=True)
-                elif getattr(event, "type", None) == "response.completed":
-                    last_usage = getattr(event, "response", None) or last_usage
+            result = consume(stream, on_text=echo)
             print()
-            if last_usage is not None:
-                _print_usage(last_usage)
+            if result.usage is not None:
+                _print_usage({"usage": result.usage})
     except Exception as exc:
         print(f"\n[ERRO Responses stream]: {exc!r}")
     finally:
@@ -193,8 +206,10 @@ def stream_with_responses_api() -> None:
 
 if __name__ == "__main__":
     try:
+        if len(OCI_REGIONS) > 1:
+            clients.selector.probe()
         run_with_responses_api()
         # stream_with_responses_api()
 
     finally:
-        _close_client(client)
+        clients.close()
@@ -1,11 +1,17 @@
 import json
 import os
+from functools import lru_cache
 from typing import Literal
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from pydantic import BaseModel, Field
 
+from oci_ai.client import build_openai_client
+from oci_ai.concurrency import AIMDLimiter, adaptive_map
+from oci_ai.metrics import serve_metrics_from_env
+from oci_ai.routing import DEFAULT_ROUTER
+
 load_dotenv()
 
 # =========================================================
@@ -134,36 +140,60 @@ Exemplos oficiais (JSON):
 # 4. FUNÇÃO DE CLASSIFICAÇÃO
 # =========================================================
 
+# Tier do config.yaml (model_info.tier) ou nome de um modelo específico.
+MODEL_TIER = os.getenv("CLASSIF_MODEL_TIER", "fast")
 
-def classificar_motivo(transcricao_cliente: str) -> MotivoContato | None:
+
+@lru_cache(maxsize=1)
+def _build_client() -> OpenAI:
     api_key = os.environ.get("LITELLM_API_KEY")
     if not api_key:
         raise ValueError("LITELLM_API_KEY nao configurada no .env")
-    client = OpenAI(api_key=api_key, base_url="http://localhost:4000")
+    # Limites rpm/tpm do config.yaml: limitador padrão, compartilhado entre processos.
+    return build_openai_client("http://localhost:4000", api_key=api_key)
 
+
+def _classificar(transcricao_cliente: str) -> MotivoContato | None:
     user_prompt = json.dumps({"fala": transcricao_cliente}, ensure_ascii=False)
+    response = _build_client().chat.completions.parse(
+        model=DEFAULT_ROUTER.choose(MODEL_TIER),
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        response_format=MotivoContato,
+        temperature=0,
+    )
+    return response.choices[0].message.parsed
+
 
+def classificar_motivo(transcricao_cliente: str) -> MotivoContato | None:
+    _build_client()
     try:
-        response = client.chat.completions.parse(
-            model="gemini-2-5-flash",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format=MotivoContato,
-            temperature=0,
-        )
-        return response.choices[0].message.parsed
+        return _classificar(transcricao_cliente)
     except Exception:
         print("Nao foi possivel fazer a classificacao.")
         return None
 
 
+def classificar_lote(
+    frases: list[str], limiter: AIMDLimiter | None = None
+) -> list[MotivoContato | None]:
+    # Concorrência adaptativa: cresce enquanto o serviço responde bem e
+    # corta pela metade em 429/5xx ou picos de latência.
+    _build_client()
+    if limiter is None:
+        limiter = AIMDLimiter("classificar_motivo")
+    resultados = adaptive_map(_classificar, frases, limiter, return_exceptions=True)
+    return [None if isinstance(item, Exception) else item for item in resultados]
+
+
 # =========================================================
 # 5. EXEMPLO DE USO
 # =========================================================
 
-if __name__ == "__main__":
+def main() -> None:
+    serve_metrics_from_env()
     texto = "Se continuar esse valor alto, vou cancelar meu plano."
     resultado = classificar_motivo(texto)
     if resultado is not None:
@@ -193,9 +223,12 @@ if __name__ == "__main__":
     ]
 
     print("\n--- Lote com 20 classificacoes ---")
-    for fala in frases:
-        item = classificar_motivo(fala)
+    for fala, item in zip(frases, classificar_lote(frases)):
         if item is None:
             print({"fala": fala, "erro": "Nao foi possivel fazer a classificacao."})
         else:
             print(item.model_dump())
+
+
+if __name__ == "__main__":
+    main()
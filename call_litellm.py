@@ -2,20 +2,25 @@ import os
 import time
 
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from oci_ai.client import build_openai_client
+from oci_ai.routing import DEFAULT_ROUTER
 
 load_dotenv()
 
+# Tier do config.yaml (model_info.tier) ou nome de um modelo específico.
+MODEL_TIER = os.getenv("LITELLM_MODEL_TIER", "fast")
+
 
 def main() -> None:
     api_key = os.environ.get("LITELLM_API_KEY")
     if not api_key:
         raise ValueError("LITELLM_API_KEY nao configurada no .env")
-    client = OpenAI(api_key=api_key, base_url="http://localhost:4000")
+    client = build_openai_client("http://localhost:4000", api_key=api_key)
 
     started_at = time.perf_counter()
     response = client.chat.completions.create(
-        model="gemini-2-5-flash-lite",
+        model=DEFAULT_ROUTER.choose(MODEL_TIER),
         messages=[
             {"role": "system", "content": "Voce e um assistente util."},
             {
@@ -2,17 +2,25 @@ import hashlib
 import json
 import logging
 import os
+import uuid
 
-import requests
+import httpx
 import streamlit as st
 from dotenv import load_dotenv
 
+from oci_ai.client import build_http_client
+from oci_ai.resilience import CircuitOpenError
+from oci_ai.routing import DEFAULT_ROUTER
+from oci_ai.streaming import TEXT, StreamResult, normalize
+from oci_ai.tracing import traced
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO)
-logging.getLogger("urllib3").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
 def _log_error(context: str, exc: Exception) -> None:
@@ -26,9 +34,11 @@ def _require_env(name: str) -> str:
     return value
 
 
-MODEL_ID = "openai-gpt-oss-120b"
+# Tier do config.yaml (model_info.tier) ou nome de um modelo específico.
+MODEL_TIER = os.getenv("CHAT_MODEL_TIER", "reasoning")
 URL = "http://localhost:4000/v1/chat/completions"
 API_KEY = _require_env("LITELLM_API_KEY")
+REQUEST_TIMEOUT = 60
 
 DEFAULT_TOOL_SCHEMA = {
     "type": "object",
@@ -46,6 +56,8 @@ EMPTY_RESPONSE_MESSAGE = "Resposta vazia do servidor. Tente novamente."
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "conversation_id" not in st.session_state:
+    st.session_state.conversation_id = uuid.uuid4().hex
 if "pending_tool_calls" not in st.session_state:
     st.session_state.pending_tool_calls = []
 if "manual_tool_output_enabled" not in st.session_state:
@@ -108,6 +120,7 @@ st.session_state.manual_tool_output_enabled = manual_tool_output
 
 if clear_chat:
     st.session_state.messages = []
+    st.session_state.conversation_id = uuid.uuid4().hex
     st.session_state.pending_tool_calls = []
     st.session_state.auto_process_pending = False
     for key in list(st.session_state.keys()):
@@ -116,6 +129,21 @@ if clear_chat:
     st.rerun()
 
 
+@st.cache_resource
+def _build_http_client() -> httpx.Client:
+    return build_http_client(
+        headers={
+            "Authorization": f"Bearer {API_KEY}",
+            "Content-Type": "application/json",
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+http_client = _build_http_client()
+
+
+@traced("tool.execute web_search", **{"gen_ai.tool.name": "web_search"})
 def _web_search(query: str) -> str:
     payload = {
         "query": query,
@@ -202,8 +230,11 @@ def _call_chat(
     messages, tools, *, stream: bool, tool_choice: str | dict | None = None
 ):
     effort_map = {"baixo": "low", "médio": "medium", "alto": "high"}
+    model = DEFAULT_ROUTER.choose(
+        MODEL_TIER, conversation_id=st.session_state.conversation_id
+    )
     payload = {
-        "model": MODEL_ID,
+        "model": model,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_output_tokens,
@@ -217,41 +248,54 @@ def _call_chat(
     if tool_choice:
         payload["tool_choice"] = tool_choice
     try:
-        response = requests.post(
-            URL,
-            headers={
-                "Authorization": f"Bearer {API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-            stream=stream,
-            timeout=60,
+        # Timeouts, 429 e 5xx são repetidos com backoff pelo cliente compartilhado.
+        response = http_client.send(
+            http_client.build_request("POST", URL, json=payload), stream=stream
         )
-    except requests.Timeout as exc:
+    except CircuitOpenError as exc:
+        _log_error("Modelo indisponível (circuit breaker aberto)", exc)
+        st.error(
+            f"Modelo temporariamente indisponível. Tente novamente em {exc.retry_in:.0f}s."
+        )
+        return None
+    except httpx.TimeoutException as exc:
         _log_error(f"Timeout ao chamar {URL}", exc)
-        st.error("Tempo limite excedido ao conectar ao servidor (timeout=60s).")
+        st.error(
+            f"Tempo limite excedido ao conectar ao servidor (timeout={REQUEST_TIMEOUT}s)."
+        )
         return None
-    except requests.RequestException as exc:
+    except httpx.HTTPError as exc:
         _log_error("Falha ao conectar ao servidor", exc)
         st.error(f"Falha ao conectar ao servidor: {exc}")
         return None
     if response.status_code >= 400:
+        response.read()
+        response.close()
         logger.error("HTTP %s: %s", response.status_code, response.text)
         st.error(f"HTTP {response.status_code}: {response.text}")
         return None
     logger.info(
-        "Chat completions OK status=%s stream=%s",
+        "Chat completions OK status=%s stream=%s model=%s",
         response.status_code,
         stream,
+        model,
     )
     return response
 
 
 def _stream_chat_response(create_container, response):
+    try:
+        return _read_chat_response(create_container, response)
+    finally:
+        response.close()
+
+
+def _read_chat_response(create_container, response):
     content_type = response.headers.get("content-type", "")
     if "text/event-stream" not in content_type:
         st.warning("Servidor não retornou streaming; exibindo resposta completa.")
         try:
+            response.read()
             data = response.json()
         except Exception as exc:
             _log_error("Resposta inválida do servidor (sem stream)", exc)
@@ -267,62 +311,39 @@ def _stream_chat_response(create_container, response):
 
     content = ""
     placeholder = None
-    tool_calls: dict[object, dict] = {}
-    ordered_keys: list[object] = []
-    auto_index = 0
+    result = StreamResult()
     with st.spinner("Respondendo…"):
-        for line in response.iter_lines(decode_unicode=True):
-            if not line or not line.startswith("data:"):
-                continue
-            data_str = line[len("data:") :].strip()
-            if data_str == "[DONE]":
-                break
-            try:
-                data = json.loads(data_str)
-            except Exception:
-                continue
-            delta = data.get("choices", [{}])[0].get("delta", {})
-            piece = delta.get("content")
-            if piece:
+        for event in normalize(_sse_chunks(response)):
+            result.add(event)
+            if event.kind == TEXT:
                 if placeholder is None:
                     placeholder = create_container().empty()
-                content += piece
+                content += event.text
                 placeholder.markdown(content)
-            for call in delta.get("tool_calls", []) or []:
-                idx = call.get("index")
-                key = None
-                if isinstance(idx, int):
-                    key = idx
-                elif isinstance(idx, str) and idx.isdigit():
-                    key = int(idx)
-                if key is None:
-                    key = call.get("id")
-                if key is None:
-                    key = f"auto_{auto_index}"
-                    auto_index += 1
-                if key not in tool_calls:
-                    ordered_keys.append(key)
-                entry = tool_calls.setdefault(
-                    key,
-                    {
-                        "id": None,
-                        "type": "function",
-                        "function": {"name": "", "arguments": ""},
-                    },
-                )
-                if call.get("id"):
-                    entry["id"] = call["id"]
-                if call.get("type"):
-                    entry["type"] = call["type"]
-                func = call.get("function") or {}
-                if func.get("name"):
-                    entry["function"]["name"] = func["name"]
-                if func.get("arguments"):
-                    entry["function"]["arguments"] += func["arguments"]
-    calls = [tool_calls[key] for key in ordered_keys]
+    calls = [
+        {
+            "id": call.call_id,
+            "type": "function",
+            "function": {"name": call.name, "arguments": call.arguments},
+        }
+        for call in result.tool_calls.values()
+    ]
     return {"content": content, "tool_calls": calls}
 
 
+def _sse_chunks(response):
+    for line in response.iter_lines():
+        if not line or not line.startswith("data:"):
+            continue
+        data_str = line[len("data:") :].strip()
+        if data_str == "[DONE]":
+            break
+        try:
+            yield json.loads(data_str)
+        except Exception:
+            continue
+
+
 def _append_assistant_error(message: str) -> None:
     if not message:
         return
@@ -395,6 +416,7 @@ def _drop_pending_tool_calls(pending_calls):
     ]
 
 
+@traced("chat.turn")
 def run():
     tools = _build_tools()
     response = _call_chat(_prepare_messages(), tools, stream=True)
@@ -6,9 +6,13 @@ import os
 import httpx
 import streamlit as st
 from dotenv import load_dotenv
-from oci_openai import OciUserPrincipalAuth
 from openai import OpenAI
 
+from oci_ai.client import build_openai_client
+from oci_ai.resilience import CircuitOpenError
+from oci_ai.signing import oci_auth
+from oci_ai.streaming import TEXT, StreamResult, normalize
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -54,16 +58,12 @@ EMPTY_RESPONSE_MESSAGE = "Resposta vazia do servidor. Tente novamente."
 
 @st.cache_resource
 def _build_client() -> OpenAI:
-    http_client = httpx.Client(
-        auth=OciUserPrincipalAuth(config_file=OCI_CONFIG_FILE),
+    return build_openai_client(
+        OCI_BASE_URL,
+        auth=oci_auth(OCI_CONFIG_FILE),
         headers=HTTP_CLIENT_HEADERS,
         timeout=REQUEST_TIMEOUT,
     )
-    return OpenAI(
-        api_key="OCI",
-        base_url=OCI_BASE_URL,
-        http_client=http_client,
-    )
 
 
 client = _build_client()
@@ -226,6 +226,12 @@ def _call_responses(
         params["reasoning"] = {"effort": effort_value}
     try:
         response = client.responses.create(**params)
+    except CircuitOpenError as exc:
+        _log_error("Modelo indisponível (circuit breaker aberto)", exc)
+        st.error(
+            f"Modelo temporariamente indisponível. Tente novamente em {exc.retry_in:.0f}s."
+        )
+        return None
     except httpx.TimeoutException as exc:
         _log_error(f"Timeout ao chamar {OCI_BASE_URL}", exc)
         st.error(
@@ -284,34 +290,27 @@ def _extract_tool_calls(output_items):
 def _stream_response(create_container, stream):
     content = ""
     placeholder = None
-    output_items = []
-    final_response = None
+    result = StreamResult()
     with st.spinner("Respondendo…"):
         try:
-            for event in stream:
-                event_type = getattr(event, "type", None)
-                if event_type == "response.output_text.delta":
-                    delta = getattr(event, "delta", "") or ""
-                    if delta:
-                        if placeholder is None:
-                            placeholder = create_container().empty()
-                        content += delta
-                        placeholder.markdown(content)
-                elif event_type == "response.output_item.done":
-                    item = _as_dict(getattr(event, "item", None))
-                    if item:
-                        output_items.append(item)
-                elif event_type == "response.completed":
-                    final_response = _as_dict(getattr(event, "response", None))
+            for event in normalize(stream):
+                result.add(event)
+                if event.kind == TEXT:
+                    if placeholder is None:
+                        placeholder = create_container().empty()
+                    content += event.text
+                    placeholder.markdown(content)
         except Exception as exc:
             _log_error("Erro no streaming", exc)
             st.error(f"Erro no streaming: {exc}")
 
+    output_items = _coerce_items(result.output_items)
+    final_response = _as_dict(result.final)
     if final_response is not None:
         output_items = (
             _coerce_items(final_response.get("output", output_items)) or output_items
         )
-    return {"output": _normalize_output(_coerce_items(output_items), content)}
+    return {"output": _normalize_output(output_items, content)}
 
 
 def _append_assistant_error(message: str) -> None:
@@ -0,0 +1,3 @@
+from oci_ai.cli import main
+
+main()
@@ -0,0 +1,147 @@
+"""Remove cabeçalhos, rodapés e números de página do texto extraído do PDF.
+
+Uma linha é boilerplate quando aparece (com dígitos trocados por "#") no topo
+ou no fim de muitas páginas: títulos corridos, "Página 3 de 58", números de
+página. A detecção é vetorizada sobre as linhas de todas as páginas de uma vez
+(NumPy). Nas linhas que ficam, os espaços são normalizados, as linhas de
+pontilhado de sumário são encurtadas e as palavras hifenizadas na quebra de
+linha são religadas.
+"""
+
+import os
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+# Linhas do topo e do fim de cada página em que se procura boilerplate.
+ZONE_LINES = int(os.getenv("OCI_AI_BOILERPLATE_ZONE_LINES", "3"))
+# Fração mínima das páginas em que a linha se repete (e nunca menos de MIN_PAGES).
+MIN_RATIO = float(os.getenv("OCI_AI_BOILERPLATE_MIN_RATIO", "0.3"))
+MIN_PAGES = 3
+# Incrementar quando a limpeza mudar (entra na chave do cache de texto).
+CLEAN_VERSION = 1
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_LEADERS = re.compile(r"\s*(?:[_.·…]\s*){4,}\s*")
+# "exérci-\nto" -> "exército"; "presta-\nlhes" -> "presta-lhes" (pronome oblíquo).
+_HYPHEN = re.compile(r"(?<=\w)-\n(?=(\w+))")
+_CLITICS = frozenset(
+    "a as la las lha lhas lhe lhes lho lhos lo los me na nas no nos o os se te vos".split()
+)
+
+
+@dataclass(frozen=True)
+class CleanStats:
+    lines: int
+    dropped: int
+    hyphens: int
+    boilerplate: tuple[str, ...]
+
+
+def _key(line: str) -> str:
+    return _SPACES.sub(" ", _DIGITS.sub("#", line)).strip().lower()
+
+
+def boilerplate_mask(
+    pages: list[list[str]], zone: int = ZONE_LINES, min_ratio: float = MIN_RATIO
+) -> tuple[np.ndarray, list[str]]:
+    """Máscara (plana, na ordem das linhas) das linhas repetidas no topo/fim das páginas."""
+    count = len(pages)
+    lengths = np.fromiter(map(len, pages), dtype=np.int64, count=count)
+    total = int(lengths.sum())
+    keys: dict[str, int] = {}
+    codes = np.fromiter(
+        (keys.setdefault(_key(line), len(keys)) for lines in pages for line in lines),
+        dtype=np.int64,
+        count=total,
+    )
+    threshold = max(MIN_PAGES, int(np.ceil(min_ratio * count)))
+    if count < threshold or not total:
+        return np.zeros(total, dtype=bool), []
+    page = np.repeat(np.arange(count), lengths)
+    offset = np.arange(total) - (np.cumsum(lengths) - lengths)[page]
+    in_zone = (offset < zone) | (lengths[page] - 1 - offset < zone)
+    # Páginas distintas em que cada chave aparece dentro da zona.
+    pairs = np.unique(codes[in_zone] * count + page[in_zone])
+    pages_per_key = np.bincount(pairs // count, minlength=len(keys))
+    repeated = pages_per_key >= threshold
+    blank = keys.get("")
+    if blank is not None:
+        repeated[blank] = False
+    names = list(keys)
+    found = [names[code] for code in np.flatnonzero(repeated)]
+    return in_zone & repeated[codes], found
+
+
+def normalize_page(lines: Iterable[str]) -> tuple[str, int]:
+    kept = []
+    for line in lines:
+        line = _LEADERS.sub(" ... ", line)
+        line = _SPACES.sub(" ", line).strip()
+        if line or (kept and kept[-1]):
+            kept.append(line)
+    text = "\n".join(kept).strip("\n")
+    hyphens = 0
+
+    def _join(match: re.Match) -> str:
+        nonlocal hyphens
+        hyphens += 1
+        return "-" if match.group(1).lower() in _CLITICS else ""
+
+    return _HYPHEN.sub(_join, text), hyphens
+
+
+def strip_boilerplate(
+    pages: Iterable[str], zone: int = ZONE_LINES, min_ratio: float = MIN_RATIO
+) -> tuple[list[str], CleanStats]:
+    split = [page.split("\n") for page in pages]
+    mask, found = boilerplate_mask(split, zone, min_ratio)
+    cleaned = []
+    hyphens = 0
+    start = 0
+    for lines in split:
+        drop = mask[start : start + len(lines)]
+        start += len(lines)
+        text, joined = normalize_page(
+            line for line, dropped in zip(lines, drop) if not dropped
+        )
+        cleaned.append(text)
+        hyphens += joined
+    stats = CleanStats(len(mask), int(mask.sum()), hyphens, tuple(found))
+    return cleaned, stats
+
+
+def clean_pages(pages: Iterable[str]) -> list[str]:
+    return strip_boilerplate(pages)[0]
+
+
+def report(file_path: str) -> None:
+    """Tokens do texto extraído antes e depois da limpeza."""
+    import time
+
+    from oci_ai.payload import count_text_tokens, tokenizer_name
+    from oci_ai.pdftext import join_pages
+    from oci_ai.textcache import DEFAULT_TEXT_CACHE
+
+    raw = list(DEFAULT_TEXT_CACHE.iter_pages(file_path, clean=False))
+    started = time.perf_counter()
+    cleaned, stats = strip_boilerplate(raw)
+    elapsed = time.perf_counter() - started
+    before = count_text_tokens(join_pages(raw))
+    after = count_text_tokens(join_pages(cleaned))
+    print(
+        f"{os.path.basename(file_path)}: {len(raw)} páginas, {stats.lines} linhas; "
+        f"limpeza em {elapsed * 1000:.1f}ms"
+    )
+    print(f"Linhas de boilerplate removidas: {stats.dropped}")
+    for key in stats.boilerplate:
+        print(f"  - {key!r}")
+    print(f"Hifenizações religadas: {stats.hyphens}")
+    print(f"{'texto':<10} {'tokens':>8} {'chars':>9}")
+    print(f"{'original':<10} {before:>8} {sum(map(len, raw)):>9}")
+    print(f"{'limpo':<10} {after:>8} {sum(map(len, cleaned)):>9}")
+    saved = 1 - after / max(before, 1)
+    print(f"Economia: {before - after} tokens ({saved:.1%}, {tokenizer_name()})")
@@ -0,0 +1,609 @@
+"""CLI única para os demos (`python -m oci_ai`).
+
+Só argparse e a stdlib são importados aqui: o módulo de cada demo (e com ele
+openai, langchain, pdfplumber...) é importado apenas pelo subcomando escolhido.
+"""
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que não podem ser carregados só para montar a CLI ou mostrar a ajuda.
+HEAVY_MODULES = (
+    "httpx",
+    "langchain",
+    "langchain_core",
+    "langchain_oci",
+    "numpy",
+    "oci_openai",
+    "openai",
+    "pdfplumber",
+    "pydantic",
+    "streamlit",
+    "tiktoken",
+    "yaml",
+)
+STARTUP_BUDGET_MS = float(os.getenv("OCI_AI_STARTUP_BUDGET_MS", "300"))
+
+_MODE_FUNCTIONS = {
+    "responses": ("run_with_responses_api", "stream_with_responses_api"),
+    "chat": ("run_with_chat_completions", "stream_with_chat_completions"),
+    "memory": ("run_with_conversation_memory", None),
+}
+
+
+@dataclass(frozen=True)
+class Demo:
+    module: str
+    help: str
+    modes: tuple[str, ...] = ("responses",)
+    stream: bool = True
+
+
+DEMOS = {
+    "api": Demo("app_api", "Responses API e Chat Completions", ("responses", "chat")),
+    "context": Demo("app_context", "Texto extraído de PDF no contexto"),
+    "conversation": Demo(
+        "app_conversation",
+        "Conversation Store com seleção de região",
+        ("memory", "responses"),
+    ),
+    "conversation2": Demo(
+        "app_conversation2",
+        "Conversation Store via cabeçalhos",
+        ("memory", "responses"),
+    ),
+    "image": Demo("app_image", "Entrada de imagem"),
+    "langchain": Demo("app_langchain", "ChatOCIOpenAI (LangChain)"),
+    "langchain-output": Demo("app_langchain_output", "Saída estruturada com agente"),
+    "langchain-react": Demo("app_langchain_react", "Agente ReAct com ferramenta"),
+    "output": Demo("app_output", "Saída estruturada (Responses API)"),
+    "pdf": Demo("app_pdf", "Entrada de PDF (input_file)", stream=False),
+    "reasoning": Demo("app_reasoning", "Modelo de raciocínio"),
+    "tool": Demo("app_tool", "Ferramentas (web search)"),
+}
+
+UIS = {"chat": "chat.py", "chat2": "chat2.py"}
+
+
+def _import(name: str):
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return importlib.import_module(name)
+
+
+def _close(module) -> None:
+    for attr in ("client", "clients"):
+        resource = getattr(module, attr, None)
+        close_fn = getattr(resource, "close", None)
+        if callable(close_fn):
+            close_fn()
+
+
+def run_demo(args: argparse.Namespace) -> None:
+    demo = DEMOS[args.command]
+    mode = args.mode or demo.modes[0]
+    run_name, stream_name = _MODE_FUNCTIONS[mode]
+    stream = demo.stream if args.stream is None else args.stream
+    if stream and stream_name is None:
+        raise SystemExit(f"O modo {mode} não tem versão em stream (use --no-stream)")
+    module = _import(demo.module)
+    module.PRINT_RAW = args.raw
+    if args.model:
+        module.MODEL_ID = args.model
+    fn = getattr(module, stream_name if stream else run_name)
+    try:
+        clients = getattr(module, "clients", None)
+        if clients is not None and len(clients.selector.regions) > 1:
+            clients.selector.probe()
+        for index in range(args.repeat):
+            if args.repeat > 1:
+                print(f"\n── execução {index + 1}/{args.repeat} ──")
+            fn()
+    finally:
+        _close(module)
+
+
+def run_classif(args: argparse.Namespace) -> None:
+    module = _import("call_classif")
+    if args.model:
+        module.MODEL_TIER = args.model
+    module.serve_metrics_from_env()
+    if not args.frases:
+        module.main()
+        return
+    for _ in range(args.repeat):
+        for fala, item in zip(args.frases, module.classificar_lote(args.frases)):
+            if item is None:
+                print({"fala": fala, "erro": "Nao foi possivel fazer a classificacao."})
+            else:
+                print(item.model_dump())
+
+
+def run_litellm(args: argparse.Namespace) -> None:
+    module = _import("call_litellm")
+    if args.model:
+        module.MODEL_TIER = args.model
+    for _ in range(args.repeat):
+        module.main()
+
+
+def run_ledger(args: argparse.Namespace) -> None:
+    from oci_ai import ledger
+
+    ledger.main(args.extra, prog="oci-ai ledger")
+
+
+def run_ui(args: argparse.Namespace) -> None:
+    script = os.path.join(ROOT, UIS[args.app])
+    raise SystemExit(subprocess.call([sys.executable, "-m", "streamlit", "run", script]))
+
+
+def run_bench_warmup(args: argparse.Namespace) -> None:
+    from oci_ai.warmup import benchmark
+
+    benchmark(args.url, rounds=args.rounds, connections=args.connections)
+
+
+def run_bench_signing(args: argparse.Namespace) -> None:
+    from oci_ai.signing import benchmark
+
+    benchmark(
+        workers=tuple(args.workers),
+        requests=args.requests,
+        config_file=args.config_file,
+    )
+
+
+def run_bench_compression(args: argparse.Namespace) -> None:
+    from oci_ai.compression import benchmark
+
+    benchmark(bandwidths_mbps=tuple(args.mbps), url=args.url)
+
+
+def run_bench_pdf(args: argparse.Namespace) -> None:
+    from oci_ai.pdftext import benchmark
+
+    benchmark(args.pdf, workers=tuple(args.workers), copies=tuple(args.copies))
+
+
+def run_bench_pipeline(args: argparse.Namespace) -> None:
+    from oci_ai.pipeline import benchmark
+
+    benchmark(args.pdf, copies=tuple(args.copies))
+
+
+def run_bench_retrieval(args: argparse.Namespace) -> None:
+    from oci_ai.retrieval import TOP_K, report
+
+    kwargs = {}
+    if args.live:
+        module = _import("app_context")
+        kwargs = {
+            "client": module.client.get(),
+            "model": args.model or module.MODEL_ID,
+            "instructions": module.SYSTEM_PROMPT,
+        }
+    try:
+        report(args.pdf, args.question, args.top_k or TOP_K, **kwargs)
+    finally:
+        if args.live:
+            _close(module)
+
+
+def run_bench_vectors(args: argparse.Namespace) -> None:
+    from oci_ai.vectors import benchmark
+
+    benchmark(
+        rows=args.rows,
+        dim=args.dim,
+        workers=tuple(args.workers),
+        queries=args.queries,
+        file_path=args.pdf,
+        question=args.question,
+    )
+
+
+def run_bench_mapreduce(args: argparse.Namespace) -> None:
+    from oci_ai.mapreduce import MAP_CHUNK_TOKENS, MAX_IN_FLIGHT, report
+
+    kwargs = {}
+    if args.live:
+        module = _import("app_context")
+        kwargs = {
+            "client": module.client.get(),
+            "model": args.model or module.MODEL_ID,
+            "instructions": module.SYSTEM_PROMPT,
+        }
+    try:
+        report(
+            args.pdf,
+            args.question,
+            max_tokens=args.chunk_tokens or MAP_CHUNK_TOKENS,
+            max_in_flight=args.max_in_flight or MAX_IN_FLIGHT,
+            **kwargs,
+        )
+    finally:
+        if args.live:
+            _close(module)
+
+
+def run_plan_context(args: argparse.Namespace) -> None:
+    from oci_ai.models import load_client_models, load_models
+    from oci_ai.planner import OUTPUT_TOKENS, report
+
+    models = args.model or [
+        spec.provider_model.split("/", 1)[-1] for spec in load_models().values()
+    ] + list(load_client_models())
+    report(
+        args.pdf,
+        args.question,
+        models,
+        output_tokens=args.output_tokens or OUTPUT_TOKENS,
+    )
+
+
+def run_bench_boilerplate(args: argparse.Namespace) -> None:
+    from oci_ai.boilerplate import report
+
+    report(args.pdf)
+
+
+def run_ingest(args: argparse.Namespace) -> None:
+    from oci_ai.corpus import DEFAULT_CORPUS_DB, Corpus, print_file, report
+
+    corpus = Corpus(args.db or DEFAULT_CORPUS_DB)
+    try:
+        result = corpus.ingest(
+            args.directory,
+            workers=args.workers,
+            pattern=args.pattern,
+            retry_failed=args.retry_failed,
+            on_file=print_file,
+        )
+        report(result)
+        if args.search:
+            for hit in corpus.search(args.search):
+                print(f"  {hit.passage.score:6.2f}  {hit.label}")
+    finally:
+        corpus.close()
+
+
+def run_bench_multimodal(args: argparse.Namespace) -> None:
+    from oci_ai.multimodal import benchmark
+
+    benchmark(size_mb=args.size_mb, path=args.pdf)
+
+
+def run_bench_files(args: argparse.Namespace) -> None:
+    from oci_ai.files import report
+
+    report(args.pdf, questions=args.questions)
+
+
+def run_bench_subset(args: argparse.Namespace) -> None:
+    from oci_ai.subset import report
+
+    kwargs = {}
+    if args.live:
+        module = _import("app_pdf")
+        kwargs = {
+            "client": module.clients.client(args.model or module.PDF_MODEL_ID),
+            "model": args.model or module.PDF_MODEL_ID,
+            "instructions": module.SYSTEM_PROMPT,
+        }
+    try:
+        report(args.pdf, args.question, args.pages, **kwargs)
+    finally:
+        if args.live:
+            _close(module)
+
+
+def help_timings(runs: int) -> list[float]:
+    """Milissegundos de `python -m oci_ai --help` em processos novos."""
+    command = [sys.executable, "-m", "oci_ai", "--help"]
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def heavy_imports() -> str:
+    """HEAVY_MODULES carregados só para montar a CLI (vazio se nenhum)."""
+    probe = (
+        "import sys; from oci_ai import cli; cli.build_parser(); "
+        "print(','.join(m for m in cli.HEAVY_MODULES if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def check_startup(args: argparse.Namespace) -> None:
+    timings = help_timings(args.runs)
+    loaded = heavy_imports()
+    best = min(timings)
+    median = sorted(timings)[len(timings) // 2]
+    print(
+        f"--help: melhor {best:.0f}ms, mediana {median:.0f}ms "
+        f"({args.runs} execuções; orçamento {args.budget_ms:.0f}ms)"
+    )
+    failures = []
+    if best > args.budget_ms:
+        failures.append(f"inicialização acima do orçamento ({best:.0f}ms)")
+    if loaded:
+        failures.append(f"módulos pesados importados só para a ajuda: {loaded}")
+    if failures:
+        raise SystemExit("FALHOU: " + "; ".join(failures))
+    print("OK")
+
+
+def _add_common(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--model", help="modelo (ou tier do config.yaml)")
+    parser.add_argument(
+        "--repeat", type=int, default=1, metavar="N", help="repetir N vezes"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="oci-ai", description="Demos OCI Generative AI (OpenAI compatível)."
+    )
+    sub = parser.add_subparsers(dest="command", required=True, metavar="comando")
+    for name, demo in DEMOS.items():
+        demo_parser = sub.add_parser(name, help=demo.help)
+        demo_parser.add_argument(
+            "--mode", choices=demo.modes, help=f"padrão: {demo.modes[0]}"
+        )
+        demo_parser.add_argument(
+            "--stream",
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help=f"resposta em stream (padrão: {'sim' if demo.stream else 'não'})",
+        )
+        demo_parser.add_argument(
+            "--raw", action="store_true", help="imprime os eventos/JSON brutos"
+        )
+        _add_common(demo_parser)
+        demo_parser.set_defaults(handler=run_demo)
+
+    classif = sub.add_parser("classif", help="Classificação de motivo de contato")
+    classif.add_argument("frases", nargs="*", help="falas a classificar")
+    _add_common(classif)
+    classif.set_defaults(handler=run_classif)
+
+    litellm = sub.add_parser("litellm", help="Chamada via proxy LiteLLM")
+    _add_common(litellm)
+    litellm.set_defaults(handler=run_litellm)
+
+    # Argumentos do relatório seguem para oci_ai.ledger (--since, --by, --tag...).
+    ledger = sub.add_parser("ledger", help="Relatório de uso de tokens", add_help=False)
+    ledger.set_defaults(handler=run_ledger)
+
+    ui = sub.add_parser("ui", help="Interfaces Streamlit")
+    ui.add_argument("app", choices=sorted(UIS))
+    ui.set_defaults(handler=run_ui)
+
+    bench_warmup = sub.add_parser(
+        "bench-warmup", help="Primeira requisição com e sem warm-up"
+    )
+    bench_warmup.add_argument(
+        "--url",
+        default=os.getenv("OCI_BASE_URL")
+        or "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com/",
+    )
+    bench_warmup.add_argument("--rounds", type=int, default=5)
+    bench_warmup.add_argument("--connections", type=int, default=2)
+    bench_warmup.set_defaults(handler=run_bench_warmup)
+
+    bench_signing = sub.add_parser(
+        "bench-signing", help="Custo da assinatura OCI por requisição"
+    )
+    bench_signing.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 10, 100], metavar="N"
+    )
+    bench_signing.add_argument("--requests", type=int, default=2000)
+    bench_signing.add_argument(
+        "--config-file", help="usa a chave do perfil OCI (padrão: chave temporária)"
+    )
+    bench_signing.set_defaults(handler=run_bench_signing)
+
+    bench_compression = sub.add_parser(
+        "bench-compression", help="Bytes e tempo de upload com gzip/zstd (PDF e PNG)"
+    )
+    bench_compression.add_argument(
+        "--mbps", type=float, nargs="+", default=[10.0, 50.0], metavar="N"
+    )
+    bench_compression.add_argument(
+        "--url", help="mede também o upload real (POST) para esta URL"
+    )
+    bench_compression.set_defaults(handler=run_bench_compression)
+
+    bench_pdf = sub.add_parser(
+        "bench-pdf", help="Extração de texto de PDF por número de processos"
+    )
+    bench_pdf.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_pdf.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], metavar="N"
+    )
+    bench_pdf.add_argument(
+        "--copies",
+        type=int,
+        nargs="+",
+        default=[1, 4],
+        metavar="N",
+        help="PDFs sintéticos com N cópias das páginas",
+    )
+    bench_pdf.set_defaults(handler=run_bench_pdf)
+
+    bench_pipeline = sub.add_parser(
+        "bench-pipeline", help="Pico de memória: texto inteiro vs. pipeline de páginas"
+    )
+    bench_pipeline.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_pipeline.add_argument(
+        "--copies", type=int, nargs="+", default=[1, 4], metavar="N"
+    )
+    bench_pipeline.set_defaults(handler=run_bench_pipeline)
+
+    bench_retrieval = sub.add_parser(
+        "bench-retrieval", help="Tokens e latência: livro inteiro vs. trechos BM25"
+    )
+    bench_retrieval.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_retrieval.add_argument(
+        "--question", default="Me descreva em tópicos as lições principais do livro"
+    )
+    bench_retrieval.add_argument(
+        "--top-k", type=int, help="trechos (padrão: OCI_AI_RETRIEVAL_TOP_K)"
+    )
+    bench_retrieval.add_argument(
+        "--live", action="store_true", help="chama o modelo (app_context) nos dois modos"
+    )
+    bench_retrieval.add_argument("--model", help="modelo para --live")
+    bench_retrieval.set_defaults(handler=run_bench_retrieval)
+
+    bench_vectors = sub.add_parser(
+        "bench-vectors", help="Índice vetorial em mmap: memória por processo e busca"
+    )
+    bench_vectors.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_vectors.add_argument("--question", default="Como usar espiões na guerra?")
+    bench_vectors.add_argument("--rows", type=int, default=100_000)
+    bench_vectors.add_argument("--dim", type=int, default=384)
+    bench_vectors.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 4], metavar="N"
+    )
+    bench_vectors.add_argument("--queries", type=int, default=50)
+    bench_vectors.set_defaults(handler=run_bench_vectors)
+
+    bench_mapreduce = sub.add_parser(
+        "bench-mapreduce", help="Map-reduce: sequencial vs. concorrente vs. cache"
+    )
+    bench_mapreduce.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_mapreduce.add_argument(
+        "--question", default="Me descreva em tópicos as lições principais do livro"
+    )
+    bench_mapreduce.add_argument(
+        "--chunk-tokens", type=int, help="padrão: OCI_AI_MAP_CHUNK_TOKENS"
+    )
+    bench_mapreduce.add_argument(
+        "--max-in-flight", type=int, help="padrão: OCI_AI_MAP_MAX_IN_FLIGHT"
+    )
+    bench_mapreduce.add_argument(
+        "--live", action="store_true", help="chama o modelo (sem isso, só o plano)"
+    )
+    bench_mapreduce.add_argument("--model", help="modelo para --live")
+    bench_mapreduce.set_defaults(handler=run_bench_mapreduce)
+
+    plan = sub.add_parser(
+        "plan-context", help="Estratégia de contexto (full, bm25, mapreduce) por modelo"
+    )
+    plan.add_argument("--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf"))
+    plan.add_argument(
+        "--question", default="Me descreva em tópicos as lições principais do livro"
+    )
+    plan.add_argument(
+        "--model", nargs="+", help="modelos (padrão: todos do config.yaml)"
+    )
+    plan.add_argument(
+        "--output-tokens",
+        type=int,
+        help="saída reservada (padrão: OCI_AI_PLAN_OUTPUT_TOKENS)",
+    )
+    plan.set_defaults(handler=run_plan_context)
+
+    bench_boilerplate = sub.add_parser(
+        "bench-boilerplate", help="Tokens antes e depois de remover cabeçalhos e rodapés"
+    )
+    bench_boilerplate.add_argument(
+        "--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf")
+    )
+    bench_boilerplate.set_defaults(handler=run_bench_boilerplate)
+
+    ingest = sub.add_parser(
+        "ingest", help="Ingestão incremental de um diretório de PDFs (corpus BM25)"
+    )
+    ingest.add_argument("directory")
+    ingest.add_argument(
+        "--workers",
+        type=int,
+        help="processos de extração (padrão: OCI_AI_CORPUS_WORKERS)",
+    )
+    ingest.add_argument("--pattern", default="*.pdf")
+    ingest.add_argument("--db", help="banco do corpus (padrão: OCI_AI_CORPUS_DB)")
+    ingest.add_argument(
+        "--retry-failed", action="store_true", help="tenta de novo arquivos com erro"
+    )
+    ingest.add_argument("--search", help="busca no corpus depois da ingestão")
+    ingest.set_defaults(handler=run_ingest)
+
+    bench_multimodal = sub.add_parser(
+        "bench-multimodal",
+        help="Pico de RSS enviando um PDF: base64 inteiro, auth padrão e em blocos",
+    )
+    bench_multimodal.add_argument("--size-mb", type=int, default=50)
+    bench_multimodal.add_argument("--pdf", help="padrão: PDF sintético de --size-mb")
+    bench_multimodal.set_defaults(handler=run_bench_multimodal)
+
+    bench_files = sub.add_parser(
+        "bench-files", help="Bytes por pergunta: PDF inline vs. enviado uma vez (Files API)"
+    )
+    bench_files.add_argument("--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf"))
+    bench_files.add_argument("--questions", type=int, default=5)
+    bench_files.set_defaults(handler=run_bench_files)
+
+    bench_subset = sub.add_parser(
+        "bench-subset",
+        help="Sub-PDF por páginas: bytes, tokens e latência vs. PDF inteiro",
+    )
+    bench_subset.add_argument("--pdf", default=os.path.join(ROOT, "A-ARTE-DA-GUERRA.pdf"))
+    bench_subset.add_argument("--question", default="Como usar espiões na guerra?")
+    bench_subset.add_argument(
+        "--pages", default="auto", help='"1-5,12" ou "auto" (busca pela pergunta)'
+    )
+    bench_subset.add_argument(
+        "--live", action="store_true", help="chama o modelo (app_pdf)"
+    )
+    bench_subset.add_argument("--model", help="padrão: PDF_MODEL_ID de app_pdf.py")
+    bench_subset.set_defaults(handler=run_bench_subset)
+
+    startup = sub.add_parser(
+        "check-startup", help="Verifica o orçamento de tempo de inicialização"
+    )
+    startup.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    startup.add_argument("--runs", type=int, default=5)
+    startup.set_defaults(handler=check_startup)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "ledger":
+        parser.error(f"argumentos não reconhecidos: {' '.join(extra)}")
+    args.extra = extra
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import ipaddress
+import logging
+import urllib.request
+
+import httpx
+from openai import OpenAI
+
+from oci_ai.compression import DEFAULT_COMPRESSION, CompressingAuth, CompressionPolicy
+from oci_ai.ledger import DEFAULT_LEDGER, LedgerTransport, UsageLedger
+from oci_ai.multimodal import InlineFilesAuth, InlineFilesTransport
+from oci_ai.nettrace import (
+    NetworkTimingTransport,
+    TimedAuth,
+    TimedDNSBackend,
+    install_network_backend,
+)
+from oci_ai.ratelimit import DEFAULT_RATE_LIMITER, RateLimiter, RateLimitTransport
+from oci_ai.resilience import DEFAULT_RESILIENCE, Resilience, ResilientTransport
+from oci_ai.routing import DEFAULT_ROUTER, ModelRouter, RouterStatsTransport
+from oci_ai.tracing import TracingTransport
+from oci_ai.warmup import (
+    SSL_CONTEXT,
+    WARMUP_CONNECTIONS,
+    SessionReuseBackend,
+    warm_up,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    # Internos do httpx (faixa fixada no pyproject.toml): os proxies do ambiente
+    # e o casamento de URL do httpx.Client, para montar a pilha em cada proxy.
+    from httpx._utils import URLPattern, get_environment_proxies
+except ImportError:
+    URLPattern = get_environment_proxies = None
+    logger.warning(
+        "httpx %s sem httpx._utils.get_environment_proxies; lendo proxies pela stdlib"
+        " e sem warm-up via proxy",
+        httpx.__version__,
+    )
+
+
+def _environment_proxies() -> dict[str, str | None]:
+    """Mounts (padrão -> URL do proxy, ou None para NO_PROXY) do ambiente."""
+    if get_environment_proxies is not None:
+        return get_environment_proxies()
+    # Mesmas chaves que o httpx monta (um httpx.Client com transport próprio
+    # ignora os proxies do ambiente, então não dá para deixar com ele).
+    info = urllib.request.getproxies()
+    mounts: dict[str, str | None] = {}
+    for scheme in ("http", "https", "all"):
+        if info.get(scheme):
+            url = info[scheme]
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+    for host in (h.strip() for h in info.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+            continue
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            pattern = host if host.lower() == "localhost" else f"*{host}"
+        else:
+            pattern = f"[{host}]" if address.version == 6 else host
+        mounts[f"all://{pattern}"] = None
+    return mounts
+
+
+def _network_transport(proxy: httpx.Proxy | None = None) -> httpx.HTTPTransport:
+    network = httpx.HTTPTransport(verify=SSL_CONTEXT, proxy=proxy)
+    # Sessões TLS retomadas entre reconexões (e entre clientes do processo).
+    install_network_backend(network, SessionReuseBackend(TimedDNSBackend()))
+    return network
+
+
+def build_http_client(
+    *,
+    auth: httpx.Auth | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+    rate_limiter: RateLimiter | None = DEFAULT_RATE_LIMITER,
+    resilience: Resilience | None = DEFAULT_RESILIENCE,
+    router: ModelRouter | None = DEFAULT_ROUTER,
+    ledger: UsageLedger | None = DEFAULT_LEDGER,
+    warmup_url: str | None = None,
+    warmup_connections: int = WARMUP_CONNECTIONS,
+    warmup_wait: bool = False,
+    compression: CompressionPolicy | None = DEFAULT_COMPRESSION,
+) -> httpx.Client:
+    # Proxies de HTTPS_PROXY/ALL_PROXY/NO_PROXY, como um httpx.Client sem transport
+    # próprio: cada proxy ganha sua pilha de transportes, com o mesmo TLS e DNS.
+    proxies = _environment_proxies()
+    network = _network_transport()
+    networks = {
+        pattern: _network_transport(httpx.Proxy(url))
+        for pattern, url in proxies.items()
+        if url is not None
+    }
+    if (
+        warmup_url is not None
+        and warmup_connections > 0
+        and (URLPattern is not None or not proxies)
+    ):
+        url = httpx.URL(warmup_url)
+        # Padrão mais específico primeiro, como no roteamento do httpx.Client.
+        matched = next(
+            (p.pattern for p in sorted(map(URLPattern, proxies)) if p.matches(url)), None
+        )
+        warm_up(
+            networks.get(matched, network),
+            warmup_url,
+            auth=auth,
+            connections=warmup_connections,
+            wait=warmup_wait,
+        )
+
+    def _stack(network: httpx.BaseTransport) -> httpx.BaseTransport:
+        # Fases de rede (DNS, connect, TLS, envio, TTFB, corpo) de cada tentativa;
+        # as data URLs de input_file/input_image só são codificadas no envio.
+        transport: httpx.BaseTransport = NetworkTimingTransport(
+            InlineFilesTransport(network)
+        )
+        if router is not None:
+            # Mais perto da rede: mede TTFT e vazão de cada tentativa.
+            transport = RouterStatsTransport(transport, router)
+        if rate_limiter is not None:
+            transport = RateLimitTransport(transport, rate_limiter)
+        if resilience is not None:
+            # Por fora do limitador: cada nova tentativa também consome cota.
+            transport = ResilientTransport(transport, resilience)
+        if ledger is not None:
+            # Um registro de uso por chamada bem-sucedida (não por tentativa).
+            transport = LedgerTransport(transport, ledger)
+        # Span por chamada de modelo, incluindo esperas de cota e novas tentativas.
+        return TracingTransport(transport)
+
+    transport = _stack(network)
+    mounts = {
+        pattern: _stack(networks[pattern]) if pattern in networks else None
+        for pattern in proxies
+    }
+    kwargs = {}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if auth is not None:
+        streams = getattr(auth, "streams_inline_files", False)
+        auth = TimedAuth(auth)
+        if not streams:
+            # Auth que assina o corpo pronto: recebe as data URLs já expandidas.
+            auth = InlineFilesAuth(auth)
+    if compression is not None and compression.enabled:
+        # Antes da assinatura: o x-content-sha256 precisa cobrir o corpo comprimido.
+        auth = CompressingAuth(auth, compression)
+    return httpx.Client(
+        auth=auth, headers=headers, transport=transport, mounts=mounts, **kwargs
+    )
+
+
+def build_openai_client(
+    base_url: str,
+    *,
+    api_key: str = "OCI",
+    auth: httpx.Auth | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+    rate_limiter: RateLimiter | None = DEFAULT_RATE_LIMITER,
+    resilience: Resilience | None = DEFAULT_RESILIENCE,
+    router: ModelRouter | None = DEFAULT_ROUTER,
+    ledger: UsageLedger | None = DEFAULT_LEDGER,
+    warmup_connections: int = WARMUP_CONNECTIONS,
+    compression: CompressionPolicy | None = DEFAULT_COMPRESSION,
+) -> OpenAI:
+    http_client = build_http_client(
+        auth=auth,
+        headers=headers,
+        timeout=timeout,
+        rate_limiter=rate_limiter,
+        resilience=resilience,
+        router=router,
+        ledger=ledger,
+        warmup_url=base_url,
+        warmup_connections=warmup_connections,
+        compression=compression,
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        # As novas tentativas ficam na camada de resiliência (backoff + breaker).
+        max_retries=0 if resilience is not None else 2,
+    )
+
+
+def close_client(client: OpenAI) -> None:
+    close_fn = getattr(client, "close", None)
+    if callable(close_fn):
+        close_fn()
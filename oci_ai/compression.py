@@ -0,0 +1,268 @@
+import base64
+import fnmatch
+import functools
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+
+import httpx
+
+from oci_ai.multimodal import LENGTH_EXTENSION, body_size, has_inline_files
+from oci_ai.payload import JSON_EXTENSION, request_json
+
+logger = logging.getLogger(__name__)
+
+# OCI_AI_COMPRESSION: "gzip", "zstd" ou regras por host, ex.:
+#   localhost:4000=gzip,*.oraclecloud.com=off
+# Vazio (padrão) não comprime nada: nem o endpoint da OCI nem o LiteLLM
+# descompactam corpo de requisição sem configuração do lado servidor.
+COMPRESSION = os.getenv("OCI_AI_COMPRESSION", "")
+MIN_BYTES = int(os.getenv("OCI_AI_COMPRESSION_MIN_BYTES", "16384"))
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+ENCODINGS = ("gzip", "zstd")
+# 415 sempre indica Content-Encoding recusado; um 400 só quando a mensagem fala
+# da codificação (JSON inválido após o servidor ignorar o Content-Encoding).
+_ENCODING_HINTS = ("encoding", "gzip", "zstd", "decompress", "decode", "invalid json")
+
+
+@functools.lru_cache(maxsize=None)
+def _zstd_compressor(level: int):
+    try:
+        import zstandard
+    except ImportError:
+        try:
+            from compression import zstd  # Python 3.14+
+        except ImportError:
+            return None
+        return lambda data: zstd.compress(data, level=level)
+    return zstandard.ZstdCompressor(level=level).compress
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "zstd":
+        compressor = _zstd_compressor(ZSTD_LEVEL)
+        if compressor is None:
+            raise RuntimeError("zstd indisponível (uv sync --extra zstd)")
+        return compressor(body)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def encoder(encoding: str):
+    """Compressor incremental (compress/flush) para corpos montados em blocos."""
+    if encoding == "gzip":
+        # wbits=31: formato gzip com mtime 0, a mesma saída a cada passada.
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    if encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            try:
+                from compression import zstd  # Python 3.14+
+            except ImportError:
+                raise RuntimeError("zstd indisponível (uv sync --extra zstd)") from None
+            return zstd.ZstdCompressor(level=ZSTD_LEVEL)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+class CompressionPolicy:
+    def __init__(self, rules: dict[str, str] | None = None, min_bytes: int = MIN_BYTES):
+        self._rules = dict(rules or {})
+        self._min_bytes = min_bytes
+        self._rejected: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        for pattern, encoding in self._rules.items():
+            if encoding not in ENCODINGS + ("off",):
+                raise ValueError(f"Compressão inválida para {pattern}: {encoding}")
+            if encoding == "zstd" and _zstd_compressor(ZSTD_LEVEL) is None:
+                logger.warning("zstd indisponível para %s; usando gzip", pattern)
+                self._rules[pattern] = "gzip"
+
+    @classmethod
+    def from_string(cls, value: str, min_bytes: int = MIN_BYTES) -> "CompressionPolicy":
+        rules: dict[str, str] = {}
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            pattern, sep, encoding = item.rpartition("=")
+            rules[pattern if sep else "*"] = encoding.strip().lower()
+        return cls(rules, min_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return any(encoding != "off" for encoding in self._rules.values())
+
+    def encoding_for(self, url: httpx.URL) -> str | None:
+        hosts = (url.netloc.decode("ascii"), url.host)
+        encoding = None
+        # Regra mais específica (padrão mais longo) vence.
+        for pattern in sorted(self._rules, key=len, reverse=True):
+            if any(fnmatch.fnmatch(host, pattern) for host in hosts):
+                encoding = self._rules[pattern]
+                break
+        if encoding in (None, "off"):
+            return None
+        with self._lock:
+            if (url.host, encoding) in self._rejected:
+                return None
+        return encoding
+
+    def reject(self, url: httpx.URL, encoding: str) -> None:
+        logger.warning(
+            "%s não aceitou corpo %s; enviando sem compressão", url.host, encoding
+        )
+        with self._lock:
+            self._rejected.add((url.host, encoding))
+
+    def should_compress(self, request: httpx.Request) -> str | None:
+        if request.method not in ("POST", "PUT", "PATCH"):
+            return None
+        if "content-encoding" in request.headers:
+            return None
+        # Com input_file/input_image, conta o corpo com as data URLs expandidas.
+        if body_size(request) < self._min_bytes:
+            return None
+        return self.encoding_for(request.url)
+
+
+DEFAULT_COMPRESSION = CompressionPolicy.from_string(COMPRESSION)
+
+
+def compressed_request(request: httpx.Request, encoding: str) -> httpx.Request:
+    # Os transportes (cota, router, breaker, ledger, tracing) leem modelo e prompt
+    # do JSON; depois de comprimido, o corpo não é mais legível para eles.
+    request.extensions[JSON_EXTENSION] = request_json(request)
+    headers = request.headers.copy()
+    headers["content-encoding"] = encoding
+    body = request.content
+    if not has_inline_files(body):
+        body = compress(body, encoding)
+        headers["content-length"] = str(len(body))
+    # Com marcadores de input_file/input_image, o corpo fica como está: as data URLs
+    # são expandidas e comprimidas em blocos depois (InlineBody em multimodal.py),
+    # e a assinatura e o transporte calculam o tamanho comprimido.
+    extensions = dict(request.extensions)
+    extensions.pop(LENGTH_EXTENSION, None)
+    return httpx.Request(
+        request.method,
+        request.url,
+        headers=headers,
+        content=body,
+        extensions=extensions,
+    )
+
+
+def _rejects_encoding(response: httpx.Response) -> bool:
+    if response.status_code == 415:
+        return True
+    if response.status_code != 400:
+        return False
+    # O corpo só é lido aqui, num 400: respostas em stream seguem intactas.
+    response.read()
+    text = response.text.lower()
+    return any(hint in text for hint in _ENCODING_HINTS)
+
+
+class CompressingAuth(httpx.Auth):
+    """Comprime o corpo antes da auth interna, para a assinatura cobrir o corpo final."""
+
+    requires_request_body = True
+    requires_response_body = True
+
+    def __init__(self, inner: httpx.Auth | None, policy: CompressionPolicy) -> None:
+        self._inner = inner
+        self._policy = policy
+
+    def _send(self, request: httpx.Request):
+        if self._inner is None:
+            return (yield request)
+        flow = self._inner.sync_auth_flow(request)
+        outgoing = next(flow)
+        while True:
+            response = yield outgoing
+            try:
+                outgoing = flow.send(response)
+            except StopIteration:
+                return response
+
+    def sync_auth_flow(self, request: httpx.Request):
+        request.read()
+        encoding = self._policy.should_compress(request)
+        if encoding is None:
+            yield from self._send(request)
+            return
+        response = yield from self._send(compressed_request(request, encoding))
+        if _rejects_encoding(response):
+            # Negociação: desliga a compressão para o host e reenvia sem ela.
+            self._policy.reject(request.url, encoding)
+            response.close()
+            yield from self._send(request)
+
+
+def _sample_payloads() -> dict[str, bytes]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = {
+        "pdf (input_file)": ("A-ARTE-DA-GUERRA.pdf", "application/pdf", "input_file"),
+        "png (input_image)": ("LENNA.png", "image/png", "input_image"),
+    }
+    payloads = {}
+    for label, (name, mime, kind) in samples.items():
+        with open(os.path.join(root, name), "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        part = (
+            {"type": kind, "filename": name, "file_data": f"data:{mime};base64,{data}"}
+            if kind == "input_file"
+            else {"type": kind, "image_url": f"data:{mime};base64,{data}"}
+        )
+        payload = {
+            "model": "openai.gpt-5",
+            "input": [{"role": "user", "content": [part]}],
+        }
+        payloads[label] = json.dumps(payload).encode("utf-8")
+    return payloads
+
+
+def benchmark(bandwidths_mbps: tuple[float, ...] = (10.0, 50.0), url: str | None = None) -> None:
+    """Bytes na rede e tempo de upload das amostras do repositório por codificação."""
+    encodings = ["identity", "gzip"]
+    if _zstd_compressor(ZSTD_LEVEL) is not None:
+        encodings.append("zstd")
+    header = f"{'amostra':<18} {'codif.':<8} {'bytes':>10} {'razão':>6} {'compr.':>8}"
+    header += "".join(f" {f'@{mbps:g}Mbps':>10}" for mbps in bandwidths_mbps)
+    if url:
+        header += f" {'upload real':>12}"
+    print(header)
+    client = httpx.Client(timeout=120) if url else None
+    try:
+        for label, body in _sample_payloads().items():
+            for encoding in encodings:
+                started = time.perf_counter()
+                data = body if encoding == "identity" else compress(body, encoding)
+                elapsed = time.perf_counter() - started
+                line = (
+                    f"{label:<18} {encoding:<8} {len(data):>10} "
+                    f"{len(data) / len(body):>6.2f} {elapsed * 1000:>6.1f}ms"
+                )
+                for mbps in bandwidths_mbps:
+                    upload = elapsed + len(data) * 8 / (mbps * 1_000_000)
+                    line += f" {upload * 1000:>8.0f}ms"
+                if client is not None:
+                    headers = {"content-type": "application/json"}
+                    if encoding != "identity":
+                        headers["content-encoding"] = encoding
+                    started = time.perf_counter()
+                    client.post(url, content=data, headers=headers).read()
+                    line += f" {(time.perf_counter() - started + elapsed) * 1000:>10.0f}ms"
+                print(line)
+    finally:
+        if client is not None:
+            client.close()
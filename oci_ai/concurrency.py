@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TypeVar
+
+import httpx
+from openai import APIConnectionError, APIStatusError
+
+from oci_ai import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+LIMIT_GAUGE = metrics.gauge(
+    "oci_ai_concurrency_limit",
+    "Limite atual de requisições simultâneas (AIMD)",
+    ("limiter",),
+)
+IN_FLIGHT_GAUGE = metrics.gauge(
+    "oci_ai_concurrency_in_flight",
+    "Requisições em andamento",
+    ("limiter",),
+)
+
+
+def status_code_of(exc: BaseException) -> int | None:
+    if isinstance(exc, APIStatusError):
+        return exc.status_code
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_overload(exc: BaseException) -> bool:
+    status = status_code_of(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(
+        exc, (APIConnectionError, httpx.TimeoutException, TimeoutError)
+    )
+
+
+class AIMDLimiter:
+    def __init__(
+        self,
+        name: str = "default",
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_spike: float = 2.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._increase = increase
+        self._backoff = backoff
+        self._latency_spike = latency_spike
+        self._smoothing = smoothing
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _publish(self) -> None:
+        LIMIT_GAUGE.set(self.limit, limiter=self.name)
+        IN_FLIGHT_GAUGE.set(self._in_flight, limiter=self.name)
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self._publish()
+
+    def release(self, latency: float | None = None, overloaded: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            spike = (
+                latency is not None
+                and self._baseline is not None
+                and latency > self._baseline * self._latency_spike
+            )
+            if overloaded or spike:
+                self._decrease(latency, "sobrecarga" if overloaded else "latência")
+            else:
+                if latency is not None:
+                    self._baseline = (
+                        latency
+                        if self._baseline is None
+                        else self._baseline
+                        + self._smoothing * (latency - self._baseline)
+                    )
+                # Aumento aditivo: ~+increase por "janela" de `limit` respostas.
+                self._limit = min(
+                    float(self.max_limit), self._limit + self._increase / self._limit
+                )
+            self._publish()
+            self._cond.notify_all()
+
+    def _decrease(self, latency: float | None, reason: str) -> None:
+        now = time.monotonic()
+        # Um corte por janela: respostas que já estavam em voo não cortam de novo.
+        window = self._baseline or latency or 0.0
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self._backoff)
+        logger.info(
+            "AIMD %s: limite %s -> %s (%s)", self.name, previous, self.limit, reason
+        )
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            self.release(time.monotonic() - started, overloaded=is_overload(exc))
+            raise
+        self.release(time.monotonic() - started)
+
+
+def adaptive_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    limiter: AIMDLimiter,
+    return_exceptions: bool = False,
+) -> list[R | BaseException]:
+    def _run(item: T) -> R | BaseException:
+        try:
+            with limiter.slot():
+                return fn(item)
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            return exc
+
+    with ThreadPoolExecutor(max_workers=limiter.max_limit) as pool:
+        return list(pool.map(_run, items))
@@ -0,0 +1,389 @@
+"""Ingestão de um diretório de PDFs com reindexação incremental.
+
+`Corpus.ingest` varre o diretório e compara o SHA-256 de cada arquivo (com o
+pré-filtro de tamanho/mtime do cache de texto) com o da última ingestão. Só
+arquivos novos ou alterados são extraídos, num pool de processos que grava no
+cache de texto. Os trechos e o índice BM25 de cada arquivo ficam em SQLite
+(`passages` e `postings`) e são trocados só para os arquivos que mudaram;
+arquivos apagados saem do índice. Tempo e erro de cada arquivo ficam em `files`.
+"""
+
+import fnmatch
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from oci_ai.pipeline import chunk_pages
+from oci_ai.retrieval import (
+    PASSAGE_CHARS,
+    PASSAGE_OVERLAP,
+    TOP_K,
+    Passage,
+    idf,
+    term_score,
+    tokenize,
+)
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+DEFAULT_CORPUS_DB = os.path.expanduser(
+    os.getenv("OCI_AI_CORPUS_DB", "~/.cache/oci-ai/corpus.sqlite3")
+)
+# Diretório usado pelo modo corpus do app_context.py.
+CORPUS_DIR = os.getenv("OCI_AI_CORPUS_DIR", "")
+# Processos de extração (0 = número de CPUs); cada um extrai um arquivo por vez.
+CORPUS_WORKERS = int(os.getenv("OCI_AI_CORPUS_WORKERS", "0"))
+
+OK = "ok"
+FAILED = "erro"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    pages INTEGER NOT NULL,
+    passages INTEGER NOT NULL,
+    extract_seconds REAL NOT NULL,
+    index_seconds REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    first_page INTEGER NOT NULL,
+    last_page INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_path ON passages (path);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    passage INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, passage)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_passage ON postings (passage);
+"""
+
+
+@dataclass(frozen=True)
+class FileResult:
+    path: str
+    status: str
+    pages: int = 0
+    passages: int = 0
+    extract_seconds: float = 0.0
+    index_seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class IngestReport:
+    scanned: int
+    unchanged: int
+    removed: int
+    results: list[FileResult]
+    seconds: float
+
+    @property
+    def failed(self) -> int:
+        return sum(result.status == FAILED for result in self.results)
+
+
+@dataclass(frozen=True)
+class CorpusHit:
+    path: str
+    passage: Passage
+
+    @property
+    def label(self) -> str:
+        return f"{os.path.basename(self.path)}, {self.passage.label}"
+
+
+def scan(directory: str, pattern: str = "*.pdf") -> list[str]:
+    found = []
+    for root, dirs, files in os.walk(os.path.abspath(directory)):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        found.extend(
+            os.path.join(root, name)
+            for name in sorted(files)
+            if fnmatch.fnmatch(name.lower(), pattern)
+        )
+    return found
+
+
+def _extract(path: str, cache_db: str) -> tuple[str, int, float, str | None]:
+    # Processo do pool: extrai para o cache de texto; o índice é montado no pai.
+    started = time.perf_counter()
+    cache = TextCache(cache_db)
+    try:
+        pages = sum(1 for _ in cache.iter_pages(path, workers=1))
+        return path, pages, time.perf_counter() - started, None
+    except Exception as exc:
+        return path, 0, time.perf_counter() - started, f"{type(exc).__name__}: {exc}"
+    finally:
+        cache.close()
+
+
+class Corpus:
+    def __init__(
+        self,
+        path: str = DEFAULT_CORPUS_DB,
+        cache: TextCache = DEFAULT_TEXT_CACHE,
+        chars: int = PASSAGE_CHARS,
+        overlap: int = PASSAGE_OVERLAP,
+    ) -> None:
+        self._path = path
+        self._cache = cache
+        self._chars = chars
+        self._overlap = overlap
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self._path != ":memory:":
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _known(self, directory: str) -> dict[str, tuple[str, str]]:
+        prefix = os.path.join(os.path.abspath(directory), "")
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT path, sha256, status FROM files WHERE substr(path, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+                .fetchall()
+            )
+        return {path: (sha256, status) for path, sha256, status in rows}
+
+    def _drop(self, conn: sqlite3.Connection, path: str) -> None:
+        conn.execute(
+            "DELETE FROM postings"
+            " WHERE passage IN (SELECT id FROM passages WHERE path = ?)",
+            (path,),
+        )
+        conn.execute("DELETE FROM passages WHERE path = ?", (path,))
+
+    def _index(
+        self, path: str, sha256: str, pages: int, extract_seconds: float
+    ) -> FileResult:
+        """Troca os trechos e postings do arquivo numa única transação."""
+        started = time.perf_counter()
+        chunks = chunk_pages(
+            self._cache.iter_pages(path, workers=1),
+            max_chars=self._chars,
+            overlap=self._overlap,
+        )
+        count = 0
+        with self._lock, self._connection() as conn:
+            self._drop(conn, path)
+            for chunk in chunks:
+                terms = Counter(tokenize(chunk.text))
+                cursor = conn.execute(
+                    "INSERT INTO passages (path, first_page, last_page, length, text)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        path,
+                        chunk.first_page,
+                        chunk.last_page,
+                        sum(terms.values()),
+                        chunk.text,
+                    ),
+                )
+                passage = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    ((term, passage, tf) for term, tf in terms.items()),
+                )
+                count += 1
+            index_seconds = time.perf_counter() - started
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    sha256,
+                    OK,
+                    pages,
+                    count,
+                    extract_seconds,
+                    index_seconds,
+                    time.time(),
+                ),
+            )
+        return FileResult(path, OK, pages, count, extract_seconds, index_seconds)
+
+    def _fail(self, path: str, sha256: str, seconds: float, error: str) -> FileResult:
+        with self._lock, self._connection() as conn:
+            self._drop(conn, path)
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, 0, 0, ?, 0, ?)",
+                (path, sha256, FAILED, error, seconds, time.time()),
+            )
+        return FileResult(path, FAILED, extract_seconds=seconds, error=error)
+
+    def ingest(
+        self,
+        directory: str,
+        *,
+        workers: int | None = None,
+        pattern: str = "*.pdf",
+        retry_failed: bool = False,
+        on_file=None,
+    ) -> IngestReport:
+        started = time.perf_counter()
+        paths = scan(directory, pattern)
+        known = self._known(directory)
+        pending: dict[str, str] = {}
+        results: list[FileResult] = []
+        unchanged = 0
+        for path in paths:
+            try:
+                # Só arquivos com tamanho ou mtime novos são lidos para o hash.
+                sha256 = self._cache.digest(path)
+            except OSError as exc:
+                results.append(self._fail(path, "", 0.0, f"{type(exc).__name__}: {exc}"))
+                continue
+            previous = known.get(path)
+            if (
+                previous is None
+                or previous[0] != sha256
+                or (retry_failed and previous[1] == FAILED)
+            ):
+                pending[path] = sha256
+            else:
+                unchanged += 1
+        present = set(paths)
+        removed = [path for path in known if path not in present]
+        for path in removed:
+            with self._lock, self._connection() as conn:
+                self._drop(conn, path)
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+        if pending:
+            if workers is None:
+                workers = CORPUS_WORKERS
+            if workers <= 0:
+                workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                futures = {
+                    pool.submit(_extract, path, self._cache.path): path for path in pending
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        _, pages, seconds, error = future.result()
+                    except Exception as exc:
+                        pages, seconds, error = 0, 0.0, f"{type(exc).__name__}: {exc}"
+                    if error is None:
+                        try:
+                            result = self._index(path, pending[path], pages, seconds)
+                        except Exception as exc:
+                            error = f"{type(exc).__name__}: {exc}"
+                    if error is not None:
+                        result = self._fail(path, pending[path], seconds, error)
+                    results.append(result)
+                    if on_file is not None:
+                        on_file(result)
+        return IngestReport(
+            scanned=len(paths),
+            unchanged=unchanged,
+            removed=len(removed),
+            results=results,
+            seconds=time.perf_counter() - started,
+        )
+
+    def search(self, query: str, k: int = TOP_K) -> list[CorpusHit]:
+        """BM25 sobre os trechos de todos os arquivos do corpus."""
+        with self._lock:
+            conn = self._connection()
+            count, avgdl = conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM passages"
+            ).fetchone()
+            if not count:
+                return []
+            scores: dict[int, float] = {}
+            for term in set(tokenize(query)):
+                rows = conn.execute(
+                    "SELECT p.passage, p.tf, s.length FROM postings p"
+                    " JOIN passages s ON s.id = p.passage WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+                weight = idf(count, len(rows))
+                for passage, tf, length in rows:
+                    score = term_score(weight, tf, length, avgdl or 1.0)
+                    scores[passage] = scores.get(passage, 0.0) + score
+            best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            hits = []
+            for passage, score in best:
+                path, first, last, text = conn.execute(
+                    "SELECT path, first_page, last_page, text FROM passages WHERE id = ?",
+                    (passage,),
+                ).fetchone()
+                hits.append(CorpusHit(path, Passage(text, first, last, score)))
+        return hits
+
+    def files(self) -> list[tuple]:
+        with self._lock:
+            return (
+                self._connection()
+                .execute(
+                    "SELECT path, status, pages, passages, extract_seconds, index_seconds,"
+                    " error FROM files ORDER BY path"
+                )
+                .fetchall()
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+DEFAULT_CORPUS = Corpus()
+
+
+def corpus_prompt(
+    question: str, k: int = TOP_K, corpus: Corpus = DEFAULT_CORPUS
+) -> str:
+    # Agrupados por arquivo e na ordem das páginas.
+    hits = sorted(
+        corpus.search(question, k),
+        key=lambda hit: (hit.path, hit.passage.first_page, hit.passage.last_page),
+    )
+    body = "\n\n".join(f"[{hit.label}]\n{hit.passage.text}" for hit in hits)
+    return f"Trechos dos documentos:\n{body}\n\n{question}"
+
+
+def print_file(result: FileResult) -> None:
+    name = os.path.basename(result.path)
+    if result.status == OK:
+        print(
+            f"  {name:<40} {result.pages:>5} págs {result.passages:>5} trechos "
+            f"extração {result.extract_seconds:>6.2f}s "
+            f"índice {result.index_seconds:>5.2f}s"
+        )
+    else:
+        print(f"  {name:<40} ERRO {result.error}")
+
+
+def report(ingest: IngestReport) -> None:
+    ok = len(ingest.results) - ingest.failed
+    print(
+        f"{ingest.scanned} arquivos: {ok} (re)indexados, {ingest.unchanged} sem mudança, "
+        f"{ingest.failed} com erro, {ingest.removed} removidos em {ingest.seconds:.2f}s"
+    )
@@ -0,0 +1,346 @@
+"""Registro de arquivos enviados uma vez pela Files API.
+
+`FileRegistry.input_file(client, path)` devolve a parte de conteúdo de um
+`input_file`: na primeira vez envia o arquivo (`client.files.create`) e guarda
+o `file_id` em SQLite, pela URL do endpoint + SHA-256 do conteúdo, com
+validade (OCI_AI_FILE_TTL_HOURS ou o `expires_at` devolvido, o que vier
+antes). As perguntas seguintes sobre o mesmo documento mandam só o ID.
+
+Endpoint sem Files API (404, 405, 501) fica marcado por OCI_AI_FILE_RETRY_HOURS
+e a parte volta a ser a data URL, codificada em blocos no envio
+(ver multimodal.py). Um arquivo apagado ou vencido no servidor antes da
+validade local é descartado por `with_file` e reenviado uma vez.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+import openai
+
+from oci_ai import metrics
+from oci_ai.multimodal import input_file
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.expanduser(
+    os.getenv("OCI_AI_FILES_DB", "~/.cache/oci-ai/files.sqlite3")
+)
+# OCI_AI_FILE_UPLOAD=0 sempre manda o arquivo inline.
+UPLOAD_ENABLED = os.getenv("OCI_AI_FILE_UPLOAD", "1") != "0"
+TTL_SECONDS = float(os.getenv("OCI_AI_FILE_TTL_HOURS", "24")) * 3600
+# Por quanto tempo um endpoint sem Files API não é consultado de novo.
+RETRY_SECONDS = float(os.getenv("OCI_AI_FILE_RETRY_HOURS", "24")) * 3600
+# Folga antes da expiração: um ID prestes a vencer é reenviado.
+EXPIRY_MARGIN = 300
+PURPOSE = "user_data"
+# Status de quem não implementa /files.
+_UNSUPPORTED = (404, 405, 501)
+
+T = TypeVar("T")
+
+FILE_REQUESTS = metrics.counter(
+    "oci_ai_file_registry_total",
+    "Partes input_file montadas pelo registro (hit, upload, inline, stale)",
+    ("result",),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    endpoint TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (endpoint, sha256)
+);
+CREATE TABLE IF NOT EXISTS unsupported (
+    endpoint TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    until REAL NOT NULL
+);
+"""
+
+
+def endpoint_of(client) -> str:
+    return str(client.base_url).rstrip("/")
+
+
+def _unknown_file(exc: openai.APIStatusError) -> bool:
+    # 404, ou 400 citando o arquivo: o file_id não existe mais no servidor.
+    if exc.status_code == 404:
+        return True
+    return exc.status_code == 400 and "file" in str(exc).lower()
+
+
+class FileRegistry:
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        *,
+        enabled: bool = UPLOAD_ENABLED,
+        ttl: float = TTL_SECONDS,
+        cache: TextCache = DEFAULT_TEXT_CACHE,
+    ) -> None:
+        self._path = path
+        self._enabled = enabled
+        self._ttl = ttl
+        self._cache = cache
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # Um envio por (endpoint, conteúdo) mesmo com perguntas em paralelo.
+        self._uploading: dict[tuple[str, str], threading.Lock] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self._path != ":memory:":
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, endpoint: str, sha256: str) -> str | None:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT file_id FROM uploads WHERE endpoint = ? AND sha256 = ?"
+                    " AND expires > ?",
+                    (endpoint, sha256, time.time() + EXPIRY_MARGIN),
+                )
+                .fetchone()
+            )
+        return row[0] if row is not None else None
+
+    def supported(self, endpoint: str) -> bool:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT 1 FROM unsupported WHERE endpoint = ? AND until > ?",
+                    (endpoint, time.time()),
+                )
+                .fetchone()
+            )
+        return row is None
+
+    def _mark_unsupported(self, endpoint: str, status: int) -> None:
+        logger.warning(
+            "%s não aceita a Files API (HTTP %s); enviando arquivos inline",
+            endpoint,
+            status,
+        )
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO unsupported VALUES (?, ?, ?)",
+                (endpoint, status, time.time() + RETRY_SECONDS),
+            )
+
+    def _upload(self, client, file_path: str, filename: str, sha256: str) -> str:
+        with open(file_path, "rb") as f:
+            uploaded = client.files.create(
+                file=(filename, f, "application/pdf"), purpose=PURPOSE
+            )
+        now = time.time()
+        expires = now + self._ttl
+        if getattr(uploaded, "expires_at", None):
+            expires = min(expires, float(uploaded.expires_at))
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    endpoint_of(client),
+                    sha256,
+                    uploaded.id,
+                    filename,
+                    os.path.getsize(file_path),
+                    now,
+                    expires,
+                ),
+            )
+        return uploaded.id
+
+    def file_id(self, client, file_path: str, filename: str | None = None) -> str | None:
+        """ID do arquivo no endpoint (enviando se preciso); None se só der inline."""
+        if not self._enabled:
+            return None
+        endpoint = endpoint_of(client)
+        if not self.supported(endpoint):
+            return None
+        sha256 = self._cache.digest(file_path)
+        file_id = self.lookup(endpoint, sha256)
+        if file_id is not None:
+            FILE_REQUESTS.inc(result="hit")
+            return file_id
+        with self._lock:
+            upload_lock = self._uploading.setdefault((endpoint, sha256), threading.Lock())
+        with upload_lock:
+            file_id = self.lookup(endpoint, sha256)
+            if file_id is not None:
+                FILE_REQUESTS.inc(result="hit")
+                return file_id
+            try:
+                file_id = self._upload(
+                    client, file_path, filename or os.path.basename(file_path), sha256
+                )
+            except openai.APIStatusError as exc:
+                if exc.status_code in _UNSUPPORTED:
+                    self._mark_unsupported(endpoint, exc.status_code)
+                else:
+                    logger.warning("Falha ao enviar %s: %s; usando inline", file_path, exc)
+                return None
+        FILE_REQUESTS.inc(result="upload")
+        return file_id
+
+    def input_file(self, client, file_path: str, filename: str | None = None) -> dict:
+        """Parte `input_file` com `file_id` ou, sem Files API, com a data URL."""
+        file_id = self.file_id(client, file_path, filename)
+        if file_id is None:
+            FILE_REQUESTS.inc(result="inline")
+            return input_file(file_path, filename)
+        return {"type": "input_file", "file_id": file_id}
+
+    def with_file(
+        self,
+        client,
+        file_path: str,
+        request: Callable[[dict], T],
+        filename: str | None = None,
+    ) -> T:
+        """Chama `request(parte)`; se o servidor não conhecer mais o `file_id`
+        (apagado ou vencido antes da validade local), esquece o ID e repete uma vez
+        com um envio novo (ou inline)."""
+        part = self.input_file(client, file_path, filename)
+        try:
+            return request(part)
+        except openai.APIStatusError as exc:
+            if "file_id" not in part or not _unknown_file(exc):
+                raise
+            logger.warning(
+                "%s recusou %s (HTTP %s); enviando %s de novo",
+                endpoint_of(client),
+                part["file_id"],
+                exc.status_code,
+                file_path,
+            )
+            FILE_REQUESTS.inc(result="stale")
+            self.forget(client, file_path)
+        return request(self.input_file(client, file_path, filename))
+
+    def forget(self, client, file_path: str) -> None:
+        """Descarta o ID (ex.: apagado no servidor antes da validade)."""
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "DELETE FROM uploads WHERE endpoint = ? AND sha256 = ?",
+                (endpoint_of(client), self._cache.digest(file_path)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+DEFAULT_FILE_REGISTRY = FileRegistry()
+
+
+def report(file_path: str, questions: int = 5) -> None:
+    """Bytes enviados por pergunta a um servidor local: inline vs. registro."""
+    import http.server
+    import json
+    import tempfile
+
+    from oci_ai.client import build_openai_client, close_client
+
+    received: list[tuple[str, int]] = []
+    files_status = {"value": 200}
+
+    class _Server(http.server.BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            size = int(self.headers["content-length"])
+            remaining = size
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+            received.append((self.path, size))
+            status = 200
+            if self.path.endswith("/files"):
+                status = files_status["value"]
+                body = {
+                    "id": f"file-{len(received)}",
+                    "object": "file",
+                    "bytes": size,
+                    "created_at": int(time.time()),
+                    "filename": os.path.basename(file_path),
+                    "purpose": PURPOSE,
+                }
+            else:
+                body = {"id": "resp-1", "object": "response", "output": []}
+            data = json.dumps(body if status == 200 else {"error": {}}).encode()
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Server)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    size = os.path.getsize(file_path)
+    print(f"{os.path.basename(file_path)}: {size / 1024:.0f} KiB, {questions} perguntas")
+    print(f"{'modo':<14} {'1ª pergunta':>12} {'seguintes':>12} {'total':>12}")
+    runs = (("inline", False, 200), ("registro", True, 200), ("sem /files", True, 404))
+    try:
+        with tempfile.TemporaryDirectory(prefix="oci-ai-files-") as directory:
+            for label, enabled, status in runs:
+                registry = FileRegistry(
+                    os.path.join(directory, f"{label}.sqlite3"), enabled=enabled
+                )
+                client = build_openai_client(
+                    base_url,
+                    rate_limiter=None,
+                    resilience=None,
+                    router=None,
+                    ledger=None,
+                    warmup_connections=0,
+                )
+                files_status["value"] = status
+                per_question = []
+                for index in range(questions):
+                    start = len(received)
+                    question = f"Pergunta {index + 1}?"
+                    client.responses.create(
+                        model="openai.gpt-5",
+                        input=[
+                            {
+                                "role": "user",
+                                "content": [
+                                    {"type": "input_text", "text": question},
+                                    registry.input_file(client, file_path),
+                                ],
+                            }
+                        ],
+                    )
+                    per_question.append(sum(n for _, n in received[start:]))
+                close_client(client)
+                registry.close()
+                later = sum(per_question[1:]) / max(len(per_question) - 1, 1)
+                print(
+                    f"{label:<14} {per_question[0]:>11}B {later:>11.0f}B "
+                    f"{sum(per_question):>11}B"
+                )
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,197 @@
+import threading
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from oci_ai.tracing import start_span, tracing_enabled, usage_attributes
+
+
+def _usage_from_result(response: Any) -> dict | None:
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                return dict(usage)
+    output = getattr(response, "llm_output", None) or {}
+    usage = output.get("token_usage") or output.get("usage")
+    return usage if isinstance(usage, dict) else None
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Spans de LLM, ferramentas e passos do agente (nós do LangGraph)."""
+
+    def __init__(self) -> None:
+        self._spans: dict[UUID, Any] = {}
+        self._started: dict[UUID, float] = {}
+        self._first_token: set[UUID] = set()
+        self._aliases: dict[UUID, UUID | None] = {}
+        self._lock = threading.Lock()
+
+    def _start(
+        self,
+        name: str,
+        run_id: UUID,
+        parent_run_id: UUID | None,
+        attributes: dict,
+    ) -> None:
+        if not tracing_enabled():
+            return
+        with self._lock:
+            parent = self._parent_span(parent_run_id)
+        current = start_span(
+            name,
+            {key: value for key, value in attributes.items() if value is not None},
+            parent=parent,
+        )
+        with self._lock:
+            self._spans[run_id] = current
+            self._started[run_id] = time.monotonic()
+
+    def _parent_span(self, parent_run_id: UUID | None) -> Any:
+        while parent_run_id is not None:
+            if parent_run_id in self._spans:
+                return self._spans[parent_run_id]
+            parent_run_id = self._aliases.get(parent_run_id)
+        return None
+
+    def _end(
+        self,
+        run_id: UUID,
+        attributes: dict | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            current = self._spans.pop(run_id, None)
+            started = self._started.pop(run_id, None)
+            self._first_token.discard(run_id)
+            self._aliases.pop(run_id, None)
+        if current is None:
+            return
+        if attributes:
+            current.set_attributes(attributes)
+        if started is not None:
+            current.set_attribute("oci_ai.latency_s", time.monotonic() - started)
+        if error is not None:
+            current.record_exception(error)
+            current.set_attribute("error.type", type(error).__name__)
+        current.end()
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        model = (metadata or {}).get("ls_model_name")
+        self._start(
+            f"llm.call {model}" if model else "llm.call",
+            run_id,
+            parent_run_id,
+            {
+                "gen_ai.request.model": model,
+                "oci_ai.messages": sum(len(batch) for batch in messages),
+            },
+        )
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        model = (metadata or {}).get("ls_model_name")
+        self._start(
+            f"llm.call {model}" if model else "llm.call",
+            run_id,
+            parent_run_id,
+            {"gen_ai.request.model": model},
+        )
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            if run_id in self._first_token or run_id not in self._spans:
+                return
+            self._first_token.add(run_id)
+            current = self._spans[run_id]
+            started = self._started[run_id]
+        current.set_attribute("oci_ai.ttft_s", time.monotonic() - started)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, usage_attributes(_usage_from_result(response)))
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, error=error)
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(
+            f"tool.execute {name}",
+            run_id,
+            parent_run_id,
+            {"gen_ai.tool.name": name, "oci_ai.tool.input_chars": len(input_str)},
+        )
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, {"oci_ai.tool.output_chars": len(str(output))})
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, error=error)
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        is_root = parent_run_id is None
+        if not is_root and (node is None or kwargs.get("name") != node):
+            # Cadeias internas (fora do nó em si) só poluem o trace; os filhos
+            # delas ficam pendurados no span mais próximo.
+            with self._lock:
+                self._aliases[run_id] = parent_run_id
+            return
+        self._start(
+            "agent.run" if is_root else f"agent.step {node}",
+            run_id,
+            parent_run_id,
+            {
+                "oci_ai.agent.node": None if is_root else node,
+                "oci_ai.agent.step": (metadata or {}).get("langgraph_step"),
+            },
+        )
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, error=error)
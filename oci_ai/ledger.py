@@ -0,0 +1,363 @@
+import argparse
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import astuple, dataclass, field, fields
+
+import httpx
+
+from oci_ai.models import get_model
+from oci_ai.payload import (
+    ObservedStream,
+    SSEUsageSniffer,
+    extract_usage,
+    is_event_stream,
+    request_model,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.expanduser(
+    os.getenv("OCI_AI_LEDGER_DB", "~/.cache/oci-ai/ledger.sqlite3")
+)
+# OCI_AI_LEDGER=0 desliga o registro; OCI_AI_LEDGER_TAG identifica o script/sessão.
+LEDGER_ENABLED = os.getenv("OCI_AI_LEDGER", "1") != "0"
+DEFAULT_TAG = os.getenv("OCI_AI_LEDGER_TAG") or os.path.basename(sys.argv[0] or "python")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    model TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    reasoning_tokens INTEGER NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_ts ON usage (ts);
+CREATE INDEX IF NOT EXISTS usage_model_ts ON usage (model, ts);
+"""
+
+_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_BUCKETS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-W%W"}
+
+
+@dataclass
+class UsageEntry:
+    ts: float
+    model: str
+    endpoint: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    reasoning_tokens: int = 0
+    total_tokens: int = 0
+    latency: float = 0.0
+    tag: str = DEFAULT_TAG
+
+
+_COLUMNS = tuple(f.name for f in fields(UsageEntry))
+
+
+def _detail(usage: dict, keys: tuple[str, str], name: str) -> int:
+    for key in keys:
+        details = usage.get(key)
+        if isinstance(details, dict) and details.get(name) is not None:
+            return int(details[name])
+    return 0
+
+
+def entry_from_usage(
+    usage: dict,
+    *,
+    model: str,
+    endpoint: str,
+    latency: float,
+    tag: str = DEFAULT_TAG,
+) -> UsageEntry:
+    prompt = int(usage.get("input_tokens") or usage.get("prompt_tokens") or 0)
+    completion = int(usage.get("output_tokens") or usage.get("completion_tokens") or 0)
+    spec = get_model(model)
+    return UsageEntry(
+        ts=time.time(),
+        model=spec.name if spec is not None else model,
+        endpoint=endpoint,
+        input_tokens=prompt,
+        output_tokens=completion,
+        cached_tokens=_detail(
+            usage, ("input_tokens_details", "prompt_tokens_details"), "cached_tokens"
+        ),
+        reasoning_tokens=_detail(
+            usage,
+            ("output_tokens_details", "completion_tokens_details"),
+            "reasoning_tokens",
+        ),
+        total_tokens=int(usage.get("total_tokens") or prompt + completion),
+        latency=latency,
+        tag=tag,
+    )
+
+
+class UsageLedger:
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        flush_interval: float = 1.0,
+        batch_size: int = 200,
+    ) -> None:
+        self._path = path
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._path != ":memory:":
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="oci-ai-ledger", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def record(self, entry: UsageEntry) -> None:
+        # Só enfileira: a escrita em disco fica fora do caminho da requisição.
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        insert = f"INSERT INTO usage ({', '.join(_COLUMNS)}) VALUES ({placeholders})"
+        while True:
+            batch: list[UsageEntry] = []
+            waiters: list[threading.Event] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(insert, [astuple(entry) for entry in batch])
+                except sqlite3.Error as exc:
+                    logger.warning(
+                        "Falha ao gravar %d registros de uso: %s", len(batch), exc
+                    )
+            for waiter in waiters:
+                waiter.set()
+
+    def rows(self, since: float | None = None) -> list[UsageEntry]:
+        conn = self._connect()
+        try:
+            query = f"SELECT {', '.join(_COLUMNS)} FROM usage"
+            params: tuple = ()
+            if since is not None:
+                query += " WHERE ts >= ?"
+                params = (since,)
+            cursor = conn.execute(query + " ORDER BY ts", params)
+            return [UsageEntry(*row) for row in cursor]
+        finally:
+            conn.close()
+
+
+DEFAULT_LEDGER = UsageLedger() if LEDGER_ENABLED else None
+
+
+class LedgerTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, ledger: UsageLedger) -> None:
+        self._inner = inner
+        self._ledger = ledger
+
+    def _record(
+        self,
+        usage: dict | None,
+        model: str,
+        request: httpx.Request,
+        started: float,
+    ) -> None:
+        if not usage:
+            return
+        self._ledger.record(
+            entry_from_usage(
+                usage,
+                model=model,
+                endpoint=request.url.host,
+                latency=time.monotonic() - started,
+            )
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model = request_model(request)
+        if model is None:
+            return self._inner.handle_request(request)
+        started = time.monotonic()
+        response = self._inner.handle_request(request)
+        if response.status_code >= 400:
+            return response
+        if not is_event_stream(response):
+            response.read()
+            try:
+                usage = extract_usage(response.json())
+            except ValueError:
+                usage = None
+            self._record(usage, model, request, started)
+            return response
+
+        sniffer = SSEUsageSniffer()
+        response.stream = ObservedStream(
+            response.stream,
+            sniffer.feed,
+            lambda: self._record(sniffer.usage, model, request, started),
+        )
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def parse_window(value: str) -> float:
+    unit = value[-1].lower()
+    if unit not in _WINDOW_UNITS:
+        raise ValueError(f"Janela inválida: {value} (use por exemplo 30m, 24h, 7d)")
+    return float(value[:-1]) * _WINDOW_UNITS[unit]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = q * (len(ordered) - 1)
+    low = int(index)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+def estimate_cost(entry: UsageEntry) -> float | None:
+    spec = get_model(entry.model)
+    if spec is None or spec.input_cost_per_token is None:
+        return None
+    cached_price = spec.cache_read_input_token_cost
+    if cached_price is None:
+        cached_price = spec.input_cost_per_token
+    fresh = max(entry.input_tokens - entry.cached_tokens, 0)
+    return (
+        fresh * spec.input_cost_per_token
+        + entry.cached_tokens * cached_price
+        + entry.output_tokens * (spec.output_cost_per_token or 0.0)
+    )
+
+
+@dataclass
+class ReportRow:
+    period: str
+    model: str
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    reasoning_tokens: int = 0
+    cost: float | None = None
+    latencies: list[float] = field(default_factory=list, repr=False)
+    prompts: list[int] = field(default_factory=list, repr=False)
+
+
+def build_report(
+    entries: list[UsageEntry], bucket: str | None = None, tag: str | None = None
+) -> list[ReportRow]:
+    groups: dict[tuple[str, str], ReportRow] = {}
+    for entry in entries:
+        if tag is not None and entry.tag != tag:
+            continue
+        period = "total"
+        if bucket:
+            period = time.strftime(_BUCKETS[bucket], time.localtime(entry.ts))
+        row = groups.setdefault((period, entry.model), ReportRow(period, entry.model))
+        row.calls += 1
+        row.input_tokens += entry.input_tokens
+        row.output_tokens += entry.output_tokens
+        row.cached_tokens += entry.cached_tokens
+        row.reasoning_tokens += entry.reasoning_tokens
+        row.latencies.append(entry.latency)
+        row.prompts.append(entry.input_tokens)
+        cost = estimate_cost(entry)
+        if cost is not None:
+            row.cost = (row.cost or 0.0) + cost
+    return [groups[key] for key in sorted(groups)]
+
+
+def format_report(rows: list[ReportRow]) -> str:
+    header = (
+        f"{'período':<16} {'modelo':<24} {'chamadas':>8} {'entrada':>10} {'saída':>10} "
+        f"{'cache':>9} {'raciocínio':>10} {'prompt p50':>10} {'prompt p95':>10} "
+        f"{'lat p50':>8} {'lat p95':>8} {'custo US$':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        cost = f"{row.cost:.4f}" if row.cost is not None else "-"
+        lines.append(
+            f"{row.period:<16} {row.model:<24} {row.calls:>8} {row.input_tokens:>10} "
+            f"{row.output_tokens:>10} {row.cached_tokens:>9} {row.reasoning_tokens:>10} "
+            f"{percentile(row.prompts, 0.5):>10.0f} {percentile(row.prompts, 0.95):>10.0f} "
+            f"{percentile(row.latencies, 0.5):>7.2f}s {percentile(row.latencies, 0.95):>7.2f}s "
+            f"{cost:>10}"
+        )
+    if not rows:
+        lines.append("(sem registros)")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Relatório de uso de tokens (ledger)."
+    )
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--since", default="7d", help="janela: 30m, 24h, 7d, 4w")
+    parser.add_argument("--by", choices=sorted(_BUCKETS), help="agrupar por período")
+    parser.add_argument("--tag", help="filtrar por script/sessão")
+    args = parser.parse_args(argv)
+    ledger = UsageLedger(args.db)
+    entries = ledger.rows(since=time.time() - parse_window(args.since))
+    print(format_report(build_report(entries, bucket=args.by, tag=args.tag)))
+
+
+if __name__ == "__main__":
+    main()
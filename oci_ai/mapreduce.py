@@ -0,0 +1,332 @@
+"""Map-reduce para documentos maiores que a janela de contexto.
+
+O texto é dividido em chunks limitados por tokens; cada chunk é respondido
+em paralelo (requisições em voo limitadas pelo AIMDLimiter) e as respostas
+parciais são reduzidas em níveis, em grupos de 2 a REDUCE_FANIN, até sobrar
+uma. Cada chamada (modelo + instruções + prompt) é gravada como artefato do
+cache de texto: numa nova execução só o que mudou volta ao modelo.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+
+from oci_ai.concurrency import AIMDLimiter, adaptive_map
+from oci_ai.payload import CHARS_PER_TOKEN, count_text_tokens
+from oci_ai.pipeline import Chunk, chunk_pages, count_tokens
+from oci_ai.streaming import consume
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+# Tokens de texto por chunk (e por grupo de respostas parciais na redução).
+MAP_CHUNK_TOKENS = int(os.getenv("OCI_AI_MAP_CHUNK_TOKENS", "6000"))
+# Máximo de respostas parciais combinadas por chamada de redução.
+REDUCE_FANIN = int(os.getenv("OCI_AI_REDUCE_FANIN", "8"))
+MAX_IN_FLIGHT = int(os.getenv("OCI_AI_MAP_MAX_IN_FLIGHT", "8"))
+# Incrementar quando os prompts mudarem (invalida as respostas em cache).
+PROMPT_VERSION = 1
+NOTHING = "NADA"
+
+MAP_PROMPT = (
+    "Trecho ({label}) de um documento maior:\n{text}\n\n"
+    "Usando só este trecho, responda: {question}\n"
+    f"Se o trecho não tiver nada relevante, responda apenas {NOTHING}."
+)
+REDUCE_PROMPT = (
+    "Respostas parciais, cada uma sobre uma parte de um documento, na ordem do texto:\n"
+    "{parts}\n\n"
+    "Combine-as numa única resposta para: {question}\n"
+    "Mantenha os fatos de todas as partes e remova repetições."
+)
+
+
+def _label(first_page: int, last_page: int) -> str:
+    first, last = first_page + 1, last_page + 1
+    return f"p. {first}" if first == last else f"p. {first}-{last}"
+
+
+@dataclass(frozen=True, slots=True)
+class Partial:
+    text: str
+    first_page: int
+    last_page: int
+    tokens: int = 0
+
+
+@dataclass(frozen=True)
+class MapReduceResult:
+    answer: str
+    chunks: int
+    levels: int
+    calls: int
+    cached: int
+    input_tokens: int
+    output_tokens: int
+    seconds: float
+
+
+def token_chunks(
+    pages: Iterable[str], max_tokens: int = MAP_CHUNK_TOKENS
+) -> Iterator[Chunk]:
+    """Chunks de até `max_tokens`, medidos com o tokenizador (não só pela estimativa)."""
+    for chunk in count_tokens(chunk_pages(pages, max_chars=max_tokens * CHARS_PER_TOKEN)):
+        if chunk.tokens <= max_tokens:
+            yield chunk
+            continue
+        # Texto mais denso que CHARS_PER_TOKEN: quebra de novo na proporção medida.
+        max_chars = max(1, len(chunk.text) * max_tokens // chunk.tokens)
+        for piece in chunk_pages([chunk.text], max_chars=max_chars):
+            yield replace(
+                piece,
+                first_page=chunk.first_page,
+                last_page=chunk.last_page,
+                tokens=count_text_tokens(piece.text),
+            )
+
+
+def reduce_groups(
+    partials: list[Partial], fanin: int = REDUCE_FANIN, max_tokens: int = MAP_CHUNK_TOKENS
+) -> list[list[Partial]]:
+    """Agrupa parciais vizinhas: até `fanin` por grupo e até `max_tokens` somados.
+
+    Todo grupo junta pelo menos duas parciais (mesmo passando de `max_tokens`),
+    então cada nível encolhe; só a última pode sobrar sozinha.
+    """
+    fanin = max(2, fanin)
+    groups: list[list[Partial]] = []
+    size = 0
+    for partial in partials:
+        if groups and (
+            len(groups[-1]) < 2
+            or (len(groups[-1]) < fanin and size + partial.tokens <= max_tokens)
+        ):
+            groups[-1].append(partial)
+            size += partial.tokens
+        else:
+            groups.append([partial])
+            size = partial.tokens
+    return groups
+
+
+def print_progress(stage: str, done: int, total: int, cached: int) -> None:
+    end = "\n" if done == total else ""
+    print(
+        f"\r[{stage}] {done}/{total} ({cached} do cache)",
+        end=end,
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+class MapReduce:
+    def __init__(
+        self,
+        client,
+        model: str,
+        instructions: str = "",
+        *,
+        limiter: AIMDLimiter | None = None,
+        cache: TextCache = DEFAULT_TEXT_CACHE,
+        use_cache: bool = True,
+        max_tokens: int = MAP_CHUNK_TOKENS,
+        fanin: int = REDUCE_FANIN,
+        on_progress: Callable[[str, int, int, int], None] | None = None,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self._instructions = instructions
+        self._limiter = limiter or AIMDLimiter(
+            "mapreduce", initial_limit=min(4, MAX_IN_FLIGHT), max_limit=MAX_IN_FLIGHT
+        )
+        self._cache = cache
+        self._use_cache = use_cache
+        self._max_tokens = max_tokens
+        self._fanin = max(2, fanin)
+        self._on_progress = on_progress
+        self._lock = threading.Lock()
+        self._calls = self._cached = self._input_tokens = self._output_tokens = 0
+
+    def _key(self, prompt: str) -> str:
+        raw = f"{PROMPT_VERSION}\0{self._model}\0{self._instructions}\0{prompt}"
+        return "mapreduce:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _complete(
+        self, prompt: str, on_text: Callable[[str], None] | None = None
+    ) -> tuple[str, bool]:
+        key = self._key(prompt)
+        if self._use_cache:
+            data = self._cache.load_artifact(key)
+            if data is not None:
+                with self._lock:
+                    self._calls += 1
+                    self._cached += 1
+                return data.decode("utf-8"), True
+        stream = self._client.responses.create(
+            model=self._model,
+            instructions=self._instructions,
+            input=[{"role": "user", "content": [{"type": "input_text", "text": prompt}]}],
+            stream=True,
+        )
+        result = consume(stream, on_text=on_text)
+        usage = result.usage or {}
+        with self._lock:
+            self._calls += 1
+            self._input_tokens += int(usage.get("input_tokens") or 0)
+            self._output_tokens += int(usage.get("output_tokens") or 0)
+        self._cache.store_artifact(key, result.text.encode("utf-8"))
+        return result.text, False
+
+    def _stage(self, stage: str, fn: Callable, items: list) -> list[Partial]:
+        total = len(items)
+        done = cached = 0
+
+        def _run(item) -> Partial:
+            nonlocal done, cached
+            partial, hit = fn(item)
+            if self._on_progress is not None:
+                with self._lock:
+                    done += 1
+                    cached += hit
+                    self._on_progress(stage, done, total, cached)
+            return partial
+
+        return adaptive_map(_run, items, self._limiter)
+
+    def _map(self, chunk: Chunk, question: str) -> tuple[Partial, bool]:
+        label = _label(chunk.first_page, chunk.last_page)
+        text, hit = self._complete(
+            MAP_PROMPT.format(label=label, text=chunk.text, question=question)
+        )
+        partial = Partial(
+            text, chunk.first_page, chunk.last_page, count_text_tokens(text)
+        )
+        return partial, hit
+
+    def _reduce(
+        self,
+        group: list[Partial],
+        question: str,
+        on_text: Callable[[str], None] | None = None,
+    ) -> tuple[Partial, bool]:
+        parts = "\n\n".join(
+            f"[{_label(p.first_page, p.last_page)}]\n{p.text}" for p in group
+        )
+        text, hit = self._complete(
+            REDUCE_PROMPT.format(parts=parts, question=question), on_text
+        )
+        partial = Partial(
+            text, group[0].first_page, group[-1].last_page, count_text_tokens(text)
+        )
+        return partial, hit
+
+    def run(
+        self,
+        pages: Iterable[str],
+        question: str,
+        on_text: Callable[[str], None] | None = None,
+    ) -> MapReduceResult:
+        """Responde `question` sobre as páginas; `on_text` recebe a resposta final."""
+        started = time.perf_counter()
+        self._calls = self._cached = self._input_tokens = self._output_tokens = 0
+        chunks = list(token_chunks(pages, self._max_tokens))
+        partials = self._stage("map", lambda c: self._map(c, question), chunks)
+        # Trechos sem nada relevante não entram na redução.
+        relevant = [p for p in partials if p.text.strip().rstrip(".") != NOTHING]
+        partials = relevant or partials[:1]
+        levels = 0
+        streamed = False
+        while len(partials) > 1:
+            levels += 1
+            groups = reduce_groups(partials, self._fanin, self._max_tokens)
+            if len(groups) == 1:
+                # Última redução: a resposta final sai em stream.
+                partial, hit = self._reduce(groups[0], question, on_text)
+                if self._on_progress is not None:
+                    self._on_progress(f"reduce {levels}", 1, 1, int(hit))
+                partials = [partial]
+                streamed = not hit
+            else:
+                # Parcial que sobrou sozinha passa para o próximo nível sem chamada.
+                reduced = iter(
+                    self._stage(
+                        f"reduce {levels}",
+                        lambda g: self._reduce(g, question),
+                        [g for g in groups if len(g) > 1],
+                    )
+                )
+                partials = [next(reduced) if len(g) > 1 else g[0] for g in groups]
+        answer = partials[0].text if partials else ""
+        if on_text is not None and not streamed:
+            on_text(answer)
+        return MapReduceResult(
+            answer=answer,
+            chunks=len(chunks),
+            levels=levels,
+            calls=self._calls,
+            cached=self._cached,
+            input_tokens=self._input_tokens,
+            output_tokens=self._output_tokens,
+            seconds=time.perf_counter() - started,
+        )
+
+
+def report(
+    file_path: str,
+    question: str,
+    *,
+    client=None,
+    model: str | None = None,
+    instructions: str = "",
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+    max_tokens: int = MAP_CHUNK_TOKENS,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> None:
+    """Plano de chunks e, com cliente, sequencial vs. concorrente vs. rerun em cache."""
+    chunks = list(token_chunks(cache.iter_pages(file_path), max_tokens))
+    tokens = sum(c.tokens for c in chunks)
+    print(
+        f"{os.path.basename(file_path)}: {tokens} tokens em {len(chunks)} chunks "
+        f"de até {max_tokens} (maior: {max((c.tokens for c in chunks), default=0)})"
+    )
+    if client is None:
+        return
+    runs = (
+        ("sequencial", AIMDLimiter("mapreduce-seq", initial_limit=1, max_limit=1), False),
+        (
+            "concorrente",
+            AIMDLimiter(
+                "mapreduce", initial_limit=min(4, max_in_flight), max_limit=max_in_flight
+            ),
+            False,
+        ),
+        (
+            "cache",
+            AIMDLimiter("mapreduce", max_limit=max_in_flight),
+            True,
+        ),
+    )
+    rows = []
+    for label, limiter, use_cache in runs:
+        result = MapReduce(
+            client,
+            model,
+            instructions,
+            limiter=limiter,
+            cache=cache,
+            use_cache=use_cache,
+            max_tokens=max_tokens,
+            on_progress=print_progress,
+        ).run(cache.iter_pages(file_path), question)
+        rows.append((label, result))
+    print(
+        f"\n{'execução':<12} {'tempo':>8} {'chamadas':>9} {'cache':>6} "
+        f"{'input':>9} {'output':>8} {'níveis':>7}"
+    )
+    for label, result in rows:
+        print(
+            f"{label:<12} {result.seconds:>7.2f}s {result.calls:>9} {result.cached:>6} "
+            f"{result.input_tokens:>9} {result.output_tokens:>8} {result.levels:>7}"
+        )
@@ -0,0 +1,188 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Só a máquina local por padrão; OCI_AI_METRICS_HOST=0.0.0.0 expõe na rede
+# (ex.: Prometheus em outro host ou dentro de um contêiner).
+METRICS_HOST = os.getenv("OCI_AI_METRICS_HOST", "127.0.0.1")
+
+_LOCK = threading.Lock()
+_REGISTRY: dict[str, "_Metric"] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += 1
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def count(self, **labels: object) -> int:
+        counts = self._counts.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [
+                (key, list(counts), self._values[key])
+                for key, counts in self._counts.items()
+            ]
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, counts, total in items:
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, key + (bound,))} {count}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+def _get_or_create(
+    cls: type, name: str, help_text: str, labelnames, **kwargs: object
+) -> _Metric:
+    with _LOCK:
+        metric = _REGISTRY.get(name)
+        if metric is None:
+            metric = cls(name, help_text, tuple(labelnames), **kwargs)
+            _REGISTRY[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Métrica {name} já registrada como {metric.kind}")
+        return metric
+
+
+def gauge(name: str, help_text: str, labelnames=()) -> Gauge:
+    return _get_or_create(Gauge, name, help_text, labelnames)
+
+
+def counter(name: str, help_text: str, labelnames=()) -> Counter:
+    return _get_or_create(Counter, name, help_text, labelnames)
+
+
+def histogram(
+    name: str, help_text: str, labelnames=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+) -> Histogram:
+    return _get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    with _LOCK:
+        metrics = list(_REGISTRY.values())
+    lines: list[str] = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve_metrics(port: int, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_ENV_SERVER: ThreadingHTTPServer | None = None
+
+
+def serve_metrics_from_env() -> ThreadingHTTPServer | None:
+    """Servidor de OCI_AI_METRICS_PORT, um por processo (chamadas repetidas o reusam)."""
+    global _ENV_SERVER
+    port = os.getenv("OCI_AI_METRICS_PORT")
+    if not port:
+        return None
+    with _LOCK:
+        if _ENV_SERVER is None:
+            _ENV_SERVER = serve_metrics(int(port))
+        return _ENV_SERVER
@@ -0,0 +1,116 @@
+import os
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+import yaml
+
+CONFIG_PATH = os.getenv(
+    "LITELLM_CONFIG",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.yaml"),
+)
+# Seção só do cliente (rpm/tpm do limitador, max_*_tokens do planejador), por
+# model_name ou id do provedor. Fora do model_list: o proxy LiteLLM não a lê nem
+# aplica esses limites.
+LIMITS_KEY = "oci_ai_limits"
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    provider_model: str
+    rpm: int | None = None
+    tpm: int | None = None
+    tier: str | None = None
+    regions: tuple[str, ...] | None = None
+    input_cost_per_token: float | None = None
+    output_cost_per_token: float | None = None
+    cache_read_input_token_cost: float | None = None
+    max_input_tokens: int | None = None
+    max_output_tokens: int | None = None
+
+
+def _optional_int(value: object) -> int | None:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def _optional_float(value: object) -> float | None:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+@lru_cache(maxsize=None)
+def _load_config(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _limits(spec: ModelSpec, own: dict) -> ModelSpec:
+    return replace(
+        spec,
+        rpm=_optional_int(own.get("rpm")),
+        tpm=_optional_int(own.get("tpm")),
+        max_input_tokens=_optional_int(own.get("max_input_tokens")),
+        max_output_tokens=_optional_int(own.get("max_output_tokens")),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_models(path: str = CONFIG_PATH) -> dict[str, ModelSpec]:
+    """Modelos do model_list (os que o proxy serve), com os limites do cliente."""
+    data = _load_config(path)
+    limits = data.get(LIMITS_KEY) or {}
+    models: dict[str, ModelSpec] = {}
+    for entry in data.get("model_list") or []:
+        params = entry.get("litellm_params") or {}
+        info = entry.get("model_info") or {}
+        name = entry["model_name"]
+        provider_model = params.get("model", name)
+        own = limits.get(name) or limits.get(provider_model.split("/", 1)[-1]) or {}
+        spec = ModelSpec(
+            name=name,
+            provider_model=provider_model,
+            tier=info.get("tier"),
+            regions=tuple(info["regions"]) if info.get("regions") else None,
+            input_cost_per_token=_optional_float(info.get("input_cost_per_token")),
+            output_cost_per_token=_optional_float(info.get("output_cost_per_token")),
+            cache_read_input_token_cost=_optional_float(
+                info.get("cache_read_input_token_cost")
+            ),
+        )
+        models[name] = _limits(spec, own)
+    return models
+
+
+@lru_cache(maxsize=None)
+def load_client_models(path: str = CONFIG_PATH) -> dict[str, ModelSpec]:
+    """Ids só da seção de limites (fora do model_list): modelos usados direto na OCI."""
+    known = set()
+    for spec in load_models(path).values():
+        known.update((spec.name, spec.provider_model.split("/", 1)[-1]))
+    return {
+        name: _limits(ModelSpec(name=name, provider_model=name), own or {})
+        for name, own in (_load_config(path).get(LIMITS_KEY) or {}).items()
+        if name not in known
+    }
+
+
+def get_model(name: str, path: str = CONFIG_PATH) -> ModelSpec | None:
+    models = load_models(path)
+    if name in models:
+        return models[name]
+    # Scripts que falam direto com a OCI usam o id do provedor (ex.: openai.gpt-oss-120b).
+    for spec in models.values():
+        if spec.provider_model.split("/", 1)[-1] == name:
+            return spec
+    return load_client_models(path).get(name)
+
+
+def load_tiers(path: str = CONFIG_PATH) -> dict[str, list[str]]:
+    tiers: dict[str, list[str]] = {}
+    for spec in load_models(path).values():
+        if spec.tier:
+            tiers.setdefault(spec.tier, []).append(spec.name)
+    return tiers
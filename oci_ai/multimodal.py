@@ -0,0 +1,413 @@
+"""Entradas multimodais (PDF, imagem) codificadas em base64 só no envio.
+
+`input_file()` / `input_image()` devolvem partes de conteúdo em que
+`file_data` / `image_url` é um marcador curto ("oci-ai-inline:<token>"): o
+JSON da requisição fica pequeno em todas as camadas (cota, tracing,
+ledger). Na camada mais interna, `InlineFilesTransport` troca cada marcador
+pela data URL, lida do arquivo mapeado em memória (mmap) e codificada em
+blocos enquanto o corpo é enviado; a assinatura OCI calcula tamanho e
+x-content-sha256 com uma passada igual, também em blocos. O conteúdo do
+arquivo nunca fica inteiro na memória, nem em bytes nem em base64. Com
+compressão (compression.py), o corpo leva `content-encoding` ainda com os
+marcadores, e os blocos já expandidos passam por um compressor incremental.
+
+O token é aleatório e só vale enquanto a parte de conteúdo existir: um texto
+com um marcador forjado não faz o cliente ler arquivos locais.
+"""
+
+import base64
+import hashlib
+import mimetypes
+import mmap
+import os
+import re
+import secrets
+import threading
+import weakref
+from collections.abc import Iterator
+
+import httpx
+
+MARKER = "oci-ai-inline:"
+# Bytes lidos do arquivo por bloco: múltiplo de 3 (base64 sem padding no meio)
+# e de páginas de 4 KiB (as já enviadas saem do RSS com madvise).
+_ALIGN = 3 * 4096
+ENCODE_CHUNK = (
+    max(1, int(os.getenv("OCI_AI_INLINE_CHUNK_KB", "768")) * 1024 // _ALIGN) * _ALIGN
+)
+
+# Tamanho do corpo comprimido, medido uma vez (na assinatura ou no transporte).
+LENGTH_EXTENSION = "oci_ai.body_length"
+
+_TOKEN = re.compile(re.escape(MARKER).encode("ascii") + rb"([0-9a-f]{32})")
+_files: "weakref.WeakValueDictionary[str, InlineFile]" = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+class InlineFile(str):
+    """Marcador de uma data URL: o arquivo só é lido e codificado no envio."""
+
+    path: str
+    mime: str
+    token: str
+
+    def __new__(cls, path: str, mime: str | None = None) -> "InlineFile":
+        token = secrets.token_hex(16)
+        self = super().__new__(cls, MARKER + token)
+        self.path = os.path.abspath(path)
+        self.mime = mime or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.token = token
+        with _lock:
+            _files[token] = self
+        return self
+
+    @property
+    def prefix(self) -> bytes:
+        return f"data:{self.mime};base64,".encode("ascii")
+
+    def encoded_length(self, size: int) -> int:
+        return len(self.prefix) + 4 * -(-size // 3)
+
+    def iter_encoded(self, size: int, chunk: int = ENCODE_CHUNK) -> Iterator[bytes]:
+        """Data URL em blocos; `size` fixa o tamanho usado na assinatura."""
+        yield self.prefix
+        if not size:
+            return
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if len(view) != size:
+                    raise RuntimeError(f"{self.path} mudou durante o envio")
+                release = hasattr(mmap, "MADV_DONTNEED")
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    view.madvise(mmap.MADV_SEQUENTIAL)
+                for offset in range(0, size, chunk):
+                    yield base64.b64encode(view[offset : offset + chunk])
+                    if release:
+                        # Páginas já enviadas: continuam no page cache, fora do RSS.
+                        view.madvise(mmap.MADV_DONTNEED, offset, min(chunk, size - offset))
+
+
+def input_file(path: str, filename: str | None = None, mime: str | None = None) -> dict:
+    return {
+        "type": "input_file",
+        "filename": filename or os.path.basename(path),
+        "file_data": InlineFile(path, mime or "application/pdf"),
+    }
+
+
+def input_image(path: str, mime: str | None = None) -> dict:
+    return {"type": "input_image", "image_url": InlineFile(path, mime)}
+
+
+def has_inline_files(body: bytes) -> bool:
+    return MARKER.encode("ascii") in body
+
+
+class InlineBody(httpx.SyncByteStream):
+    """Corpo JSON com as data URLs expandidas em blocos (comprimido, se `encoding`)."""
+
+    def __init__(
+        self, parts: list[bytes | tuple[InlineFile, int]], encoding: str | None = None
+    ) -> None:
+        self._parts = parts
+        self.encoding = encoding
+        self._raw_length = sum(
+            len(part) if isinstance(part, bytes) else part[0].encoded_length(part[1])
+            for part in parts
+        )
+        self._measured: tuple[int, bytes] | None = None
+
+    def _expanded(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from part[0].iter_encoded(part[1])
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.encoding is None:
+            yield from self._expanded()
+            return
+        from oci_ai.compression import encoder
+
+        compressor = encoder(self.encoding)
+        for block in self._expanded():
+            data = compressor.compress(block)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def measure(self) -> tuple[int, bytes]:
+        """Tamanho e SHA-256 numa passada (comprimida, se for o caso)."""
+        if self._measured is None:
+            digest = hashlib.sha256()
+            length = 0
+            for block in self:
+                digest.update(block)
+                length += len(block)
+            self._measured = (length, digest.digest())
+        return self._measured
+
+    @property
+    def length(self) -> int:
+        # Sem compressão o tamanho sai da conta; comprimido, só passando pelos dados.
+        return self._raw_length if self.encoding is None else self.measure()[0]
+
+    def sha256(self) -> bytes:
+        return self.measure()[1]
+
+
+def inline_body(body: bytes, encoding: str | None = None) -> InlineBody | None:
+    """Separa o JSON nos marcadores; None se não houver arquivo a expandir."""
+    if not has_inline_files(body):
+        return None
+    parts: list[bytes | tuple[InlineFile, int]] = []
+    start = 0
+    for match in _TOKEN.finditer(body):
+        token = match.group(1).decode("ascii")
+        with _lock:
+            inline = _files.get(token)
+        if inline is None:
+            # Marcador sem arquivo registrado: segue como texto.
+            continue
+        parts.append(body[start : match.start()])
+        parts.append((inline, os.path.getsize(inline.path)))
+        start = match.end()
+    if not parts:
+        return None
+    parts.append(body[start:])
+    return InlineBody(parts, encoding)
+
+
+def _request_body(request: httpx.Request) -> InlineBody | None:
+    # content-encoding num corpo com marcadores: comprimir depois de expandir.
+    return inline_body(request.content, request.headers.get("content-encoding"))
+
+
+def body_digest(request: httpx.Request) -> tuple[int, bytes]:
+    """Tamanho e SHA-256 do corpo que será enviado (com as data URLs expandidas)."""
+    body = request.content
+    inline = _request_body(request)
+    if inline is None:
+        return len(body), hashlib.sha256(body).digest()
+    length, digest = inline.measure()
+    if inline.encoding is not None:
+        request.extensions[LENGTH_EXTENSION] = length
+    return length, digest
+
+
+def body_size(request: httpx.Request) -> int:
+    if LENGTH_EXTENSION in request.extensions:
+        return request.extensions[LENGTH_EXTENSION]
+    body = request.content
+    inline = _request_body(request)
+    if inline is None:
+        return len(body)
+    if inline.encoding is not None:
+        request.extensions[LENGTH_EXTENSION] = inline.length
+    return inline.length
+
+
+class InlineFilesAuth(httpx.Auth):
+    """Para auths que assinam `request.content` sem conhecer os marcadores
+    (ex.: OciUserPrincipalAuth): expande o corpo na memória antes delas."""
+
+    requires_request_body = True
+
+    def __init__(self, inner: httpx.Auth) -> None:
+        self._inner = inner
+
+    def sync_auth_flow(self, request: httpx.Request):
+        request.read()
+        inline = _request_body(request)
+        if inline is not None:
+            content = b"".join(inline)
+            headers = request.headers.copy()
+            headers["content-length"] = str(len(content))
+            request = httpx.Request(
+                request.method,
+                request.url,
+                headers=headers,
+                content=content,
+                extensions=dict(request.extensions),
+            )
+        return (yield from self._inner.sync_auth_flow(request))
+
+
+class InlineFilesTransport(httpx.BaseTransport):
+    """Mais perto da rede: envia as data URLs em blocos, lidas do arquivo mapeado."""
+
+    def __init__(self, inner: httpx.BaseTransport) -> None:
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            inline = _request_body(request)
+        except httpx.RequestNotRead:
+            inline = None
+        if inline is None:
+            return self._inner.handle_request(request)
+        headers = request.headers.copy()
+        # Comprimido, o tamanho já foi medido na assinatura (ou é medido agora).
+        length = request.extensions.get(LENGTH_EXTENSION)
+        headers["content-length"] = str(inline.length if length is None else length)
+        outgoing = httpx.Request(
+            request.method,
+            request.url,
+            headers=headers,
+            stream=inline,
+            extensions=dict(request.extensions),
+        )
+        return self._inner.handle_request(outgoing)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def _eager_payload(path: str) -> bytes:
+    import json
+
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("utf-8")
+    part = {
+        "type": "input_file",
+        "filename": os.path.basename(path),
+        "file_data": f"data:application/pdf;base64,{data}",
+    }
+    payload = {"model": "openai.gpt-5", "input": [{"role": "user", "content": [part]}]}
+    return json.dumps(payload).encode("utf-8")
+
+
+def _bench_auth(mode: str, config_file: str) -> httpx.Auth:
+    if mode == "oci-openai":
+        from oci_openai import OciUserPrincipalAuth
+
+        return OciUserPrincipalAuth(config_file=config_file)
+    # "inline": sem oci-openai, o mesmo assinador sem streams_inline_files passa
+    # pelo InlineFilesAuth como a auth padrão.
+    return _BenchAuth(streams=mode != "inline")
+
+
+def _peak_worker(mode: str, path: str, url: str, config_file: str, queue) -> None:
+    """Um envio em processo novo; devolve o pico de RSS (VmHWM) e o do início."""
+    from oci_ai.client import build_http_client
+
+    def _hwm() -> int:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+        return 0
+
+    client = build_http_client(
+        auth=_bench_auth(mode, config_file),
+        rate_limiter=None,
+        resilience=None,
+        router=None,
+        ledger=None,
+        compression=None,
+    )
+    client.post(url, json={"model": "openai.gpt-5", "input": "aquecimento"}).read()
+    baseline = _hwm()
+    if mode == "eager":
+        response = client.post(url, content=_eager_payload(path))
+    else:
+        payload = {
+            "model": "openai.gpt-5",
+            "input": [{"role": "user", "content": [input_file(path)]}],
+        }
+        response = client.post(url, json=payload)
+    client.close()
+    queue.put((baseline, _hwm(), response.status_code, response.text))
+
+
+class _BenchAuth(httpx.Auth):
+    """Assinatura OCI real (RequestSigner) com uma chave RSA temporária."""
+
+    requires_request_body = True
+
+    def __init__(self, streams: bool = True) -> None:
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        from oci_ai.signing import RequestSigner
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        key_id = "ocid1.tenancy.oc1..bench/ocid1.user.oc1..bench/aa:bb"
+        self._signer = RequestSigner(key_id, key)
+        self.streams_inline_files = streams
+
+    def auth_flow(self, request: httpx.Request):
+        self._signer.sign(request)
+        yield request
+
+
+def benchmark(size_mb: int = 50, path: str | None = None) -> None:
+    """Pico de RSS enviando um PDF: base64 + json.dumps inteiros, a auth padrão
+    (corpo expandido pelo InlineFilesAuth) e em blocos (OCI_AI_SIGNER=cached)."""
+    import http.server
+    import importlib.util
+    import multiprocessing
+    import shutil
+    import tempfile
+
+    from oci_ai.signing import _bench_config
+
+    directory = tempfile.mkdtemp(prefix="oci-ai-inline-")
+    config_file = _bench_config(directory)
+    if path is None:
+        path = os.path.join(directory, f"sintetico-{size_mb}mb.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.7\n")
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+    class _Sink(http.server.BaseHTTPRequestHandler):
+        # Lê o corpo em blocos e confere o x-content-sha256 calculado pelo cliente.
+        def do_POST(self) -> None:
+            remaining = int(self.headers["content-length"])
+            digest = hashlib.sha256()
+            while remaining:
+                block = self.rfile.read(min(remaining, 1 << 20))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+            expected = self.headers.get("x-content-sha256", "")
+            ok = base64.b64encode(digest.digest()).decode("ascii") == expected
+            body = b"ok" if ok and not remaining else b"hash divergente"
+            self.send_response(200)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Sink)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/openai/v1/responses"
+    size = os.path.getsize(path)
+    print(f"{os.path.basename(path)}: {size / 2**20:.1f} MiB")
+    default = "oci-openai"
+    if importlib.util.find_spec("oci_openai") is None:
+        default = "inline"
+        print("oci-openai indisponível (uv sync): auth padrão medida com o RequestSigner")
+    print(f"{'modo':<10} {'pico RSS':>10} {'acréscimo':>10} {'servidor':>10}")
+    context = multiprocessing.get_context("spawn")
+    try:
+        for mode in ("eager", default, "stream"):
+            queue = context.Queue()
+            process = context.Process(
+                target=_peak_worker, args=(mode, path, url, config_file, queue)
+            )
+            process.start()
+            baseline, peak, status, text = queue.get()
+            process.join()
+            print(
+                f"{mode:<10} {peak / 1024:>8.1f}MB {(peak - baseline) / 1024:>8.1f}MB "
+                f"{f'{status} {text}':>10}"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
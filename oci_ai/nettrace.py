@@ -0,0 +1,211 @@
+import logging
+import socket
+import threading
+import time
+from collections.abc import Generator
+from dataclasses import dataclass, field
+
+import httpcore
+import httpx
+
+from oci_ai import metrics
+from oci_ai.payload import ObservedStream
+
+logger = logging.getLogger(__name__)
+
+SIGN_EXTENSION = "oci_ai.sign_seconds"
+
+PHASE_HISTOGRAM = metrics.histogram(
+    "oci_ai_http_phase_seconds",
+    "Duração de cada fase da requisição HTTP",
+    ("phase", "host"),
+)
+CONNECTIONS = metrics.counter(
+    "oci_ai_http_connections_total",
+    "Requisições por tipo de conexão (nova ou reutilizada)",
+    ("host", "kind"),
+)
+
+PHASES = ("sign", "dns", "connect", "tls", "send", "ttfb", "body")
+
+# Eventos do trace do httpcore ("<prefixo>.<evento>.started|complete") -> fase.
+_EVENT_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+    "http11.send_request_headers": "send",
+    "http11.send_request_body": "send",
+    "http2.send_request_headers": "send",
+    "http2.send_request_body": "send",
+    "http11.receive_response_headers": "ttfb",
+    "http2.receive_response_headers": "ttfb",
+}
+
+_current = threading.local()
+
+
+@dataclass
+class RequestTimings:
+    host: str
+    phases: dict[str, float] = field(default_factory=dict)
+    new_connection: bool = False
+    _open: dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def trace(self, event_name: str, info: dict) -> None:
+        name, _, state = event_name.rpartition(".")
+        phase = _EVENT_PHASES.get(name)
+        if phase is None:
+            return
+        if state == "started":
+            self._open[name] = time.perf_counter()
+            if phase == "connect":
+                self.new_connection = True
+        elif name in self._open:
+            self.add(phase, time.perf_counter() - self._open.pop(name))
+
+    def summary(self) -> str:
+        parts = [
+            f"{phase}={self.phases[phase] * 1000:.1f}ms"
+            for phase in PHASES
+            if phase in self.phases
+        ]
+        parts.append("conexão nova" if self.new_connection else "conexão reutilizada")
+        return " ".join(parts)
+
+
+class TimedDNSBackend(httpcore.SyncBackend):
+    """Resolve o host antes do connect para separar DNS de TCP."""
+
+    def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.NetworkStream:
+        timings: RequestTimings | None = getattr(_current, "timings", None)
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        dns = time.perf_counter() - started
+        if timings is not None:
+            # O trace do httpcore mede connect_tcp com o DNS dentro; desconta aqui.
+            timings.add("dns", dns)
+            timings.add("connect", -dns)
+        last_exc: Exception | None = None
+        for address in dict.fromkeys(info[4][0] for info in addresses):
+            try:
+                return super().connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except httpcore.ConnectError as exc:
+                last_exc = exc
+        assert last_exc is not None
+        raise last_exc
+
+
+_backend_warned = False
+
+
+def install_network_backend(
+    transport: httpx.HTTPTransport, backend: httpcore.NetworkBackend
+) -> bool:
+    """Troca o backend de rede padrão do pool; False se não houver onde trocar.
+
+    O httpx não expõe o backend (`transport._pool._network_backend`, interno do
+    httpx/httpcore). Se a versão instalada mudar isso, o transporte segue com o
+    backend padrão: sem DNS medido nem retomada de sessão TLS.
+    """
+    global _backend_warned
+    pool = getattr(transport, "_pool", None)
+    if type(getattr(pool, "_network_backend", None)) is httpcore.SyncBackend:
+        pool._network_backend = backend
+        return True
+    if not _backend_warned:
+        _backend_warned = True
+        logger.warning(
+            "httpx %s / httpcore %s sem _pool._network_backend; usando o backend de "
+            "rede padrão",
+            httpx.__version__,
+            httpcore.__version__,
+        )
+    return False
+
+
+class TimedAuth(httpx.Auth):
+    """Mede a assinatura da requisição (ex.: OCI) e repassa via extensions."""
+
+    def __init__(self, inner: httpx.Auth) -> None:
+        self._inner = inner
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        flow = self._inner.sync_auth_flow(request)
+        started = time.perf_counter()
+        try:
+            outgoing = next(flow)
+        except StopIteration:
+            return
+        while True:
+            outgoing.extensions[SIGN_EXTENSION] = time.perf_counter() - started
+            response = yield outgoing
+            started = time.perf_counter()
+            try:
+                outgoing = flow.send(response)
+            except StopIteration:
+                return
+
+
+class NetworkTimingTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport) -> None:
+        self._inner = inner
+
+    def _finish(self, timings: RequestTimings, request: httpx.Request) -> None:
+        for phase, seconds in timings.phases.items():
+            PHASE_HISTOGRAM.observe(max(seconds, 0.0), phase=phase, host=timings.host)
+        CONNECTIONS.inc(
+            host=timings.host, kind="nova" if timings.new_connection else "reutilizada"
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Rede %s %s: %s", request.method, request.url.path, timings.summary()
+            )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        timings = RequestTimings(host=request.url.host)
+        if SIGN_EXTENSION in request.extensions:
+            timings.add("sign", request.extensions[SIGN_EXTENSION])
+        outer_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict) -> None:
+            timings.trace(event_name, info)
+            if outer_trace is not None:
+                outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        _current.timings = timings
+        try:
+            response = self._inner.handle_request(request)
+        except Exception:
+            self._finish(timings, request)
+            raise
+        finally:
+            _current.timings = None
+
+        started = time.perf_counter()
+
+        def on_close() -> None:
+            timings.add("body", time.perf_counter() - started)
+            self._finish(timings, request)
+
+        response.stream = ObservedStream(response.stream, on_close=on_close)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
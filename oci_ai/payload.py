@@ -0,0 +1,160 @@
+import json
+from collections.abc import Callable, Iterator
+from functools import lru_cache
+
+import httpx
+
+from oci_ai.multimodal import body_size
+
+CHARS_PER_TOKEN = 4
+# JSON da requisição guardado antes de o corpo ser comprimido (ver compression.py).
+JSON_EXTENSION = "oci_ai.request_json"
+
+
+def request_json(request: httpx.Request) -> dict | None:
+    if request.method != "POST":
+        return None
+    if JSON_EXTENSION in request.extensions:
+        return request.extensions[JSON_EXTENSION]
+    try:
+        body = request.content
+    except httpx.RequestNotRead:
+        return None
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def request_size(request: httpx.Request) -> int:
+    try:
+        return body_size(request)
+    except httpx.RequestNotRead:
+        return 0
+
+
+def request_model(request: httpx.Request, data: dict | None = None) -> str | None:
+    if data is None:
+        data = request_json(request)
+    model = (data or {}).get("model")
+    return model if isinstance(model, str) else None
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def tokenizer_name() -> str:
+    # Entra nas chaves das contagens em cache: tokenizadores diferentes não se misturam.
+    return "o200k_base" if _encoding() is not None else f"chars/{CHARS_PER_TOKEN}"
+
+
+def count_text_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _collect_text(value: object, parts: list[str]) -> None:
+    if isinstance(value, str):
+        parts.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("file_data", "image_url") and isinstance(item, str):
+                # Dados binários em base64 não viram tokens de texto.
+                continue
+            _collect_text(item, parts)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_text(item, parts)
+
+
+def estimate_prompt_tokens(data: dict | None) -> int:
+    if not data:
+        return 0
+    parts: list[str] = []
+    for key in ("instructions", "messages", "input", "tools"):
+        if key in data:
+            _collect_text(data[key], parts)
+    return count_text_tokens("\n".join(parts)) if parts else 0
+
+
+def extract_usage(payload: object) -> dict | None:
+    if not isinstance(payload, dict):
+        return None
+    usage = payload.get("usage")
+    if usage is None and isinstance(payload.get("response"), dict):
+        usage = payload["response"].get("usage")
+    return usage if isinstance(usage, dict) else None
+
+
+def usage_total_tokens(usage: dict | None) -> int | None:
+    if not usage:
+        return None
+    total = usage.get("total_tokens")
+    if total is not None:
+        return int(total)
+    prompt = usage.get("input_tokens") or usage.get("prompt_tokens") or 0
+    completion = usage.get("output_tokens") or usage.get("completion_tokens") or 0
+    return int(prompt + completion) if prompt or completion else None
+
+
+def is_event_stream(response: httpx.Response) -> bool:
+    return "text/event-stream" in response.headers.get("content-type", "")
+
+
+class SSEUsageSniffer:
+    def __init__(self) -> None:
+        self._buffer = b""
+        self.usage: dict | None = None
+
+    def feed(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            if line.startswith(b"data:") and b'"usage"' in line:
+                try:
+                    usage = extract_usage(json.loads(line[5:]))
+                except ValueError:
+                    continue
+                if usage:
+                    self.usage = usage
+
+
+class ObservedStream(httpx.SyncByteStream):
+    def __init__(
+        self,
+        inner: httpx.SyncByteStream,
+        on_chunk: Callable[[bytes], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        self._inner = inner
+        self._on_chunk = on_chunk
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._inner:
+            if self._on_chunk is not None:
+                self._on_chunk(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._inner.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
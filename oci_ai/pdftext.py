@@ -0,0 +1,174 @@
+"""Extração de texto de PDF (pdfplumber) em paralelo por faixas de páginas."""
+
+import functools
+import math
+import os
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+
+from oci_ai.tracing import span
+
+# Processos de extração; 0 = automático (CPUs, limitado pelo número de faixas).
+PDF_WORKERS = int(os.getenv("OCI_AI_PDF_WORKERS", "0"))
+# Abaixo disso o custo de subir processos supera o ganho.
+MIN_PAGES_PER_WORKER = int(os.getenv("OCI_AI_PDF_MIN_PAGES_PER_WORKER", "8"))
+# Faixas por processo: faixas menores equilibram páginas de custo desigual.
+RANGES_PER_WORKER = 4
+# Incrementar quando a extração mudar: invalida o cache de texto (textcache).
+EXTRACTOR_REVISION = 1
+
+
+def _pdfplumber_version() -> str:
+    try:
+        return version("pdfplumber")
+    except PackageNotFoundError:
+        return "desconhecida"
+
+
+EXTRACTOR_VERSION = f"pdfplumber-{_pdfplumber_version()}/{EXTRACTOR_REVISION}"
+
+
+def page_count(file_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _page_text(page, options: dict) -> str:
+    try:
+        return page.extract_text(**options) or ""
+    finally:
+        # Libera os objetos da página (chars, linhas...) antes da próxima.
+        page.close()
+
+
+def _iter_range(file_path: str, start: int, stop: int, **options) -> Iterator[str]:
+    import pdfplumber
+
+    with pdfplumber.open(file_path, pages=range(start + 1, stop + 1)) as pdf:
+        for page in pdf.pages:
+            yield _page_text(page, options)
+
+
+def _extract_range(file_path: str, start: int, stop: int, **options) -> list[str]:
+    # Roda no processo filho: cada um abre o próprio arquivo.
+    return list(_iter_range(file_path, start, stop, **options))
+
+
+def resolve_workers(pages: int, workers: int | None = None) -> int:
+    if workers is None:
+        workers = PDF_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, pages // MIN_PAGES_PER_WORKER))
+
+
+def page_ranges(pages: int, count: int) -> list[tuple[int, int]]:
+    size = math.ceil(pages / max(1, count)) if pages else 0
+    return [(start, min(start + size, pages)) for start in range(0, pages, size or 1)]
+
+
+def _iter_parallel(
+    file_path: str, pages: int, workers: int, **options
+) -> Iterator[str]:
+    if workers <= 1:
+        yield from _iter_range(file_path, 0, pages, **options)
+        return
+    ranges = page_ranges(pages, workers * RANGES_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map devolve as faixas em ordem, à medida que ficam prontas.
+        for part in pool.map(
+            functools.partial(_extract_range, **options),
+            [file_path] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+        ):
+            yield from part
+
+
+def iter_pages(
+    file_path: str, workers: int | None = None, pages: int | None = None, **options
+) -> Iterator[str]:
+    """Texto de cada página, sob demanda e na ordem do documento."""
+    if pages is None:
+        pages = page_count(file_path)
+    return _iter_parallel(file_path, pages, resolve_workers(pages, workers), **options)
+
+
+def extract_pages(
+    file_path: str, workers: int | None = None, pages: int | None = None, **options
+) -> list[str]:
+    """Texto de cada página, na ordem do documento (`options` vão para extract_text)."""
+    return list(iter_pages(file_path, workers, pages, **options))
+
+
+def join_pages(texts: Iterable[str]) -> str:
+    return "\n".join(text for text in texts if text).strip()
+
+
+def extract_pdf_text(file_path: str, workers: int | None = None) -> str:
+    with span(
+        "pdf.extract",
+        **{"oci_ai.file.path": file_path, "oci_ai.file.bytes": os.path.getsize(file_path)},
+    ) as current:
+        pages = page_count(file_path)
+        result = join_pages(extract_pages(file_path, workers, pages))
+        current.set_attribute("oci_ai.pdf.pages", pages)
+        current.set_attribute("oci_ai.pdf.workers", resolve_workers(pages, workers))
+        current.set_attribute("oci_ai.pdf.chars", len(result))
+    return result
+
+
+def repeat_pdf(source: str, copies: int, target: str) -> int:
+    """Gera um PDF sintético com `copies` cópias das páginas de `source`."""
+    import pypdfium2 as pdfium
+
+    src = pdfium.PdfDocument(source)
+    out = pdfium.PdfDocument.new()
+    try:
+        for _ in range(copies):
+            out.import_pages(src)
+        out.save(target)
+        return len(out)
+    finally:
+        out.close()
+        src.close()
+
+
+def benchmark(
+    source: str,
+    workers: tuple[int, ...] = (1, 2, 4, 8),
+    copies: tuple[int, ...] = (1, 4),
+) -> None:
+    """Tempo de extração por número de processos, no PDF original e em sintéticos maiores."""
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'arquivo':<24} {'páginas':>7} {'procs':>5} {'tempo':>9} {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in copies:
+            path = source
+            if count > 1:
+                path = os.path.join(tmp, f"x{count}-{os.path.basename(source)}")
+                repeat_pdf(source, count, path)
+            pages = page_count(path)
+            label = os.path.basename(source) if count == 1 else f"{count}x (sintético)"
+            baseline = None
+            reference = None
+            for requested in workers:
+                # Sem o mínimo de páginas por processo: mede o paralelismo pedido.
+                used = max(1, min(requested, pages))
+                started = time.perf_counter()
+                texts = list(_iter_parallel(path, pages, used))
+                elapsed = time.perf_counter() - started
+                if reference is None:
+                    reference = texts
+                elif texts != reference:
+                    raise RuntimeError(f"Texto divergente com {used} processos")
+                baseline = baseline or elapsed
+                print(
+                    f"{label:<24} {pages:>7} {used:>5} {elapsed:>8.2f}s "
+                    f"{baseline / elapsed:>6.2f}x"
+                )
@@ -0,0 +1,190 @@
+"""Pipeline de páginas sob demanda: extração -> chunks -> tokens -> prompt.
+
+Cada estágio consome e devolve iteradores, então só as páginas/chunks em
+trânsito ficam em memória. `spool_pages` grava as páginas num arquivo à medida
+que passam, para reler depois sem manter o documento inteiro.
+"""
+
+import io
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+
+from oci_ai.payload import count_text_tokens
+
+# Tamanho alvo (caracteres) de cada chunk.
+CHUNK_CHARS = int(os.getenv("OCI_AI_CHUNK_CHARS", "4000"))
+# Separador de páginas no spool (form feed não aparece no texto extraído).
+PAGE_SEPARATOR = "\f"
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    text: str
+    first_page: int
+    last_page: int
+    tokens: int = 0
+
+
+def _split_long(text: str, max_chars: int) -> Iterator[str]:
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield text[:cut]
+        text = text[cut:].lstrip()
+    if text:
+        yield text
+
+
+def chunk_pages(
+    pages: Iterable[str], max_chars: int = CHUNK_CHARS, overlap: int = 0
+) -> Iterator[Chunk]:
+    """Agrupa páginas (e quebra páginas longas) em chunks de até `max_chars`."""
+    parts: list[str] = []
+    size = first = last = 0
+    for number, page in enumerate(pages):
+        for piece in _split_long(page, max_chars):
+            if parts and size + len(piece) > max_chars:
+                text = "\n".join(parts)
+                yield Chunk(text, first, last)
+                tail = text[-overlap:] if overlap else ""
+                parts = [tail] if tail else []
+                size = len(tail)
+                first = last if tail else number
+            if not parts:
+                first = number
+            parts.append(piece)
+            size += len(piece) + 1
+            last = number
+    if parts:
+        yield Chunk("\n".join(parts), first, last)
+
+
+def count_tokens(chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+    for chunk in chunks:
+        yield replace(chunk, tokens=count_text_tokens(chunk.text))
+
+
+def spool_pages(pages: Iterable[str], path: str) -> Iterator[str]:
+    """Repassa as páginas e as grava em `path` conforme passam."""
+    with open(path, "w", encoding="utf-8") as f:
+        for index, page in enumerate(pages):
+            if index:
+                f.write(PAGE_SEPARATOR)
+            f.write(page)
+            yield page
+
+
+def read_spool(path: str) -> Iterator[str]:
+    buffer = ""
+    with open(path, encoding="utf-8") as f:
+        while block := f.read(1 << 16):
+            buffer += block
+            *pages, buffer = buffer.split(PAGE_SEPARATOR)
+            yield from pages
+    yield buffer
+
+
+def build_prompt(pages: Iterable[str], prefix: str = "", suffix: str = "") -> str:
+    """Monta o prompt direto das páginas, sem guardar o texto completo à parte."""
+    out = io.StringIO()
+    out.write(prefix)
+    separator = ""
+    for page in pages:
+        if page:
+            out.write(separator)
+            out.write(page)
+            separator = "\n"
+    out.write(suffix)
+    return out.getvalue()
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM zera no exec; ru_maxrss herda o pico do processo pai.
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(mode: str, source: str, path: str, cache_db: str, queue) -> None:
+    from oci_ai.pdftext import iter_pages, join_pages
+    from oci_ai.textcache import TextCache
+
+    import pdfplumber  # noqa: F401 (fora da medição: custo fixo de import)
+
+    # Só o texto (origem cache) é medido com tracemalloc; na extração ele
+    # deixaria o pdfminer várias vezes mais lento.
+    traced = source == "cache"
+    if traced:
+        tracemalloc.start()
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    cache = TextCache(cache_db)
+    if source == "cache":
+        pages = cache.iter_pages(path, workers=1, clean=False)
+    else:
+        pages = iter_pages(path, workers=1)
+    if mode == "eager":
+        text = join_pages(list(pages))
+        prompt = f"Texto do livro:\n{text}\n\nResuma."
+        tokens = count_text_tokens(prompt)
+    else:
+        with tempfile.NamedTemporaryFile(suffix=".txt") as spool:
+            tokens = sum(
+                chunk.tokens
+                for chunk in count_tokens(chunk_pages(spool_pages(pages, spool.name)))
+            )
+    cache.close()
+    elapsed = time.perf_counter() - started
+    python_peak = tracemalloc.get_traced_memory()[1] / 2**20 if traced else None
+    queue.put((elapsed, _peak_rss_mb() - baseline, python_peak, tokens))
+
+
+def benchmark(source_pdf: str, copies: tuple[int, ...] = (1, 4)) -> None:
+    """Pico de memória (RSS) do caminho ansioso vs. pipeline, cada modo num processo novo."""
+    import multiprocessing
+
+    from oci_ai.pdftext import repeat_pdf
+    from oci_ai.textcache import TextCache
+
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'arquivo':<24} {'origem':<7} {'modo':<8} {'tempo':>8} "
+        f"{'pico RSS':>10} {'pico Python':>12} {'tokens':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_db = os.path.join(tmp, "cache.sqlite3")
+        for count in copies:
+            path = source_pdf
+            if count > 1:
+                path = os.path.join(tmp, f"x{count}-{os.path.basename(source_pdf)}")
+                repeat_pdf(source_pdf, count, path)
+            label = os.path.basename(source_pdf) if count == 1 else f"{count}x (sintético)"
+            warm = TextCache(cache_db)
+            for _ in warm.iter_pages(path, workers=1, clean=False):
+                pass
+            warm.close()
+            for source in ("pdf", "cache"):
+                for mode in ("eager", "pipeline"):
+                    queue = context.Queue()
+                    process = context.Process(
+                        target=_run_mode, args=(mode, source, path, cache_db, queue)
+                    )
+                    process.start()
+                    seconds, peak, python_peak, tokens = queue.get()
+                    process.join()
+                    traced = "-" if python_peak is None else f"{python_peak:.2f}MB"
+                    print(
+                        f"{label:<24} {source:<7} {mode:<8} {seconds:>7.2f}s "
+                        f"{peak:>8.1f}MB {traced:>12} {tokens:>9}"
+                    )
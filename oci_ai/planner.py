@@ -0,0 +1,205 @@
+"""Planejador de contexto: texto inteiro, trechos (BM25) ou map-reduce.
+
+Antes de enviar o documento, estima os tokens do prompt com contagens por
+página guardadas no cache de texto e compara com a janela do modelo
+(`max_input_tokens` / `max_output_tokens` em `oci_ai_limits` do config.yaml). Escolhe
+a estratégia mais barata que cabe e explica a decisão:
+
+- full: o documento inteiro numa chamada, se couber;
+- bm25: só os top-k trechos, se a pergunta for pontual;
+- mapreduce: chunks em paralelo e redução, para perguntas sobre o documento todo.
+"""
+
+import json
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+
+from oci_ai.mapreduce import MAP_CHUNK_TOKENS, REDUCE_FANIN
+from oci_ai.models import get_model
+from oci_ai.payload import CHARS_PER_TOKEN, count_text_tokens, tokenizer_name
+from oci_ai.retrieval import PASSAGE_CHARS, TOP_K
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+FULL = "full"
+RETRIEVAL = "bm25"
+MAPREDUCE = "mapreduce"
+
+# Limites para modelos fora do config.yaml (ou sem max_*_tokens em oci_ai_limits).
+DEFAULT_MAX_INPUT_TOKENS = int(os.getenv("OCI_AI_DEFAULT_MAX_INPUT_TOKENS", "128000"))
+DEFAULT_MAX_OUTPUT_TOKENS = int(os.getenv("OCI_AI_DEFAULT_MAX_OUTPUT_TOKENS", "8192"))
+# Tokens de saída reservados para a resposta.
+OUTPUT_TOKENS = int(os.getenv("OCI_AI_PLAN_OUTPUT_TOKENS", "4096"))
+# Folga sobre a janela: a contagem local não é a do tokenizador do modelo.
+MARGIN = float(os.getenv("OCI_AI_PLAN_MARGIN", "0.1"))
+# Tokens por resposta parcial estimados na redução do map-reduce.
+PARTIAL_TOKENS = 500
+# Incrementar quando a forma de contar mudar.
+COUNTS_VERSION = 1
+
+# Perguntas sobre o documento todo: trechos soltos não bastam.
+_WHOLE_DOCUMENT = re.compile(
+    r"\b(resum\w*|sintetiz\w*|principa\w*|tópicos|topicos|geral|todo|toda|inteiro|"
+    r"lições|licoes|capítulos|capitulos|summar\w*|overview|main|all)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    model: str
+    max_input_tokens: int
+    max_output_tokens: int
+    configured: bool
+
+
+@dataclass(frozen=True)
+class ContextPlan:
+    strategy: str
+    model: str
+    limits: ModelLimits
+    document_tokens: int
+    overhead_tokens: int
+    budget: int
+    prompt_tokens: int
+    output_tokens: int
+    calls: int
+    whole_document: bool
+    reason: str
+    # Tamanho dos chunks do map-reduce (0 nas outras estratégias).
+    chunk_tokens: int = 0
+
+    def explain(self) -> str:
+        source = "config.yaml" if self.limits.configured else "padrão"
+        return (
+            f"Estratégia: {self.strategy} ({self.reason})\n"
+            f"- modelo {self.model}: entrada até {self.limits.max_input_tokens} tokens, "
+            f"saída até {self.limits.max_output_tokens} ({source})\n"
+            f"- documento: ~{self.document_tokens} tokens; instruções + pergunta: "
+            f"~{self.overhead_tokens}; orçamento de entrada: {self.budget}\n"
+            f"- prompt estimado: ~{self.prompt_tokens} tokens em {self.calls} chamada(s); "
+            f"saída reservada: {self.output_tokens}"
+        )
+
+
+def model_limits(model: str) -> ModelLimits:
+    spec = get_model(model)
+    max_input = spec.max_input_tokens if spec else None
+    max_output = spec.max_output_tokens if spec else None
+    return ModelLimits(
+        model,
+        max_input or DEFAULT_MAX_INPUT_TOKENS,
+        max_output or DEFAULT_MAX_OUTPUT_TOKENS,
+        max_input is not None,
+    )
+
+
+def page_tokens(file_path: str, cache: TextCache = DEFAULT_TEXT_CACHE) -> list[int]:
+    """Tokens de cada página; contados uma vez e guardados junto do cache de texto."""
+    key = f"tokens:v{COUNTS_VERSION}:{tokenizer_name()}:{cache.document_key(file_path)}"
+    data = cache.load_artifact(key)
+    if data is not None:
+        return json.loads(data)
+    counts = [count_text_tokens(page) for page in cache.iter_pages(file_path)]
+    cache.store_artifact(key, json.dumps(counts).encode("ascii"))
+    return counts
+
+
+def needs_whole_document(question: str) -> bool:
+    return _WHOLE_DOCUMENT.search(question) is not None
+
+
+def plan_context(
+    file_path: str,
+    question: str,
+    model: str,
+    *,
+    instructions: str = "",
+    output_tokens: int = OUTPUT_TOKENS,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> ContextPlan:
+    limits = model_limits(model)
+    counts = page_tokens(file_path, cache)
+    # +1 por página: separador entre páginas no prompt.
+    document = sum(counts) + len(counts)
+    overhead = count_text_tokens(instructions) + count_text_tokens(question) + 16
+    reserved = min(output_tokens, limits.max_output_tokens)
+    budget = int(limits.max_input_tokens * (1 - MARGIN)) - overhead
+    whole = needs_whole_document(question)
+
+    def plan(
+        strategy: str, prompt: int, calls: int, reason: str, chunk: int = 0
+    ) -> ContextPlan:
+        return ContextPlan(
+            strategy,
+            model,
+            limits,
+            document,
+            overhead,
+            budget,
+            prompt,
+            reserved,
+            calls,
+            whole,
+            reason,
+            chunk,
+        )
+
+    if document <= budget:
+        return plan(FULL, document + overhead, 1, "o documento inteiro cabe na janela")
+    excess = f"documento ~{document} > orçamento {budget}"
+    retrieval = TOP_K * math.ceil(PASSAGE_CHARS / CHARS_PER_TOKEN) + overhead
+    if not whole and retrieval <= budget:
+        return plan(
+            RETRIEVAL,
+            retrieval,
+            1,
+            f"{excess}; pergunta pontual: top-{TOP_K} trechos BM25 bastam",
+        )
+    chunk = max(1, min(MAP_CHUNK_TOKENS, budget))
+    chunks = math.ceil(document / chunk)
+    calls = chunks
+    partials = chunks
+    prompt = document + chunks * overhead
+    while partials > 1:
+        groups = math.ceil(partials / REDUCE_FANIN)
+        calls += groups
+        prompt += partials * PARTIAL_TOKENS + groups * overhead
+        partials = groups
+    reason = f"{excess}; " + (
+        "pergunta sobre o documento todo" if whole else "nem os trechos cabem"
+    )
+    return plan(
+        MAPREDUCE, prompt, calls, f"{reason}: {chunks} chunks de até {chunk} tokens", chunk
+    )
+
+
+def report(
+    file_path: str,
+    question: str,
+    models: list[str],
+    *,
+    instructions: str = "",
+    output_tokens: int = OUTPUT_TOKENS,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> None:
+    started = time.perf_counter()
+    counts = page_tokens(file_path, cache)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{os.path.basename(file_path)}: {len(counts)} páginas, ~{sum(counts)} tokens "
+        f"({tokenizer_name()}, contagem em {elapsed * 1000:.1f}ms)"
+    )
+    print(f"Pergunta: {question}\n")
+    for model in models:
+        current = plan_context(
+            file_path,
+            question,
+            model,
+            instructions=instructions,
+            output_tokens=output_tokens,
+            cache=cache,
+        )
+        print(current.explain() + "\n")
@@ -0,0 +1,251 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from oci_ai.models import get_model
+from oci_ai.payload import (
+    ObservedStream,
+    SSEUsageSniffer,
+    estimate_prompt_tokens,
+    extract_usage,
+    is_event_stream,
+    request_json,
+    request_model,
+    usage_total_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.expanduser(
+    os.getenv("OCI_AI_RATELIMIT_DB", "~/.cache/oci-ai/ratelimit.sqlite3")
+)
+# OCI_AI_RATELIMIT=0 desliga o limitador padrão dos clientes.
+RATELIMIT_ENABLED = os.getenv("OCI_AI_RATELIMIT", "1") != "0"
+POLL_INTERVAL = 0.05
+MAX_SLEEP = 1.0
+STALE_TICKET_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tickets_model ON tickets (model, id);
+"""
+
+
+class RateLimitTimeout(TimeoutError):
+    pass
+
+
+@dataclass
+class Reservation:
+    model: str | None
+    estimated_tokens: int
+    reconciled: bool = False
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: dict[str, tuple[int | None, int | None]] | None = None,
+        path: str = DEFAULT_DB_PATH,
+    ) -> None:
+        self._limits = dict(limits or {})
+        self._path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Só modelos com rpm/tpm abrem o SQLite (uma conexão por thread).
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._path != ":memory:":
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def limits_for(self, model: str | None) -> tuple[str, int | None, int | None] | None:
+        if not model:
+            return None
+        if model in self._limits:
+            rpm, tpm = self._limits[model]
+            return model, rpm, tpm
+        spec = get_model(model)
+        if spec is None or (spec.rpm is None and spec.tpm is None):
+            return None
+        return spec.name, spec.rpm, spec.tpm
+
+    def _refill(
+        self, conn: sqlite3.Connection, key: str, per_minute: int, now: float
+    ) -> float:
+        row = conn.execute(
+            "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return float(per_minute)
+        tokens, updated = row
+        return min(float(per_minute), tokens + (now - updated) * per_minute / 60.0)
+
+    @staticmethod
+    def _store(conn: sqlite3.Connection, key: str, tokens: float, now: float) -> None:
+        conn.execute(
+            "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+            "updated = excluded.updated",
+            (key, tokens, now),
+        )
+
+    def _try_take(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        rpm: int | None,
+        tpm: int | None,
+        tokens: int,
+        now: float,
+    ) -> float:
+        wait = 0.0
+        rpm_level = tpm_level = 0.0
+        if rpm:
+            rpm_level = self._refill(conn, f"{name}:rpm", rpm, now)
+            if rpm_level < 1:
+                wait = max(wait, (1 - rpm_level) * 60.0 / rpm)
+        if tpm:
+            # Pedidos maiores que o balde inteiro esperam o balde cheio, sem travar.
+            needed = min(tokens, tpm)
+            tpm_level = self._refill(conn, f"{name}:tpm", tpm, now)
+            if tpm_level < needed:
+                wait = max(wait, (needed - tpm_level) * 60.0 / tpm)
+        if wait > 0:
+            return wait
+        if rpm:
+            self._store(conn, f"{name}:rpm", rpm_level - 1, now)
+        if tpm:
+            self._store(conn, f"{name}:tpm", tpm_level - tokens, now)
+        return 0.0
+
+    def acquire(
+        self, model: str | None, tokens: int = 0, timeout: float | None = None
+    ) -> Reservation:
+        limits = self.limits_for(model)
+        if limits is None:
+            return Reservation(model=model, estimated_tokens=tokens)
+        name, rpm, tpm = limits
+        conn = self._connect()
+        started = time.monotonic()
+        ticket = conn.execute(
+            "INSERT INTO tickets (model, pid, heartbeat) VALUES (?, ?, ?)",
+            (name, os.getpid(), time.time()),
+        ).lastrowid
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "DELETE FROM tickets WHERE heartbeat < ?",
+                        (now - STALE_TICKET_SECONDS,),
+                    )
+                    conn.execute(
+                        "UPDATE tickets SET heartbeat = ? WHERE id = ?", (now, ticket)
+                    )
+                    (head,) = conn.execute(
+                        "SELECT MIN(id) FROM tickets WHERE model = ?", (name,)
+                    ).fetchone()
+                    wait = POLL_INTERVAL
+                    if head == ticket:
+                        wait = self._try_take(conn, name, rpm, tpm, tokens, now)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                if wait == 0:
+                    return Reservation(model=name, estimated_tokens=tokens)
+                elapsed = time.monotonic() - started
+                if timeout is not None and elapsed + wait > timeout:
+                    raise RateLimitTimeout(
+                        f"Limite de taxa para {name} excedeu {timeout:.1f}s de espera"
+                    )
+                time.sleep(min(wait, MAX_SLEEP))
+        finally:
+            conn.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+
+    def reconcile(self, reservation: Reservation, actual_tokens: int | None) -> None:
+        if reservation.reconciled or actual_tokens is None:
+            return
+        reservation.reconciled = True
+        limits = self.limits_for(reservation.model)
+        if limits is None or not limits[2]:
+            return
+        name, _, tpm = limits
+        delta = actual_tokens - reservation.estimated_tokens
+        if delta == 0:
+            return
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            level = self._refill(conn, f"{name}:tpm", tpm, now)
+            self._store(conn, f"{name}:tpm", max(-float(tpm), level - delta), now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        logger.debug(
+            "Reconciliado %s: estimado=%s real=%s",
+            name,
+            reservation.estimated_tokens,
+            actual_tokens,
+        )
+
+
+DEFAULT_RATE_LIMITER = RateLimiter() if RATELIMIT_ENABLED else None
+
+
+class RateLimitTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, limiter: RateLimiter) -> None:
+        self._inner = inner
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        data = request_json(request)
+        model = request_model(request, data)
+        reservation = self._limiter.acquire(model, estimate_prompt_tokens(data))
+        response = self._inner.handle_request(request)
+        if reservation.model is None or response.status_code >= 400:
+            return response
+        if is_event_stream(response):
+            sniffer = SSEUsageSniffer()
+            response.stream = ObservedStream(
+                response.stream,
+                on_chunk=sniffer.feed,
+                on_close=lambda: self._limiter.reconcile(
+                    reservation, usage_total_tokens(sniffer.usage)
+                ),
+            )
+            return response
+        response.read()
+        try:
+            usage = extract_usage(response.json())
+        except ValueError:
+            usage = None
+        self._limiter.reconcile(reservation, usage_total_tokens(usage))
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
@@ -0,0 +1,239 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+import httpx
+from openai import APIStatusError
+
+from oci_ai import metrics
+from oci_ai.models import get_model
+from oci_ai.resilience import RETRYABLE_EXCEPTIONS, RETRYABLE_STATUSES, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+C = TypeVar("C")
+T = TypeVar("T")
+
+INFERENCE_HOST = "inference.generativeai.{region}.oci.oraclecloud.com"
+
+LATENCY_GAUGE = metrics.gauge(
+    "oci_ai_region_latency_seconds", "Latência média (EWMA) por região", ("region",)
+)
+HEALTH_GAUGE = metrics.gauge(
+    "oci_ai_region_healthy", "Região saudável (1) ou em quarentena (0)", ("region",)
+)
+FAILOVERS = metrics.counter(
+    "oci_ai_region_failovers_total",
+    "Trocas de região por erro",
+    ("from_region", "reason"),
+)
+
+
+def inference_url(region: str, path: str = "/openai/v1") -> str:
+    return f"https://{INFERENCE_HOST.format(region=region)}{path}"
+
+
+def region_of_ocid(ocid: str) -> str | None:
+    # ocid1.<tipo>.<realm>.<região>.<id>
+    parts = ocid.split(".")
+    return parts[3] if len(parts) >= 5 and parts[3] else None
+
+
+def regions_from_env(default: str = "us-chicago-1") -> list[str]:
+    value = os.getenv("OCI_REGIONS") or os.getenv("OCI_REGION") or default
+    return [region.strip() for region in value.split(",") if region.strip()]
+
+
+@dataclass
+class RegionState:
+    name: str
+    latency: float | None = None
+    unhealthy_until: float = 0.0
+    failures: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+class RegionSelector:
+    def __init__(
+        self,
+        regions: list[str],
+        alpha: float = 0.3,
+        quarantine: float = 60.0,
+    ) -> None:
+        if not regions:
+            raise ValueError("Informe ao menos uma região OCI")
+        self._states = {name: RegionState(name) for name in regions}
+        self._order = list(regions)
+        self._alpha = alpha
+        self._quarantine = quarantine
+        self._missing: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        for name in regions:
+            HEALTH_GAUGE.set(1, region=name)
+
+    @property
+    def regions(self) -> list[str]:
+        return list(self._order)
+
+    def carries(self, region: str, model: str | None) -> bool:
+        if model is None:
+            return True
+        if (region, model) in self._missing:
+            return False
+        spec = get_model(model)
+        return spec is None or spec.regions is None or region in spec.regions
+
+    def mark_missing(self, region: str, model: str) -> None:
+        logger.warning("Região %s não oferece o modelo %s", region, model)
+        with self._lock:
+            self._missing.add((region, model))
+
+    def record_latency(self, region: str, latency: float) -> None:
+        with self._lock:
+            state = self._states[region]
+            state.latency = (
+                latency
+                if state.latency is None
+                else state.latency + self._alpha * (latency - state.latency)
+            )
+            state.failures = 0
+            state.unhealthy_until = 0.0
+        LATENCY_GAUGE.set(state.latency, region=region)
+        HEALTH_GAUGE.set(1, region=region)
+
+    def record_success(self, region: str) -> None:
+        with self._lock:
+            state = self._states[region]
+            state.failures = 0
+            state.unhealthy_until = 0.0
+        HEALTH_GAUGE.set(1, region=region)
+
+    def record_failure(self, region: str, reason: str) -> None:
+        with self._lock:
+            state = self._states[region]
+            state.failures += 1
+            # Quarentena cresce com falhas seguidas, até 8x o valor base.
+            backoff = self._quarantine * min(8, 2 ** (state.failures - 1))
+            state.unhealthy_until = time.monotonic() + backoff
+        FAILOVERS.inc(from_region=region, reason=reason)
+        HEALTH_GAUGE.set(0, region=region)
+        logger.warning(
+            "Região %s em quarentena por %.0fs (%s)", region, backoff, reason
+        )
+
+    def ranked(self, model: str | None = None) -> list[str]:
+        with self._lock:
+            states = [self._states[name] for name in self._order]
+        candidates = [state for state in states if self.carries(state.name, model)]
+        if not candidates:
+            raise LookupError(f"Nenhuma região candidata oferece o modelo {model}")
+
+        def sort_key(state: RegionState) -> tuple[int, float, int]:
+            latency = state.latency if state.latency is not None else float("inf")
+            return (0 if state.healthy else 1, latency, self._order.index(state.name))
+
+        return [state.name for state in sorted(candidates, key=sort_key)]
+
+    def best(self, model: str | None = None) -> str:
+        return self.ranked(model)[0]
+
+    def probe(self, timeout: float = 3.0) -> dict[str, float | None]:
+        def _probe(region: str) -> tuple[str, float | None]:
+            url = f"https://{INFERENCE_HOST.format(region=region)}/"
+            started = time.monotonic()
+            try:
+                # Conexão nova a cada sonda: mede DNS + TCP + TLS + ida e volta.
+                with httpx.Client(timeout=timeout) as client:
+                    client.get(url)
+            except httpx.HTTPError as exc:
+                self.record_failure(region, type(exc).__name__)
+                return region, None
+            latency = time.monotonic() - started
+            self.record_latency(region, latency)
+            return region, latency
+
+        with ThreadPoolExecutor(max_workers=len(self._order)) as pool:
+            results = dict(pool.map(_probe, self._order))
+        logger.info(
+            "Sondagem de regiões: %s",
+            ", ".join(
+                f"{name}={latency * 1000:.0f}ms" if latency is not None else f"{name}=falha"
+                for name, latency in results.items()
+            ),
+        )
+        return results
+
+
+def _failover_reason(exc: BaseException) -> str | None:
+    if isinstance(exc, CircuitOpenError):
+        return "circuito-aberto"
+    if isinstance(exc, APIStatusError):
+        if exc.status_code in RETRYABLE_STATUSES:
+            return str(exc.status_code)
+        return None
+    if isinstance(exc, RETRYABLE_EXCEPTIONS):
+        return type(exc).__name__
+    return None
+
+
+class RegionalClients(Generic[C]):
+    def __init__(self, selector: RegionSelector, build: Callable[[str], C]) -> None:
+        self.selector = selector
+        self._build = build
+        self._clients: dict[str, C] = {}
+        self._lock = threading.Lock()
+
+    def client_for_region(self, region: str) -> C:
+        with self._lock:
+            client = self._clients.get(region)
+            if client is None:
+                client = self._build(region)
+                self._clients[region] = client
+            return client
+
+    def client(self, model: str | None = None) -> C:
+        return self.client_for_region(self.selector.best(model))
+
+    def call(self, model: str | None, fn: Callable[[C], T]) -> T:
+        last_exc: BaseException | None = None
+        for region in self.selector.ranked(model):
+            client = self.client_for_region(region)
+            try:
+                result = fn(client)
+            except Exception as exc:
+                if (
+                    model is not None
+                    and isinstance(exc, APIStatusError)
+                    and exc.status_code == 404
+                ):
+                    self.selector.mark_missing(region, model)
+                    last_exc = exc
+                    continue
+                reason = _failover_reason(exc)
+                if reason is None:
+                    raise
+                self.selector.record_failure(region, reason)
+                last_exc = exc
+                continue
+            # Latência de rede vem só das sondas; a chamada inclui o tempo de geração.
+            self.selector.record_success(region)
+            return result
+        assert last_exc is not None
+        raise last_exc
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            close_fn = getattr(client, "close", None)
+            if callable(close_fn):
+                close_fn()
@@ -0,0 +1,316 @@
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+import httpx
+from openai import APIConnectionError
+
+from oci_ai import metrics
+from oci_ai.concurrency import status_code_of
+from oci_ai.payload import request_model
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+STATE_GAUGE = metrics.gauge(
+    "oci_ai_circuit_state",
+    "Estado do circuit breaker (0=fechado, 1=meio-aberto, 2=aberto)",
+    ("model", "endpoint"),
+)
+RETRIES = metrics.counter(
+    "oci_ai_retries_total",
+    "Tentativas repetidas por erro transitório",
+    ("model", "endpoint", "reason"),
+)
+REJECTIONS = metrics.counter(
+    "oci_ai_circuit_rejections_total",
+    "Chamadas recusadas com o circuito aberto",
+    ("model", "endpoint"),
+)
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Limitação de taxa: repetida com backoff, mas não diz nada da saúde do modelo.
+THROTTLED_STATUSES = frozenset({429})
+RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    APIConnectionError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, model: str, endpoint: str, retry_in: float) -> None:
+        super().__init__(
+            f"Circuito aberto para {model} em {endpoint}; "
+            f"nova tentativa em {retry_in:.1f}s"
+        )
+        self.model = model
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def parse_retry_after(headers: object) -> float | None:
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        # Cabeçalho malformado (ex.: "soon"): fica o backoff normal.
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = int(os.getenv("OCI_AI_MAX_ATTEMPTS", "4"))
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    max_retry_after: float = 60.0
+    retry_statuses: frozenset[int] = RETRYABLE_STATUSES
+    retry_exceptions: tuple[type[BaseException], ...] = field(
+        default=RETRYABLE_EXCEPTIONS
+    )
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        # Full jitter: espalha as novas tentativas de vários clientes.
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            return min(self.max_retry_after, max(retry_after, backoff))
+        return backoff
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        model: str,
+        endpoint: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.model = model
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _publish(self) -> None:
+        STATE_GAUGE.set(
+            _STATE_VALUES[self._state], model=self.model, endpoint=self.endpoint
+        )
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.warning(
+            "Circuit breaker %s@%s: %s -> %s",
+            self.model,
+            self.endpoint,
+            self._state,
+            state,
+        )
+        self._state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == CLOSED:
+            self._failures = 0
+        self._publish()
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._transition(HALF_OPEN)
+
+    def allow(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            retry_in = max(
+                0.0, self.reset_timeout - (time.monotonic() - self._opened_at)
+            )
+        REJECTIONS.inc(model=self.model, endpoint=self.endpoint)
+        raise CircuitOpenError(self.model, self.endpoint, retry_in)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._transition(CLOSED)
+
+    def record_throttled(self) -> None:
+        # 429: nem falha nem sucesso; só devolve a vaga de sondagem do meio-aberto.
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+
+class Resilience:
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self.policy = policy or RetryPolicy()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, model: str | None, endpoint: str) -> CircuitBreaker:
+        key = (model or "-", endpoint)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    key[0],
+                    endpoint,
+                    failure_threshold=self._failure_threshold,
+                    reset_timeout=self._reset_timeout,
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+    def model_available(self, model: str) -> bool:
+        with self._lock:
+            breakers = [b for (name, _), b in self._breakers.items() if name == model]
+        return all(breaker.state != OPEN for breaker in breakers)
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        *,
+        model: str | None,
+        endpoint: str,
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> T:
+        breaker = self.breaker(model, endpoint)
+        policy = self.policy
+        retry_exceptions = policy.retry_exceptions + retry_on
+        attempt = 0
+        while True:
+            breaker.allow()
+            try:
+                result = fn()
+            except retry_exceptions as exc:
+                breaker.record_failure()
+                if attempt + 1 >= policy.max_attempts:
+                    raise
+                reason = type(exc).__name__
+                retry_after = None
+            except Exception as exc:
+                status = status_code_of(exc)
+                if status is None or status not in policy.retry_statuses:
+                    if status is None or status < 500:
+                        breaker.record_success()
+                    raise
+                if status in THROTTLED_STATUSES:
+                    breaker.record_throttled()
+                else:
+                    breaker.record_failure()
+                if attempt + 1 >= policy.max_attempts:
+                    raise
+                reason = str(status)
+                retry_after = parse_retry_after(
+                    getattr(getattr(exc, "response", None), "headers", None)
+                )
+            else:
+                status = getattr(result, "status_code", None)
+                if status not in policy.retry_statuses:
+                    breaker.record_success()
+                    return result
+                if status in THROTTLED_STATUSES:
+                    breaker.record_throttled()
+                else:
+                    breaker.record_failure()
+                if attempt + 1 >= policy.max_attempts:
+                    return result
+                reason = str(status)
+                retry_after = parse_retry_after(getattr(result, "headers", None))
+                close_fn = getattr(result, "close", None)
+                if callable(close_fn):
+                    close_fn()
+            delay = policy.delay(attempt, retry_after)
+            attempt += 1
+            RETRIES.inc(model=breaker.model, endpoint=endpoint, reason=reason)
+            logger.info(
+                "Nova tentativa %s/%s para %s@%s em %.2fs (%s)",
+                attempt + 1,
+                policy.max_attempts,
+                breaker.model,
+                endpoint,
+                delay,
+                reason,
+            )
+            time.sleep(delay)
+
+
+DEFAULT_RESILIENCE = Resilience()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, resilience: Resilience) -> None:
+        self._inner = inner
+        self._resilience = resilience
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._resilience.call(
+            lambda: self._inner.handle_request(request),
+            model=request_model(request),
+            endpoint=request.url.host,
+        )
+
+    def close(self) -> None:
+        self._inner.close()
@@ -0,0 +1,237 @@
+"""Recuperação de trechos por BM25 sobre o texto extraído do PDF.
+
+O texto é dividido em chunks com sobreposição (pipeline.chunk_pages) e
+indexado num índice invertido BM25, persistido como artefato do cache de
+texto (mesma chave do documento + parâmetros do índice). Só os top-k trechos
+para a pergunta vão no prompt.
+"""
+
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, replace
+
+from oci_ai.payload import count_text_tokens
+from oci_ai.pipeline import build_prompt, chunk_pages
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+# Modo de contexto do app_context.py: full (livro inteiro), bm25 ou vector (top-k
+# trechos), corpus (top-k trechos de um diretório de PDFs; ver corpus.py), mapreduce
+# (chunks respondidos em paralelo e reduzidos; ver mapreduce.py) ou auto (o
+# planejador escolhe entre full, bm25 e mapreduce; ver planner.py).
+CONTEXT_MODE = os.getenv("OCI_AI_CONTEXT_MODE", "full").lower()
+TOP_K = int(os.getenv("OCI_AI_RETRIEVAL_TOP_K", "6"))
+PASSAGE_CHARS = int(os.getenv("OCI_AI_PASSAGE_CHARS", "1200"))
+PASSAGE_OVERLAP = int(os.getenv("OCI_AI_PASSAGE_OVERLAP", "200"))
+# Incrementar quando a tokenização ou o formato mudarem.
+INDEX_VERSION = 1
+K1 = 1.5
+B = 0.75
+
+_WORD = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    """
+    a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em
+    entre era essa esse esta este eu foi for ha isso isto ja la lhe mais mas me mesmo
+    meu minha muito na nao nas nem no nos nossa nosso num numa o os ou para pela pelas
+    pelo pelos por qual quando que quem se sem ser seu seus sua suas so sobre tambem
+    te tem ter tu um uma umas uns voce vos
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    # Sem acentos e em minúsculas: "lições" e "licoes" casam.
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return [
+        word
+        for word in _WORD.findall(folded)
+        if len(word) > 1 and word not in STOPWORDS and not word.isdigit()
+    ]
+
+
+def idf(count: int, df: int) -> float:
+    return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+
+def term_score(weight: float, tf: int, length: int, avgdl: float) -> float:
+    norm = K1 * (1 - B + B * length / avgdl)
+    return weight * tf * (K1 + 1) / (tf + norm)
+
+
+@dataclass(frozen=True)
+class Passage:
+    text: str
+    first_page: int
+    last_page: int
+    score: float = 0.0
+
+    @property
+    def label(self) -> str:
+        first, last = self.first_page + 1, self.last_page + 1
+        return f"p. {first}" if first == last else f"p. {first}-{last}"
+
+
+class BM25Index:
+    def __init__(
+        self,
+        passages: list[Passage],
+        postings: dict[str, list[tuple[int, int]]],
+        lengths: list[int],
+    ) -> None:
+        self.passages = passages
+        self._postings = postings
+        self._lengths = lengths
+        count = len(lengths)
+        self._avgdl = sum(lengths) / count if count else 0.0
+        self._idf = {term: idf(count, len(docs)) for term, docs in postings.items()}
+
+    @classmethod
+    def build(cls, passages: list[Passage]) -> "BM25Index":
+        postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        for doc, passage in enumerate(passages):
+            terms = Counter(tokenize(passage.text))
+            lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((doc, tf))
+        return cls(passages, postings, lengths)
+
+    def search(self, query: str, k: int = TOP_K) -> list[Passage]:
+        scores: dict[int, float] = {}
+        avgdl = self._avgdl or 1.0
+        for term in set(tokenize(query)):
+            weight = self._idf.get(term)
+            if weight is None:
+                continue
+            for doc, tf in self._postings[term]:
+                score = term_score(weight, tf, self._lengths[doc], avgdl)
+                scores[doc] = scores.get(doc, 0.0) + score
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [replace(self.passages[doc], score=score) for doc, score in best]
+
+    def dumps(self) -> bytes:
+        return json.dumps(
+            {
+                "passages": [[p.text, p.first_page, p.last_page] for p in self.passages],
+                "postings": self._postings,
+                "lengths": self._lengths,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @classmethod
+    def loads(cls, data: bytes) -> "BM25Index":
+        raw = json.loads(data)
+        return cls(
+            [Passage(*item) for item in raw["passages"]],
+            {term: [tuple(p) for p in docs] for term, docs in raw["postings"].items()},
+            raw["lengths"],
+        )
+
+
+def index_key(document_key: str, chars: int, overlap: int) -> str:
+    return f"bm25:v{INDEX_VERSION}:{document_key}:{chars}:{overlap}"
+
+
+def load_index(
+    file_path: str,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+    chars: int = PASSAGE_CHARS,
+    overlap: int = PASSAGE_OVERLAP,
+) -> BM25Index:
+    """Índice do PDF: do cache de texto ou construído (e gravado) agora."""
+    key = index_key(cache.document_key(file_path), chars, overlap)
+    data = cache.load_artifact(key)
+    if data is not None:
+        return BM25Index.loads(data)
+    chunks = chunk_pages(cache.iter_pages(file_path), max_chars=chars, overlap=overlap)
+    index = BM25Index.build(
+        [Passage(c.text, c.first_page, c.last_page) for c in chunks]
+    )
+    cache.store_artifact(key, index.dumps())
+    return index
+
+
+def passages_prompt(passages: list[Passage], question: str) -> str:
+    # Trechos na ordem do livro, não do score: leitura mais natural para o modelo.
+    ordered = sorted(passages, key=lambda p: (p.first_page, p.last_page))
+    body = "\n\n".join(f"[{p.label}]\n{p.text}" for p in ordered)
+    return f"Trechos do livro:\n{body}\n\n{question}"
+
+
+def retrieval_prompt(
+    file_path: str, question: str, k: int = TOP_K, cache: TextCache = DEFAULT_TEXT_CACHE
+) -> str:
+    return passages_prompt(load_index(file_path, cache).search(question, k), question)
+
+
+def _ask(client, model: str, instructions: str, prompt: str) -> tuple[float, float, int]:
+    from oci_ai.streaming import TEXT, normalize
+
+    started = time.perf_counter()
+    first = None
+    input_tokens = 0
+    stream = client.responses.create(
+        model=model,
+        instructions=instructions,
+        input=[{"role": "user", "content": [{"type": "input_text", "text": prompt}]}],
+        stream=True,
+    )
+    for event in normalize(stream):
+        if first is None and event.kind == TEXT:
+            first = time.perf_counter() - started
+        elif event.usage:
+            input_tokens = int(event.usage.get("input_tokens") or 0)
+    total = time.perf_counter() - started
+    return first if first is not None else total, total, input_tokens
+
+
+def report(
+    file_path: str,
+    question: str,
+    k: int = TOP_K,
+    *,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+    client=None,
+    model: str | None = None,
+    instructions: str = "",
+) -> None:
+    """Tokens de prompt e latência: livro inteiro vs. top-k trechos BM25."""
+    started = time.perf_counter()
+    full_prompt = build_prompt(
+        cache.iter_pages(file_path), prefix="Texto do livro:\n", suffix=f"\n\n{question}"
+    )
+    full_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = load_index(file_path, cache)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    passages = index.search(question, k)
+    search_seconds = time.perf_counter() - started
+    prompt = passages_prompt(passages, question)
+
+    full_tokens = count_text_tokens(full_prompt)
+    tokens = count_text_tokens(prompt)
+    print(f"Pergunta: {question}")
+    print(
+        f"Índice: {len(index.passages)} trechos; carga {load_seconds * 1000:.1f}ms, "
+        f"busca {search_seconds * 1000:.2f}ms; prompt completo em {full_build * 1000:.1f}ms"
+    )
+    print("Trechos: " + ", ".join(f"{p.label} ({p.score:.2f})" for p in passages))
+    print(f"{'modo':<8} {'tokens prompt':>14} {'redução':>8}")
+    print(f"{'full':<8} {full_tokens:>14} {'-':>8}")
+    print(f"{'bm25':<8} {tokens:>14} {1 - tokens / max(full_tokens, 1):>7.0%}")
+    if client is None:
+        return
+    print(f"\n{'modo':<8} {'TTFT':>8} {'total':>8} {'input_tokens':>13}")
+    for label, text in (("full", full_prompt), ("bm25", prompt)):
+        ttft, total, input_tokens = _ask(client, model, instructions, text)
+        print(f"{label:<8} {ttft:>7.2f}s {total:>7.2f}s {input_tokens:>13}")
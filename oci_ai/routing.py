@@ -0,0 +1,277 @@
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from oci_ai import metrics
+from oci_ai.models import get_model, load_tiers
+from oci_ai.payload import (
+    ObservedStream,
+    SSEUsageSniffer,
+    extract_usage,
+    is_event_stream,
+    request_model,
+)
+from oci_ai.resilience import DEFAULT_RESILIENCE, Resilience
+
+logger = logging.getLogger(__name__)
+
+TTFT_GAUGE = metrics.gauge(
+    "oci_ai_model_ttft_seconds", "TTFT médio (EWMA) por modelo", ("model",)
+)
+THROUGHPUT_GAUGE = metrics.gauge(
+    "oci_ai_model_tokens_per_second", "Tokens de saída/s (EWMA) por modelo", ("model",)
+)
+ERROR_GAUGE = metrics.gauge(
+    "oci_ai_model_error_rate", "Taxa de erro (EWMA) por modelo", ("model",)
+)
+
+
+@dataclass
+class ModelStats:
+    ttft: float | None = None
+    tokens_per_second: float | None = None
+    error_rate: float = 0.0
+    samples: int = 0
+    successes: int = 0
+    # Momento (monotonic) da última atualização de error_rate.
+    updated: float = 0.0
+
+
+def _ewma(current: float | None, value: float, alpha: float) -> float:
+    return value if current is None else current + alpha * (value - current)
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        tiers: dict[str, list[str]] | None = None,
+        resilience: Resilience | None = DEFAULT_RESILIENCE,
+        alpha: float = 0.3,
+        max_error_rate: float = 0.5,
+        expected_output_tokens: int = 256,
+        exploration: float = 0.05,
+        sticky_ttl: float = 1800.0,
+        error_half_life: float = 60.0,
+    ) -> None:
+        self._tiers = tiers
+        self._resilience = resilience
+        self._alpha = alpha
+        self._max_error_rate = max_error_rate
+        self._expected_output_tokens = expected_output_tokens
+        self._exploration = exploration
+        self._sticky_ttl = sticky_ttl
+        self._error_half_life = error_half_life
+        self._stats: dict[str, ModelStats] = {}
+        self._sticky: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tiers(self) -> dict[str, list[str]]:
+        if self._tiers is None:
+            self._tiers = load_tiers()
+        return self._tiers
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            return self._stats.setdefault(model, ModelStats())
+
+    def _decayed(self, stats: ModelStats, now: float) -> float:
+        # A taxa de erro cai com o tempo mesmo sem tráfego: um modelo fora do tier
+        # volta a receber requisições (sondagem) depois de algumas meias-vidas.
+        if stats.error_rate == 0.0 or self._error_half_life <= 0:
+            return stats.error_rate
+        elapsed = max(0.0, now - stats.updated)
+        return stats.error_rate * 0.5 ** (elapsed / self._error_half_life)
+
+    def error_rate(self, model: str) -> float:
+        stats = self.stats(model)
+        with self._lock:
+            return self._decayed(stats, time.monotonic())
+
+    def _healthy(self, model: str) -> bool:
+        if self._resilience is not None and not self._resilience.model_available(
+            model
+        ):
+            return False
+        return self.error_rate(model) < self._max_error_rate
+
+    def _expected_latency(self, model: str) -> float:
+        stats = self.stats(model)
+        if stats.samples == 0:
+            # Modelo sem histórico vai primeiro, para ganhar amostras.
+            return 0.0
+        if stats.successes == 0:
+            # Só erros até agora: latência desconhecida não é latência zero. Fica
+            # atrás dos modelos que já responderam (a exploração ainda o sonda).
+            return math.inf
+        latency = stats.ttft or 0.0
+        if stats.tokens_per_second:
+            latency += self._expected_output_tokens / stats.tokens_per_second
+        return latency
+
+    def choose(self, target: str, conversation_id: str | None = None) -> str:
+        members = self.tiers.get(target)
+        if not members:
+            return target
+        now = time.monotonic()
+        if conversation_id is not None:
+            with self._lock:
+                sticky = self._sticky.get(conversation_id)
+            if sticky and now - sticky[1] < self._sticky_ttl:
+                if sticky[0] in members and self._healthy(sticky[0]):
+                    self._remember(conversation_id, sticky[0], now)
+                    return sticky[0]
+                logger.info(
+                    "Roteamento tier=%s conversa=%s: %s indisponível, reroteando",
+                    target,
+                    conversation_id,
+                    sticky[0],
+                )
+        healthy = [model for model in members if self._healthy(model)]
+        if not healthy:
+            choice = min(members, key=self.error_rate)
+            reason = "nenhum saudável; menor taxa de erro"
+        elif len(healthy) > 1 and random.random() < self._exploration:
+            choice = random.choice(healthy)
+            reason = "exploração"
+        else:
+            choice = min(healthy, key=self._expected_latency)
+            reason = "menor latência esperada"
+        stats = self.stats(choice)
+        logger.info(
+            "Roteamento tier=%s -> %s (%s; ttft=%s tps=%s erro=%.2f)",
+            target,
+            choice,
+            reason,
+            f"{stats.ttft:.2f}s" if stats.ttft is not None else "-",
+            f"{stats.tokens_per_second:.1f}"
+            if stats.tokens_per_second is not None
+            else "-",
+            self.error_rate(choice),
+        )
+        if conversation_id is not None:
+            self._remember(conversation_id, choice, now)
+        return choice
+
+    def _remember(self, conversation_id: str, model: str, now: float) -> None:
+        with self._lock:
+            self._sticky[conversation_id] = (model, now)
+            if len(self._sticky) > 10_000:
+                cutoff = now - self._sticky_ttl
+                self._sticky = {
+                    key: value
+                    for key, value in self._sticky.items()
+                    if value[1] >= cutoff
+                }
+
+    def record(
+        self,
+        model: str,
+        *,
+        error: bool,
+        ttft: float | None = None,
+        output_tokens: int | None = None,
+        generation_seconds: float | None = None,
+    ) -> None:
+        spec = get_model(model)
+        name = spec.name if spec is not None else model
+        with self._lock:
+            stats = self._stats.setdefault(name, ModelStats())
+            stats.samples += 1
+            now = time.monotonic()
+            stats.error_rate = _ewma(
+                self._decayed(stats, now), 1.0 if error else 0.0, self._alpha
+            )
+            stats.updated = now
+            if not error:
+                stats.successes += 1
+            if not error and ttft is not None:
+                stats.ttft = _ewma(stats.ttft, ttft, self._alpha)
+            if not error and output_tokens and generation_seconds:
+                stats.tokens_per_second = _ewma(
+                    stats.tokens_per_second,
+                    output_tokens / max(generation_seconds, 1e-3),
+                    self._alpha,
+                )
+        ERROR_GAUGE.set(stats.error_rate, model=name)
+        if stats.ttft is not None:
+            TTFT_GAUGE.set(stats.ttft, model=name)
+        if stats.tokens_per_second is not None:
+            THROUGHPUT_GAUGE.set(stats.tokens_per_second, model=name)
+
+
+DEFAULT_ROUTER = ModelRouter()
+
+
+def _output_tokens(usage: dict | None) -> int | None:
+    if not usage:
+        return None
+    value = usage.get("output_tokens") or usage.get("completion_tokens")
+    return int(value) if value else None
+
+
+class RouterStatsTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, router: ModelRouter) -> None:
+        self._inner = inner
+        self._router = router
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model = request_model(request)
+        if model is None:
+            return self._inner.handle_request(request)
+        started = time.monotonic()
+        try:
+            response = self._inner.handle_request(request)
+        except Exception:
+            self._router.record(model, error=True)
+            raise
+        status = response.status_code
+        if status == 429 or status >= 500:
+            self._router.record(model, error=True)
+            return response
+        if status >= 400:
+            return response
+        if not is_event_stream(response):
+            response.read()
+            try:
+                usage = extract_usage(response.json())
+            except ValueError:
+                usage = None
+            # Sem streaming não há TTFT: a resposta inteira chega de uma vez.
+            self._router.record(
+                model,
+                error=False,
+                output_tokens=_output_tokens(usage),
+                generation_seconds=time.monotonic() - started,
+            )
+            return response
+
+        sniffer = SSEUsageSniffer()
+        first_chunk: list[float] = []
+
+        def on_chunk(chunk: bytes) -> None:
+            if not first_chunk:
+                first_chunk.append(time.monotonic())
+            sniffer.feed(chunk)
+
+        def on_close() -> None:
+            if not first_chunk:
+                return
+            self._router.record(
+                model,
+                error=False,
+                ttft=first_chunk[0] - started,
+                output_tokens=_output_tokens(sniffer.usage),
+                generation_seconds=time.monotonic() - first_chunk[0],
+            )
+
+        response.stream = ObservedStream(response.stream, on_chunk, on_close)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
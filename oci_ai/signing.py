@@ -0,0 +1,261 @@
+import base64
+import configparser
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import formatdate
+
+import httpx
+
+from oci_ai.multimodal import body_digest
+
+# OCI_AI_SIGNER=cached usa o assinador daqui; o padrão (oci) mantém o
+# OciUserPrincipalAuth do oci-openai.
+SIGNER = os.getenv("OCI_AI_SIGNER", "oci").lower()
+DEFAULT_PROFILE = os.getenv("OCI_CONFIG_PROFILE", "DEFAULT")
+
+_GENERIC_HEADERS = ("date", "(request-target)", "host")
+_BODY_HEADERS = _GENERIC_HEADERS + (
+    "content-length",
+    "content-type",
+    "x-content-sha256",
+)
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+@dataclass(frozen=True)
+class OciConfig:
+    user: str | None
+    tenancy: str
+    fingerprint: str | None
+    key_file: str
+    pass_phrase: str | None = None
+    security_token_file: str | None = None
+    region: str | None = None
+
+
+def load_oci_config(path: str, profile: str = DEFAULT_PROFILE) -> OciConfig:
+    parser = configparser.ConfigParser(interpolation=None)
+    if not parser.read(os.path.expanduser(path)):
+        raise FileNotFoundError(f"Config OCI não encontrado: {path}")
+    if profile != "DEFAULT" and not parser.has_section(profile):
+        raise KeyError(f"Perfil {profile} não existe em {path}")
+    section = parser[profile]
+
+    def _path(value: str | None) -> str | None:
+        return os.path.expanduser(value) if value else None
+
+    return OciConfig(
+        user=section.get("user"),
+        tenancy=section["tenancy"],
+        fingerprint=section.get("fingerprint"),
+        key_file=_path(section["key_file"]),
+        pass_phrase=section.get("pass_phrase"),
+        security_token_file=_path(section.get("security_token_file")),
+        region=section.get("region"),
+    )
+
+
+def load_private_key(pem: bytes, pass_phrase: str | None = None):
+    from cryptography.hazmat.primitives import serialization
+
+    return serialization.load_pem_private_key(
+        pem, password=pass_phrase.encode() if pass_phrase else None
+    )
+
+
+class _DateCache:
+    # O cabeçalho date tem resolução de segundos: formata uma vez por segundo.
+    def __init__(self) -> None:
+        self._second = -1
+        self._value = ""
+
+    def now(self) -> str:
+        second = int(time.time())
+        if second != self._second:
+            self._value = formatdate(second, usegmt=True)
+            self._second = second
+        return self._value
+
+
+class RequestSigner:
+    """Assinatura HTTP da OCI com chave e partes fixas pré-computadas."""
+
+    def __init__(self, key_id: str, private_key) -> None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        self._key = private_key
+        self._padding = padding.PKCS1v15()
+        self._hash = hashes.SHA256()
+        self._dates = _DateCache()
+        self._prefixes = {
+            names: (
+                f'Signature version="1",headers="{" ".join(names)}",'
+                f'keyId="{key_id}",algorithm="rsa-sha256",signature="'
+            )
+            for names in (_GENERIC_HEADERS, _BODY_HEADERS)
+        }
+
+    def sign(self, request: httpx.Request) -> None:
+        headers = request.headers
+        if "date" not in headers:
+            headers["date"] = self._dates.now()
+        if "host" not in headers:
+            headers["host"] = request.url.netloc.decode("ascii")
+        names = _GENERIC_HEADERS
+        if request.method in _BODY_METHODS:
+            names = _BODY_HEADERS
+            # Com input_file/input_image, cobre as data URLs expandidas no envio.
+            length, digest = body_digest(request)
+            headers["content-length"] = str(length)
+            headers.setdefault("content-type", "application/json")
+            headers["x-content-sha256"] = base64.b64encode(digest).decode("ascii")
+        target = f"{request.method.lower()} {request.url.raw_path.decode('ascii')}"
+        lines = [
+            f"{name}: {target if name == '(request-target)' else headers[name]}"
+            for name in names
+        ]
+        signature = self._key.sign(
+            "\n".join(lines).encode("ascii"), self._padding, self._hash
+        )
+        headers["authorization"] = (
+            self._prefixes[names] + base64.b64encode(signature).decode("ascii") + '"'
+        )
+
+
+class CachedOciAuth(httpx.Auth):
+    """Auth OCI (chave de API ou token de sessão) com o assinador em cache.
+
+    A chave é lida e decodificada uma vez. Com `security_token_file` no perfil
+    (oci session authenticate), o keyId vira `ST$<token>` e o token é relido
+    quando o arquivo muda.
+    """
+
+    requires_request_body = True
+    # Assina as data URLs de input_file/input_image sem expandi-las na memória.
+    streams_inline_files = True
+
+    def __init__(self, config: OciConfig) -> None:
+        self._config = config
+        self._lock = threading.Lock()
+        self._signer: RequestSigner | None = None
+        self._token_mtime: float | None = None
+
+    @classmethod
+    def from_file(
+        cls, config_file: str, profile: str = DEFAULT_PROFILE
+    ) -> "CachedOciAuth":
+        return cls(load_oci_config(config_file, profile))
+
+    def _key_id(self) -> str:
+        config = self._config
+        if config.security_token_file:
+            with open(config.security_token_file, encoding="utf-8") as f:
+                return "ST$" + f.read().strip()
+        return f"{config.tenancy}/{config.user}/{config.fingerprint}"
+
+    def signer(self) -> RequestSigner:
+        token_file = self._config.security_token_file
+        mtime = os.path.getmtime(token_file) if token_file else None
+        if self._signer is None or mtime != self._token_mtime:
+            with self._lock:
+                if self._signer is None or mtime != self._token_mtime:
+                    with open(self._config.key_file, "rb") as f:
+                        key = load_private_key(f.read(), self._config.pass_phrase)
+                    self._signer = RequestSigner(self._key_id(), key)
+                    self._token_mtime = mtime
+        return self._signer
+
+    def auth_flow(self, request: httpx.Request):
+        self.signer().sign(request)
+        yield request
+
+
+def oci_auth(config_file: str, profile: str = DEFAULT_PROFILE) -> httpx.Auth:
+    if SIGNER == "cached":
+        return CachedOciAuth.from_file(config_file, profile)
+    from oci_openai import OciUserPrincipalAuth
+
+    return OciUserPrincipalAuth(config_file=config_file)
+
+
+def _bench_config(directory: str) -> str:
+    """Perfil OCI temporário (chave RSA nova) para comparar as duas auths."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_file = os.path.join(directory, "bench.pem")
+    with open(key_file, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    config_file = os.path.join(directory, "config")
+    with open(config_file, "w", encoding="utf-8") as f:
+        f.write(
+            "[DEFAULT]\n"
+            "user=ocid1.user.oc1..bench\n"
+            "tenancy=ocid1.tenancy.oc1..bench\n"
+            "fingerprint=aa:bb\n"
+            f"key_file={key_file}\n"
+            "region=us-chicago-1\n"
+        )
+    return config_file
+
+
+def benchmark(
+    workers: tuple[int, ...] = (1, 10, 100),
+    requests: int = 2000,
+    config_file: str | None = None,
+    profile: str = DEFAULT_PROFILE,
+) -> None:
+    """Custo de assinatura por requisição: CachedOciAuth vs. a auth padrão (oci-openai).
+
+    As duas leem a chave uma vez; a diferença medida é o trabalho por requisição.
+    """
+    import tempfile
+
+    body = b'{"model": "openai.gpt-oss-120b", "input": "' + b"x" * 2000 + b'"}'
+    url = (
+        "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com"
+        "/openai/v1/responses"
+    )
+    with tempfile.TemporaryDirectory(prefix="oci-ai-sign-") as directory:
+        config_file = config_file or _bench_config(directory)
+        auths = {"cached": CachedOciAuth.from_file(config_file, profile)}
+        try:
+            from oci_openai import OciUserPrincipalAuth
+        except ImportError:
+            print("oci-openai indisponível (uv sync): medindo só o assinador em cache")
+        else:
+            auths["oci-openai"] = OciUserPrincipalAuth(config_file=config_file)
+
+        def _sign(auth: httpx.Auth) -> None:
+            next(auth.sync_auth_flow(httpx.Request("POST", url, content=body)))
+
+        print(
+            f"{'auth':<11} {'workers':>7} {'req/s':>9} "
+            f"{'µs/req (parede)':>16} {'µs/req (CPU)':>13}"
+        )
+        for label, auth in auths.items():
+            # Primeira assinatura fora da medição (leitura da chave).
+            _sign(auth)
+            for count in workers:
+                cpu_started = time.process_time()
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=count) as pool:
+                    for future in [pool.submit(_sign, auth) for _ in range(requests)]:
+                        future.result()
+                wall = time.perf_counter() - started
+                cpu = time.process_time() - cpu_started
+                print(
+                    f"{label:<11} {count:>7} {requests / wall:>9.0f} "
+                    f"{wall / requests * 1e6:>16.0f} {cpu / requests * 1e6:>13.0f}"
+                )
@@ -0,0 +1,380 @@
+"""Normalizador único de streams: Chat Completions, Responses e LangChain.
+
+Qualquer fonte vira uma sequência de `StreamEvent` com seis tipos (texto,
+delta de tool call, raciocínio, item de saída concluído, uso e fim). Cada
+evento Responses é despachado por tabela pelo tipo, e cada classe de item é
+classificada uma vez só (o resultado fica em cache por classe); todos os
+consumidores passam pelos mesmos ganchos de métricas.
+"""
+
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+
+from oci_ai import metrics
+
+TEXT = "text"
+TOOL_CALL = "tool_call"
+REASONING = "reasoning"
+# Item completo de `response.output_item.done` (mensagem, function_call...).
+OUTPUT_ITEM = "output_item"
+USAGE = "usage"
+DONE = "done"
+KINDS = (TEXT, TOOL_CALL, REASONING, OUTPUT_ITEM, USAGE, DONE)
+
+STREAM_EVENTS = metrics.counter(
+    "oci_ai_stream_events_total",
+    "Eventos normalizados de stream por fonte e tipo",
+    ("source", "kind"),
+)
+STREAM_FIRST_TOKEN = metrics.histogram(
+    "oci_ai_stream_first_token_seconds",
+    "Tempo até o primeiro delta de texto, raciocínio ou tool call",
+    ("source",),
+)
+STREAM_DURATION = metrics.histogram(
+    "oci_ai_stream_duration_seconds",
+    "Duração total do consumo do stream",
+    ("source",),
+)
+
+
+@dataclass(slots=True)
+class StreamEvent:
+    kind: str
+    text: str = ""
+    # Tool calls: índice/id identificam a chamada entre deltas.
+    index: int | None = None
+    call_id: str | None = None
+    name: str | None = None
+    usage: dict | None = None
+    # Objeto final quando a fonte tem um (ex.: response do response.completed
+    # ou o item de response.output_item.done).
+    final: object = None
+
+
+_Handler = Callable[[object], Iterator[StreamEvent]]
+Hook = Callable[[StreamEvent], None]
+
+_hooks: list[Hook] = []
+
+
+def add_hook(hook: Hook) -> None:
+    """Registra um gancho chamado para todo evento normalizado."""
+    _hooks.append(hook)
+
+
+def _get(obj: object, name: str, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _as_dict(value: object) -> dict | None:
+    if value is None or isinstance(value, dict):
+        return value
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    try:
+        return dict(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Responses API --------------------------------------------------------------
+
+
+def _responses_text(event: object) -> Iterator[StreamEvent]:
+    delta = _get(event, "delta")
+    if delta:
+        yield StreamEvent(TEXT, delta)
+
+
+def _responses_reasoning(event: object) -> Iterator[StreamEvent]:
+    delta = _get(event, "delta")
+    if delta:
+        yield StreamEvent(REASONING, delta)
+
+
+def _responses_item_added(event: object) -> Iterator[StreamEvent]:
+    item = _get(event, "item")
+    if _get(item, "type") == "function_call":
+        yield StreamEvent(
+            TOOL_CALL,
+            _get(item, "arguments") or "",
+            index=_get(event, "output_index"),
+            call_id=_get(item, "call_id"),
+            name=_get(item, "name"),
+        )
+
+
+def _responses_arguments(event: object) -> Iterator[StreamEvent]:
+    delta = _get(event, "delta")
+    if delta:
+        yield StreamEvent(TOOL_CALL, delta, index=_get(event, "output_index"))
+
+
+def _responses_item_done(event: object) -> Iterator[StreamEvent]:
+    # Stream que termina sem response.completed ainda entrega os itens prontos.
+    item = _get(event, "item")
+    if item is not None:
+        yield StreamEvent(OUTPUT_ITEM, final=item)
+
+
+def _responses_done(event: object) -> Iterator[StreamEvent]:
+    response = _get(event, "response")
+    usage = _as_dict(_get(response, "usage"))
+    if usage:
+        yield StreamEvent(USAGE, usage=usage)
+    yield StreamEvent(DONE, final=response)
+
+
+_RESPONSES_HANDLERS: dict[str, _Handler] = {
+    "response.output_text.delta": _responses_text,
+    "response.reasoning_text.delta": _responses_reasoning,
+    "response.reasoning_summary_text.delta": _responses_reasoning,
+    "response.output_item.added": _responses_item_added,
+    "response.function_call_arguments.delta": _responses_arguments,
+    "response.output_item.done": _responses_item_done,
+    "response.completed": _responses_done,
+    "response.incomplete": _responses_done,
+    "response.failed": _responses_done,
+}
+
+
+def _responses_event(event: object) -> Iterator[StreamEvent]:
+    handler = _RESPONSES_HANDLERS.get(_get(event, "type"))
+    return handler(event) if handler is not None else iter(())
+
+
+# Chat Completions -----------------------------------------------------------
+
+
+def _chat_delta(
+    reasoning: str | None, content: str | None, tool_calls
+) -> Iterator[StreamEvent]:
+    if reasoning:
+        yield StreamEvent(REASONING, reasoning)
+    if content:
+        yield StreamEvent(TEXT, content)
+    for call in tool_calls or ():
+        function = _get(call, "function")
+        yield StreamEvent(
+            TOOL_CALL,
+            _get(function, "arguments") or "",
+            index=_get(call, "index"),
+            call_id=_get(call, "id"),
+            name=_get(function, "name"),
+        )
+
+
+def _chat_chunk(chunk) -> Iterator[StreamEvent]:
+    # Objetos do SDK: atributos direto (getattr com padrão em modelos pydantic
+    # passa por __getattr__ e custa mais que o resto do chunk).
+    for choice in chunk.choices:
+        delta = choice.delta
+        # reasoning_content: campo extra de modelos de raciocínio via OCI/LiteLLM.
+        extra = delta.model_extra
+        reasoning = extra.get("reasoning_content") if extra else None
+        yield from _chat_delta(reasoning, delta.content, delta.tool_calls)
+    if chunk.usage is not None:
+        yield StreamEvent(USAGE, usage=chunk.usage.model_dump())
+
+
+def _chat_dict(chunk: dict) -> Iterator[StreamEvent]:
+    for choice in chunk.get("choices") or ():
+        delta = choice.get("delta") or {}
+        yield from _chat_delta(
+            delta.get("reasoning_content"), delta.get("content"), delta.get("tool_calls")
+        )
+    usage = chunk.get("usage")
+    if usage:
+        yield StreamEvent(USAGE, usage=usage)
+
+
+# LangChain (stream_mode="messages" e ChatModel.stream) ----------------------
+
+
+def _langchain_message(message: object) -> Iterator[StreamEvent]:
+    # Resultados de ferramenta (ToolMessage) não são saída do modelo.
+    if _get(message, "type") == "tool":
+        return
+    content = _get(message, "content")
+    if isinstance(content, str):
+        if content:
+            yield StreamEvent(TEXT, content)
+    else:
+        for part in content or ():
+            kind = _get(part, "type")
+            if kind == "text":
+                text = _get(part, "text")
+                if text:
+                    yield StreamEvent(TEXT, text)
+            elif kind == "reasoning":
+                for summary in _get(part, "summary") or ():
+                    text = _get(summary, "text")
+                    if text:
+                        yield StreamEvent(REASONING, text)
+    for call in _get(message, "tool_call_chunks") or ():
+        yield StreamEvent(
+            TOOL_CALL,
+            _get(call, "args") or "",
+            index=_get(call, "index"),
+            call_id=_get(call, "id"),
+            name=_get(call, "name"),
+        )
+    usage = _get(message, "usage_metadata")
+    if usage:
+        yield StreamEvent(USAGE, usage=dict(usage))
+
+
+def _langchain_tuple(item: tuple) -> Iterator[StreamEvent]:
+    # (message_chunk, metadata) do LangGraph.
+    return _langchain_message(item[0]) if item else iter(())
+
+
+# Despacho por classe ---------------------------------------------------------
+
+
+def _dict_item(item: dict) -> Iterator[StreamEvent]:
+    # Chunks já decodificados do SSE (ex.: chat.py com httpx puro).
+    if "choices" in item:
+        return _chat_dict(item)
+    if "type" in item:
+        return _responses_event(item)
+    return _langchain_message(item)
+
+
+def _classify(cls: type) -> tuple[str, _Handler]:
+    if issubclass(cls, tuple):
+        return "langchain", _langchain_tuple
+    if issubclass(cls, dict):
+        return "sse", _dict_item
+    fields = getattr(cls, "model_fields", None) or {}
+    if "choices" in fields:
+        return "chat", _chat_chunk
+    if "usage_metadata" in fields or "tool_call_id" in fields:
+        # AIMessageChunk/AIMessage (ChatModel.stream) e ToolMessage.
+        return "langchain", _langchain_message
+    return "responses", _responses_event
+
+
+# Classe do item -> (fonte, handler); preenchido na primeira ocorrência.
+_CLASS_HANDLERS: dict[type, tuple[str, _Handler]] = {}
+
+
+def _handler_for(item: object) -> tuple[str, _Handler]:
+    cls = type(item)
+    entry = _CLASS_HANDLERS.get(cls)
+    if entry is None:
+        entry = _CLASS_HANDLERS[cls] = _classify(cls)
+    return entry
+
+
+def normalize(stream: Iterable[object]) -> Iterator[StreamEvent]:
+    """Converte qualquer stream suportado em `StreamEvent`s, terminando em DONE."""
+    started = time.perf_counter()
+    counts = dict.fromkeys(KINDS, 0)
+    source = "desconhecida"
+    first_token: float | None = None
+    hooks = tuple(_hooks)
+    try:
+        for item in stream:
+            source, handler = _handler_for(item)
+            for event in handler(item):
+                kind = event.kind
+                counts[kind] += 1
+                if first_token is None and kind in (TEXT, REASONING, TOOL_CALL):
+                    first_token = time.perf_counter() - started
+                for hook in hooks:
+                    hook(event)
+                yield event
+                if kind == DONE:
+                    return
+        counts[DONE] += 1
+        done = StreamEvent(DONE)
+        for hook in hooks:
+            hook(done)
+        yield done
+    finally:
+        # Métricas agregadas uma vez por stream, fora do caminho de cada delta.
+        for kind, count in counts.items():
+            if count:
+                STREAM_EVENTS.inc(count, source=source, kind=kind)
+        if first_token is not None:
+            STREAM_FIRST_TOKEN.observe(first_token, source=source)
+        STREAM_DURATION.observe(time.perf_counter() - started, source=source)
+
+
+@dataclass
+class ToolCall:
+    call_id: str | None = None
+    name: str = ""
+    arguments: str = ""
+
+
+class StreamResult:
+    """Acumula texto, raciocínio, tool calls e uso de um stream normalizado."""
+
+    def __init__(self) -> None:
+        self.text_parts: list[str] = []
+        self.reasoning_parts: list[str] = []
+        self.tool_calls: dict[object, ToolCall] = {}
+        # Itens de response.output_item.done, para quando não há response final.
+        self.output_items: list[object] = []
+        self.usage: dict | None = None
+        self.final: object = None
+        self._last_call: object = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+    @property
+    def reasoning(self) -> str:
+        return "".join(self.reasoning_parts)
+
+    def add(self, event: StreamEvent) -> None:
+        kind = event.kind
+        if kind == TEXT:
+            self.text_parts.append(event.text)
+        elif kind == REASONING:
+            self.reasoning_parts.append(event.text)
+        elif kind == TOOL_CALL:
+            key = event.index
+            if isinstance(key, str) and key.isdigit():
+                key = int(key)
+            if key is None:
+                key = event.call_id
+            if key is None:
+                key = self._last_call
+            self._last_call = key
+            call = self.tool_calls.setdefault(key, ToolCall())
+            if event.call_id:
+                call.call_id = event.call_id
+            if event.name:
+                call.name = event.name
+            call.arguments += event.text
+        elif kind == OUTPUT_ITEM:
+            self.output_items.append(event.final)
+        elif kind == USAGE:
+            self.usage = event.usage
+        elif kind == DONE and event.final is not None:
+            self.final = event.final
+
+
+def echo(text: str) -> None:
+    print(text, end="", flush=True)
+
+
+def consume(
+    stream: Iterable[object], on_text: Callable[[str], None] | None = None
+) -> StreamResult:
+    """Consome o stream inteiro, repassando os deltas de texto a `on_text`."""
+    result = StreamResult()
+    add = result.add
+    for event in normalize(stream):
+        add(event)
+        if on_text is not None and event.kind == TEXT:
+            on_text(event.text)
+    return result
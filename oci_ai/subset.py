@@ -0,0 +1,248 @@
+"""Sub-PDF só com as páginas que importam para a pergunta.
+
+As páginas vêm de intervalos ("1-3,7,12-") ou da busca BM25 sobre o texto
+extraído (`"auto"`: as páginas dos top-k trechos para a pergunta). O sub-PDF
+é montado na memória com o pypdfium2 (só as páginas pedidas e os recursos que
+elas usam) e guardado em OCI_AI_SUBSET_DIR pelo SHA-256 do original + páginas:
+a mesma seleção não é gerada de novo, e o registro de arquivos (files.py)
+envia cada sub-PDF uma vez.
+"""
+
+import hashlib
+import io
+import math
+import os
+import re
+import tempfile
+import time
+
+from oci_ai.retrieval import TOP_K, load_index
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+SUBSET_DIR = os.path.expanduser(
+    os.getenv("OCI_AI_SUBSET_DIR", "~/.cache/oci-ai/subsets")
+)
+# Páginas vizinhas incluídas em volta de cada trecho encontrado (modo auto).
+CONTEXT_PAGES = int(os.getenv("OCI_AI_SUBSET_CONTEXT_PAGES", "0"))
+AUTO = "auto"
+# Incrementar quando a forma de montar o sub-PDF mudar.
+SUBSET_VERSION = 1
+# Bytes (UTF-8) do nome original mantidos no nome do sub-PDF (NAME_MAX é 255).
+_NAME_BYTES = 80
+
+_RANGE = re.compile(r"^\s*(\d*)\s*(?:(-)\s*(\d*))?\s*$")
+
+
+def page_count(file_path: str) -> int:
+    # pypdfium2 só lê a árvore de páginas (o pdfplumber abriria o documento todo).
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def parse_pages(spec: str, count: int) -> list[int]:
+    """"1-3,7,10-" (1-based, inclusivo) -> índices 0-based ordenados."""
+    pages: set[int] = set()
+    for item in spec.split(","):
+        match = _RANGE.match(item)
+        if match is None or not (match.group(1) or match.group(3)):
+            raise ValueError(f"Intervalo de páginas inválido: {item!r}")
+        first = int(match.group(1) or 1)
+        last = int(match.group(3) or count) if match.group(2) else first
+        if not 1 <= first <= last <= count:
+            raise ValueError(f"Páginas fora do documento (1-{count}): {item.strip()!r}")
+        pages.update(range(first - 1, last))
+    return sorted(pages)
+
+
+def format_pages(pages: list[int]) -> str:
+    """Índices 0-based -> "1-3,7"."""
+    ordered = sorted(set(pages))
+    parts = []
+    start = 0
+    for index, page in enumerate(ordered):
+        if index + 1 == len(ordered) or ordered[index + 1] != page + 1:
+            first = ordered[start]
+            parts.append(f"{first + 1}" if first == page else f"{first + 1}-{page + 1}")
+            start = index + 1
+    return ",".join(parts)
+
+
+def select_pages(
+    file_path: str,
+    question: str,
+    k: int = TOP_K,
+    *,
+    context: int = CONTEXT_PAGES,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> list[int]:
+    """Páginas dos top-k trechos BM25 para a pergunta (mais `context` vizinhas)."""
+    count = page_count(file_path)
+    pages: set[int] = set()
+    for passage in load_index(file_path, cache).search(question, k):
+        first = max(0, passage.first_page - context)
+        last = min(count - 1, passage.last_page + context)
+        pages.update(range(first, last + 1))
+    return sorted(pages)
+
+
+def choose_pages(
+    file_path: str,
+    spec: str | None,
+    question: str = "",
+    *,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> list[int] | None:
+    """None = documento inteiro; "auto" = busca pela pergunta; senão intervalos."""
+    if not spec:
+        return None
+    if spec.strip().lower() == AUTO:
+        return select_pages(file_path, question, cache=cache) or None
+    return parse_pages(spec, page_count(file_path))
+
+
+def subset_pdf(file_path: str, pages: list[int]) -> bytes:
+    """Sub-PDF montado na memória, só com as páginas pedidas."""
+    import pypdfium2 as pdfium
+
+    src = pdfium.PdfDocument(file_path)
+    out = pdfium.PdfDocument.new()
+    try:
+        out.import_pages(src, list(pages))
+        buffer = io.BytesIO()
+        out.save(buffer)
+        return buffer.getvalue()
+    finally:
+        out.close()
+        src.close()
+
+
+def subset_path(
+    file_path: str,
+    pages: list[int],
+    *,
+    directory: str = SUBSET_DIR,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> str:
+    # Páginas entram pelo hash: um "auto" espalhado daria um nome acima do NAME_MAX.
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    name = name.encode("utf-8")[:_NAME_BYTES].decode("utf-8", "ignore")
+    digest = cache.digest(file_path)[:32]
+    selection = hashlib.sha256(format_pages(pages).encode("ascii")).hexdigest()[:16]
+    return os.path.join(
+        directory, f"{name}-{digest}-v{SUBSET_VERSION}-p{selection}.pdf"
+    )
+
+
+def subset_file(
+    file_path: str,
+    pages: list[int] | None,
+    *,
+    directory: str = SUBSET_DIR,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> str:
+    """Caminho do sub-PDF em cache (gerado agora se preciso); o original se nada muda."""
+    if not pages:
+        return file_path
+    path = subset_path(file_path, pages, directory=directory, cache=cache)
+    if os.path.exists(path):
+        return path
+    if len(set(pages)) == page_count(file_path):
+        return file_path
+    data = subset_pdf(file_path, pages)
+    os.makedirs(directory, exist_ok=True)
+    # Arquivo temporário + rename: um leitor concorrente nunca vê um PDF pela metade.
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def _inline_bytes(size: int) -> int:
+    return 4 * math.ceil(size / 3)
+
+
+def _ask_pdf(client, model: str, instructions: str, question: str, path: str):
+    from oci_ai.multimodal import input_file
+
+    started = time.perf_counter()
+    response = client.responses.create(
+        model=model,
+        instructions=instructions,
+        input=[
+            {
+                "role": "user",
+                "content": [{"type": "input_text", "text": question}, input_file(path)],
+            }
+        ],
+    )
+    usage = getattr(response, "usage", None)
+    input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+    return time.perf_counter() - started, input_tokens
+
+
+def report(
+    file_path: str,
+    question: str,
+    spec: str = AUTO,
+    *,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+    client=None,
+    model: str | None = None,
+    instructions: str = "",
+) -> None:
+    """Bytes, tokens e latência: PDF inteiro vs. sub-PDF das páginas escolhidas."""
+    from oci_ai.planner import page_tokens
+
+    started = time.perf_counter()
+    pages = choose_pages(file_path, spec, question, cache=cache)
+    select_seconds = time.perf_counter() - started
+    if not pages:
+        print("Nenhuma página selecionada: o documento inteiro seria enviado.")
+        return
+    started = time.perf_counter()
+    data = subset_pdf(file_path, pages)
+    build_seconds = time.perf_counter() - started
+    path = subset_file(file_path, pages, cache=cache)
+    started = time.perf_counter()
+    subset_file(file_path, pages, cache=cache)
+    cached_seconds = time.perf_counter() - started
+
+    counts = page_tokens(file_path, cache)
+    full_size = os.path.getsize(file_path)
+    print(f"{os.path.basename(file_path)}: {len(counts)} páginas")
+    print(f"Pergunta: {question}")
+    print(
+        f"Páginas ({spec}): {format_pages(pages)}; "
+        f"seleção {select_seconds * 1000:.1f}ms, "
+        f"sub-PDF na memória {build_seconds * 1000:.1f}ms, do cache "
+        f"{cached_seconds * 1000:.2f}ms"
+    )
+    rows = (
+        ("inteiro", len(counts), full_size, sum(counts)),
+        ("sub-PDF", len(pages), len(data), sum(counts[page] for page in pages)),
+    )
+    print(
+        f"{'envio':<8} {'páginas':>8} {'bytes PDF':>11} {'bytes inline':>13} "
+        f"{'tokens texto':>13}"
+    )
+    for label, count, size, tokens in rows:
+        print(
+            f"{label:<8} {count:>8} {size:>11} {_inline_bytes(size):>13} {tokens:>13}"
+        )
+    print(f"Redução de upload: {1 - len(data) / max(full_size, 1):.0%}")
+    if client is None:
+        return
+    print(f"\n{'envio':<8} {'latência':>9} {'input_tokens':>13}")
+    for label, current in (("inteiro", file_path), ("sub-PDF", path)):
+        seconds, input_tokens = _ask_pdf(client, model, instructions, question, current)
+        print(f"{label:<8} {seconds:>8.2f}s {input_tokens:>13}")
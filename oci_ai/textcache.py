@@ -0,0 +1,315 @@
+"""Cache em disco do texto extraído de PDFs (SQLite).
+
+A chave é o SHA-256 do arquivo + versão do extrator + opções de extração (e
+da limpeza de boilerplate, ver boilerplate.py); o texto de cada página fica
+comprimido (zlib). Antes de calcular o hash, o
+tamanho e o mtime do arquivo são comparados com os da última visita, então um
+acerto não relê o PDF.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from oci_ai import metrics
+from oci_ai.boilerplate import CLEAN_VERSION, clean_pages
+from oci_ai.pdftext import EXTRACTOR_VERSION, extract_pages, iter_pages, join_pages
+from oci_ai.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.expanduser(
+    os.getenv("OCI_AI_TEXT_CACHE_DB", "~/.cache/oci-ai/pdftext.sqlite3")
+)
+# OCI_AI_TEXT_CACHE=0 desliga o cache (sempre extrai).
+CACHE_ENABLED = os.getenv("OCI_AI_TEXT_CACHE", "1") != "0"
+# OCI_AI_STRIP_BOILERPLATE=0 mantém cabeçalhos, rodapés e números de página.
+STRIP_BOILERPLATE = os.getenv("OCI_AI_STRIP_BOILERPLATE", "1") != "0"
+
+CACHE_REQUESTS = metrics.counter(
+    "oci_ai_text_cache_requests_total",
+    "Consultas ao cache de texto extraído (hit, miss)",
+    ("result",),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    options TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    chars INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (key, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+_HASH_CHUNK = 1 << 20
+# Páginas por leitura/escrita no SQLite.
+_BATCH_PAGES = 32
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stored_options(options: dict, clean: bool) -> dict:
+    # Texto limpo e texto bruto do mesmo PDF ficam em entradas separadas.
+    return {**options, "clean": CLEAN_VERSION} if clean else options
+
+
+def cache_key(sha256: str, options: dict) -> str:
+    encoded = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(
+        f"{sha256}\0{EXTRACTOR_VERSION}\0{encoded}".encode()
+    ).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedDocument:
+    sha256: str
+    pages: list[str]
+    seconds: float
+    hit: bool
+
+    @property
+    def text(self) -> str:
+        return join_pages(self.pages)
+
+
+class TextCache:
+    def __init__(self, path: str = DEFAULT_DB_PATH, enabled: bool = CACHE_ENABLED):
+        self._path = path
+        self._enabled = enabled
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self._path != ":memory:":
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def digest(self, file_path: str) -> str:
+        """SHA-256 do arquivo, reaproveitado enquanto tamanho e mtime não mudam."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,))
+                .fetchone()
+            )
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        sha256 = file_sha256(path)
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256),
+            )
+        return sha256
+
+    def document_key(
+        self, file_path: str, *, clean: bool = STRIP_BOILERPLATE, **options
+    ) -> str:
+        return cache_key(self.digest(file_path), stored_options(options, clean))
+
+    def load_artifact(self, key: str) -> bytes | None:
+        """Dados derivados do texto (ex.: índices), guardados junto do cache."""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT data FROM artifacts WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return zlib.decompress(row[0]) if row is not None else None
+
+    def store_artifact(self, key: str, data: bytes) -> None:
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)",
+                    (key, zlib.compress(data), time.time()),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Falha ao gravar %s no cache de texto: %s", key[:12], exc)
+
+    def _document_row(self, key: str) -> tuple[int, float] | None:
+        with self._lock:
+            return (
+                self._connection()
+                .execute("SELECT pages, seconds FROM documents WHERE key = ?", (key,))
+                .fetchone()
+            )
+
+    def _iter_cached(self, key: str) -> Iterator[str]:
+        # Em lotes: não segura a conexão enquanto o consumidor processa a página.
+        page = 0
+        while True:
+            with self._lock:
+                rows = (
+                    self._connection()
+                    .execute(
+                        "SELECT text FROM pages WHERE key = ? AND page >= ?"
+                        " ORDER BY page LIMIT ?",
+                        (key, page, _BATCH_PAGES),
+                    )
+                    .fetchall()
+                )
+            for (blob,) in rows:
+                yield zlib.decompress(blob).decode("utf-8")
+            if len(rows) < _BATCH_PAGES:
+                return
+            page += len(rows)
+
+    def _write_pages(self, rows: list[tuple]) -> None:
+        with self._lock, self._connection() as conn:
+            conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", rows)
+
+    def _spool(
+        self, key: str, sha256: str, options: dict, pages: Iterable[str]
+    ) -> Iterator[str]:
+        """Repassa as páginas extraídas e grava cada lote no disco ao longo do caminho."""
+        started = time.perf_counter()
+        count = chars = 0
+        batch: list[tuple] = []
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            for text in pages:
+                batch.append((key, count, zlib.compress(text.encode("utf-8"))))
+                count += 1
+                chars += len(text)
+                yield text
+                if len(batch) >= _BATCH_PAGES:
+                    self._write_pages(batch)
+                    batch = []
+            if batch:
+                self._write_pages(batch)
+            # Só o registro em documents torna a entrada válida (extração completa).
+            with self._lock, self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        sha256,
+                        EXTRACTOR_VERSION,
+                        json.dumps(options, sort_keys=True),
+                        count,
+                        chars,
+                        time.perf_counter() - started,
+                        time.time(),
+                    ),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Falha ao gravar o cache de texto: %s", exc)
+            yield from pages
+
+    def iter_pages(
+        self,
+        file_path: str,
+        *,
+        workers: int | None = None,
+        clean: bool = STRIP_BOILERPLATE,
+        **options,
+    ) -> Iterator[str]:
+        """Páginas sob demanda: do cache ou extraídas e gravadas conforme passam."""
+        if not self._enabled:
+            pages = iter_pages(file_path, workers, **options)
+            yield from clean_pages(pages) if clean else pages
+            return
+        sha256 = self.digest(file_path)
+        stored = stored_options(options, clean)
+        key = cache_key(sha256, stored)
+        if self._document_row(key) is not None:
+            CACHE_REQUESTS.inc(result="hit")
+            yield from self._iter_cached(key)
+            return
+        CACHE_REQUESTS.inc(result="miss")
+        if clean:
+            # A detecção compara todas as páginas: limpa de uma vez o texto bruto
+            # (que também fica em cache).
+            raw = self.iter_pages(file_path, workers=workers, clean=False, **options)
+            pages = iter(clean_pages(raw))
+        else:
+            pages = iter_pages(file_path, workers, **options)
+        yield from self._spool(key, sha256, stored, pages)
+
+    def document(
+        self,
+        file_path: str,
+        *,
+        workers: int | None = None,
+        clean: bool = STRIP_BOILERPLATE,
+        **options,
+    ) -> CachedDocument:
+        """Páginas do PDF, do cache ou extraídas (e gravadas) na hora."""
+        with span("pdf.text", **{"oci_ai.file.path": file_path}) as current:
+            if not self._enabled:
+                started = time.perf_counter()
+                pages = extract_pages(file_path, workers, **options)
+                if clean:
+                    pages = clean_pages(pages)
+                return CachedDocument("", pages, time.perf_counter() - started, False)
+            sha256 = self.digest(file_path)
+            key = cache_key(sha256, stored_options(options, clean))
+            hit = self._document_row(key) is not None
+            pages = list(
+                self.iter_pages(file_path, workers=workers, clean=clean, **options)
+            )
+            current.set_attribute("oci_ai.cache.hit", hit)
+            row = self._document_row(key)
+            return CachedDocument(sha256, pages, row[1] if row else 0.0, hit)
+
+    def pages(self, file_path: str, *, workers: int | None = None, **options) -> list[str]:
+        return self.document(file_path, workers=workers, **options).pages
+
+    def text(self, file_path: str, *, workers: int | None = None, **options) -> str:
+        return self.document(file_path, workers=workers, **options).text
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+DEFAULT_TEXT_CACHE = TextCache()
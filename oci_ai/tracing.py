@@ -0,0 +1,254 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+import httpx
+
+from oci_ai.payload import (
+    ObservedStream,
+    SSEUsageSniffer,
+    extract_usage,
+    is_event_stream,
+    request_json,
+    request_model,
+    request_size,
+)
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# OCI_AI_TRACING=otlp (OTEL_EXPORTER_OTLP_ENDPOINT, padrão http://localhost:4318)
+# ou OCI_AI_TRACING=json (OCI_AI_TRACE_FILE, padrão traces.jsonl).
+TRACING_MODE = os.getenv("OCI_AI_TRACING", "").lower()
+TRACE_FILE = os.getenv("OCI_AI_TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "oci-ai")
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+_setup_lock = threading.Lock()
+_configured = False
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: object) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def set_status(self, *args: object, **kwargs: object) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonFileSpanExporter:
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = [span.to_json(indent=None) for span in spans]
+        with self._lock, open(self._path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def setup_tracing(mode: str | None = None) -> bool:
+    global _configured
+    mode = (mode if mode is not None else TRACING_MODE).lower()
+    with _setup_lock:
+        if _configured or not mode:
+            return _configured
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            logger.warning(
+                "OCI_AI_TRACING=%s, mas opentelemetry-sdk não está instalado "
+                "(uv sync --extra otel)",
+                mode,
+            )
+            return False
+        if mode == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            exporter = OTLPSpanExporter()
+        elif mode == "json":
+            exporter = JsonFileSpanExporter(TRACE_FILE)
+        else:
+            raise ValueError(f"OCI_AI_TRACING inválido: {mode} (use otlp ou json)")
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME})
+        )
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        otel_trace.set_tracer_provider(provider)
+        _configured = True
+        return True
+
+
+def tracing_enabled() -> bool:
+    if otel_trace is None:
+        return False
+    if TRACING_MODE and not _configured:
+        setup_tracing()
+    return _configured
+
+
+def get_tracer():
+    if otel_trace is None:
+        return None
+    if TRACING_MODE and not _configured:
+        setup_tracing()
+    return otel_trace.get_tracer("oci_ai")
+
+
+def start_span(name: str, attributes: dict | None = None, parent=None):
+    tracer = get_tracer()
+    if tracer is None:
+        return NOOP_SPAN
+    context = otel_trace.set_span_in_context(parent) if parent is not None else None
+    return tracer.start_span(name, context=context, attributes=attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: object) -> Iterator[Any]:
+    tracer = get_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    with tracer.start_as_current_span(
+        name, attributes={k: v for k, v in attributes.items() if v is not None}
+    ) as current:
+        yield current
+
+
+def traced(name: str | None = None, **attributes: object) -> Callable[[F], F]:
+    def decorator(fn: F) -> F:
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: object, **kwargs: object) -> object:
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def usage_attributes(usage: dict | None) -> dict[str, int]:
+    if not usage:
+        return {}
+    attributes = {}
+    prompt = usage.get("input_tokens") or usage.get("prompt_tokens")
+    completion = usage.get("output_tokens") or usage.get("completion_tokens")
+    if prompt is not None:
+        attributes["gen_ai.usage.input_tokens"] = int(prompt)
+    if completion is not None:
+        attributes["gen_ai.usage.output_tokens"] = int(completion)
+    details = usage.get("input_tokens_details") or usage.get("prompt_tokens_details")
+    if isinstance(details, dict) and details.get("cached_tokens") is not None:
+        cached = int(details["cached_tokens"])
+        attributes["gen_ai.usage.cached_tokens"] = cached
+        attributes["oci_ai.prompt_cache.hit"] = cached > 0
+    details = usage.get("output_tokens_details") or usage.get(
+        "completion_tokens_details"
+    )
+    if isinstance(details, dict) and details.get("reasoning_tokens") is not None:
+        attributes["gen_ai.usage.reasoning_tokens"] = int(details["reasoning_tokens"])
+    return attributes
+
+
+class TracingTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport) -> None:
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not tracing_enabled():
+            return self._inner.handle_request(request)
+        data = request_json(request)
+        attributes = {
+            "http.request.method": request.method,
+            "url.full": str(request.url),
+            "server.address": request.url.host,
+            "oci_ai.request.bytes": request_size(request),
+            "oci_ai.stream": bool((data or {}).get("stream")),
+        }
+        model = request_model(request, data)
+        if model:
+            attributes["gen_ai.request.model"] = model
+        current = start_span(f"llm.call {model or request.url.path}", attributes)
+        started = time.monotonic()
+        try:
+            response = self._inner.handle_request(request)
+        except Exception as exc:
+            current.record_exception(exc)
+            current.set_attribute("error.type", type(exc).__name__)
+            current.end()
+            raise
+        current.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            current.set_attribute("error.type", str(response.status_code))
+
+        if not is_event_stream(response):
+            response.read()
+            current.set_attribute("oci_ai.response.bytes", len(response.content))
+            current.set_attribute("oci_ai.latency_s", time.monotonic() - started)
+            try:
+                current.set_attributes(usage_attributes(extract_usage(response.json())))
+            except ValueError:
+                pass
+            current.end()
+            return response
+
+        sniffer = SSEUsageSniffer()
+        received = [0]
+
+        def on_chunk(chunk: bytes) -> None:
+            if not received[0]:
+                current.set_attribute("oci_ai.ttft_s", time.monotonic() - started)
+            received[0] += len(chunk)
+            sniffer.feed(chunk)
+
+        def on_close() -> None:
+            current.set_attribute("oci_ai.response.bytes", received[0])
+            current.set_attribute("oci_ai.latency_s", time.monotonic() - started)
+            current.set_attributes(usage_attributes(sniffer.usage))
+            current.end()
+
+        response.stream = ObservedStream(response.stream, on_chunk, on_close)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
@@ -0,0 +1,348 @@
+"""Índice vetorial (embeddings) dos trechos do texto extraído do PDF.
+
+Os vetores ficam numa matriz float32 crua em disco (`vectors.f32`, linhas já
+normalizadas) aberta com np.memmap, ao lado de um sidecar `ids.json` com a
+forma da matriz e o id, as páginas e o texto de cada trecho. Vários processos abrem o mesmo índice sem
+cópia: as páginas da matriz ficam no page cache do sistema, compartilhadas.
+A busca é o produto da matriz pela consulta (similaridade de cosseno).
+
+Os embeddings vêm do endpoint /embeddings do cliente OCI, em lotes; sem
+modelo configurado (ou com OCI_AI_EMBED_MODEL=hash) usa-se um embedding local
+determinístico por hashing de termos, para testes offline.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import replace
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+from oci_ai.pipeline import chunk_pages
+from oci_ai.retrieval import (
+    PASSAGE_CHARS,
+    PASSAGE_OVERLAP,
+    TOP_K,
+    Passage,
+    passages_prompt,
+    tokenize,
+)
+from oci_ai.textcache import DEFAULT_TEXT_CACHE, TextCache
+
+VECTOR_DIR = os.path.expanduser(
+    os.getenv("OCI_AI_VECTOR_DIR", "~/.cache/oci-ai/vectors")
+)
+# Vazio ou "hash": embedding local determinístico (sem rede).
+EMBED_MODEL = os.getenv("OCI_AI_EMBED_MODEL", "")
+# Textos por chamada ao /embeddings (limite dos modelos Cohere na OCI: 96).
+EMBED_BATCH = int(os.getenv("OCI_AI_EMBED_BATCH", "96"))
+HASH_DIM = int(os.getenv("OCI_AI_EMBED_DIM", "384"))
+# Incrementar quando o formato em disco mudar.
+INDEX_VERSION = 1
+
+_VECTORS = "vectors.f32"
+_IDS = "ids.json"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@lru_cache(maxsize=65536)
+def _bucket(term: str, dim: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(term.encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+class HashEmbedder:
+    """Hashing de termos (com sinal) em `dim` posições: determinístico e offline."""
+
+    def __init__(self, dim: int = HASH_DIM) -> None:
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term, tf in Counter(tokenize(text)).items():
+                column, sign = _bucket(term, self.dim)
+                matrix[row, column] += sign * (1.0 + np.log(tf))
+        return _normalize(matrix)
+
+
+class OCIEmbedder:
+    """Embeddings do modelo `model` via cliente OpenAI (OCI), em lotes de `batch_size`."""
+
+    def __init__(self, client, model: str, batch_size: int = EMBED_BATCH) -> None:
+        self._client = client
+        self.name = model
+        self._batch_size = batch_size
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: list[list[float]] = []
+        for start in range(0, len(texts), self._batch_size):
+            response = self._client.embeddings.create(
+                model=self.name, input=list(texts[start : start + self._batch_size])
+            )
+            data = sorted(response.data, key=lambda item: item.index)
+            rows.extend(item.embedding for item in data)
+        return _normalize(rows)
+
+
+def default_embedder(client=None, model: str = EMBED_MODEL):
+    if client is None or not model or model == "hash":
+        return HashEmbedder()
+    return OCIEmbedder(client, model)
+
+
+def passage_id(passage: Passage) -> str:
+    return hashlib.sha256(passage.text.encode("utf-8")).hexdigest()[:16]
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        path: str,
+        vectors: np.ndarray,
+        passages: list[Passage],
+        ids: list[str],
+        model: str,
+    ) -> None:
+        self.path = path
+        self.vectors = vectors
+        self.passages = passages
+        self.ids = ids
+        self.model = model
+
+    @classmethod
+    def open(cls, path: str) -> "VectorIndex":
+        with open(os.path.join(path, _IDS), encoding="utf-8") as f:
+            meta = json.load(f)
+        # mmap somente leitura: nenhum processo carrega uma cópia própria da matriz.
+        shape = (len(meta["passages"]), meta["dim"])
+        vectors = (
+            np.memmap(os.path.join(path, _VECTORS), dtype=np.float32, mode="r", shape=shape)
+            if shape[0] and shape[1]
+            else np.zeros(shape, dtype=np.float32)
+        )
+        passages = [Passage(text, first, last) for _, first, last, text in meta["passages"]]
+        ids = [item[0] for item in meta["passages"]]
+        return cls(path, vectors, passages, ids, meta["model"])
+
+    @classmethod
+    def write(
+        cls, path: str, batches: Iterable[tuple[list[Passage], np.ndarray]], model: str
+    ) -> "VectorIndex":
+        """Grava o índice lote a lote e publica o diretório de uma vez (rename atômico)."""
+        parent = os.path.dirname(path) or "."
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".building-", dir=parent)
+        try:
+            passages: list[Passage] = []
+            dim = 0
+            with open(os.path.join(tmp, _VECTORS), "wb") as out:
+                for batch, vectors in batches:
+                    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+                    dim = vectors.shape[1]
+                    out.write(vectors.tobytes())
+                    passages.extend(batch)
+            with open(os.path.join(tmp, _IDS), "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "model": model,
+                        "dim": dim,
+                        "passages": [
+                            [passage_id(p), p.first_page, p.last_page, p.text]
+                            for p in passages
+                        ],
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Outro processo publicou o mesmo índice primeiro: usa o dele.
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return cls.open(path)
+
+    @classmethod
+    def build(cls, path: str, passages: Iterable[Passage], embedder) -> "VectorIndex":
+        batches = (
+            (batch, embedder.embed([p.text for p in batch]))
+            for batch in _batched(passages, EMBED_BATCH)
+        )
+        return cls.write(path, batches, embedder.name)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return self.vectors @ np.asarray(query, dtype=np.float32)
+
+    def search(self, query: np.ndarray, k: int = TOP_K) -> list[Passage]:
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [replace(self.passages[i], score=float(scores[i])) for i in top]
+
+
+def index_path(document_key: str, model: str, chars: int, overlap: int) -> str:
+    name = hashlib.sha256(
+        f"v{INDEX_VERSION}\0{document_key}\0{model}\0{chars}\0{overlap}".encode()
+    ).hexdigest()[:32]
+    return os.path.join(VECTOR_DIR, name)
+
+
+@lru_cache(maxsize=16)
+def open_index(path: str) -> VectorIndex:
+    return VectorIndex.open(path)
+
+
+def load_index(
+    file_path: str,
+    embedder=None,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+    chars: int = PASSAGE_CHARS,
+    overlap: int = PASSAGE_OVERLAP,
+) -> VectorIndex:
+    """Índice vetorial do PDF: aberto do disco ou construído (e gravado) agora."""
+    embedder = embedder or default_embedder()
+    path = index_path(cache.document_key(file_path), embedder.name, chars, overlap)
+    if not os.path.isdir(path):
+        chunks = chunk_pages(cache.iter_pages(file_path), max_chars=chars, overlap=overlap)
+        VectorIndex.build(
+            path, (Passage(c.text, c.first_page, c.last_page) for c in chunks), embedder
+        )
+    return open_index(path)
+
+
+def vector_prompt(
+    file_path: str,
+    question: str,
+    embedder=None,
+    k: int = TOP_K,
+    cache: TextCache = DEFAULT_TEXT_CACHE,
+) -> str:
+    embedder = embedder or default_embedder()
+    index = load_index(file_path, embedder, cache)
+    return passages_prompt(index.search(embedder.embed([question])[0], k), question)
+
+
+def _memory_mb() -> tuple[float, float]:
+    # RssAnon: memória privada do processo; RssFile: páginas de arquivos (compartilháveis).
+    values = {}
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                values[key] = int(rest.split()[0]) / 1024
+    return values.get("RssAnon", 0.0), values.get("RssFile", 0.0)
+
+
+def _search_worker(path: str, mmap: bool, queries: int, queue) -> None:
+    index = VectorIndex.open(path)
+    before_anon, before_file = _memory_mb()
+    started = time.perf_counter()
+    vectors = index.vectors
+    if not mmap:
+        vectors = np.fromfile(os.path.join(path, _VECTORS), dtype=np.float32)
+        vectors = vectors.reshape(index.vectors.shape)
+    load = time.perf_counter() - started
+    rng = np.random.default_rng(os.getpid())
+    queries_matrix = _normalize(rng.standard_normal((queries, vectors.shape[1])))
+    started = time.perf_counter()
+    for query in queries_matrix:
+        scores = vectors @ query
+        np.argpartition(-scores, TOP_K)[:TOP_K]
+    search = (time.perf_counter() - started) / queries
+    anon, file = _memory_mb()
+    queue.put((load, search, anon - before_anon, file - before_file))
+
+
+def benchmark(
+    rows: int = 100_000,
+    dim: int = 384,
+    workers: tuple[int, ...] = (1, 4),
+    queries: int = 50,
+    file_path: str | None = None,
+    question: str | None = None,
+) -> None:
+    """Memória por processo (mmap vs. cópia) e latência de busca num índice sintético."""
+    import multiprocessing
+
+    if file_path and question:
+        embedder = default_embedder()
+        started = time.perf_counter()
+        index = load_index(file_path, embedder)
+        load = time.perf_counter() - started
+        passages = index.search(embedder.embed([question])[0])
+        print(
+            f"{os.path.basename(file_path)}: {len(index.passages)} trechos "
+            f"({embedder.name}), carga {load * 1000:.1f}ms"
+        )
+        labels = ", ".join(f"{p.label} ({p.score:.2f})" for p in passages)
+        print(f"Trechos: {labels}\n")
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        rng = np.random.default_rng(0)
+
+        def batches():
+            for start in range(0, rows, 10_000):
+                count = min(10_000, rows - start)
+                passages = [Passage("", start + i, start + i) for i in range(count)]
+                yield passages, _normalize(rng.standard_normal((count, dim)))
+
+        started = time.perf_counter()
+        VectorIndex.write(path, batches(), "sintético")
+        size = os.path.getsize(os.path.join(path, _VECTORS)) / 2**20
+        print(
+            f"Índice sintético: {rows} x {dim} float32 = {size:.1f}MB "
+            f"(gravado em {time.perf_counter() - started:.2f}s)"
+        )
+        print(
+            f"{'modo':<6} {'processos':>9} {'carga':>9} {'busca':>9} "
+            f"{'privada/proc':>13} {'arquivo/proc':>13}"
+        )
+        for mmap in (True, False):
+            for count in workers:
+                queue = context.Queue()
+                processes = [
+                    context.Process(
+                        target=_search_worker, args=(path, mmap, queries, queue)
+                    )
+                    for _ in range(count)
+                ]
+                for process in processes:
+                    process.start()
+                results = [queue.get() for _ in processes]
+                for process in processes:
+                    process.join()
+                load, search, anon, file = (sum(col) / count for col in zip(*results))
+                print(
+                    f"{'mmap' if mmap else 'cópia':<6} {count:>9} {load * 1000:>7.1f}ms "
+                    f"{search * 1000:>7.2f}ms {anon:>11.1f}MB {file:>11.1f}MB"
+                )
@@ -0,0 +1,246 @@
+import logging
+import os
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpcore
+import httpx
+
+from oci_ai import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    # Interno do httpcore (faixa fixada no pyproject.toml): o stream síncrono
+    # sobre o socket, estendido para retomar a sessão TLS.
+    from httpcore._backends.sync import SyncStream
+
+    TLS_RESUMPTION = True
+except ImportError:
+    SyncStream = httpcore.NetworkStream
+    TLS_RESUMPTION = False
+    logger.warning(
+        "httpcore %s sem SyncStream; conexões TLS sem retomada de sessão",
+        httpcore.__version__,
+    )
+
+# Conexões abertas em segundo plano na construção do cliente (0 = sem warm-up).
+WARMUP_CONNECTIONS = int(os.getenv("OCI_AI_WARMUP_CONNECTIONS", "0"))
+
+TLS_HANDSHAKES = metrics.counter(
+    "oci_ai_tls_handshakes_total",
+    "Handshakes TLS por host (resumed=1 quando a sessão foi reaproveitada)",
+    ("host", "resumed"),
+)
+
+# Um único SSLContext no processo: sessões TLS só podem ser retomadas no mesmo
+# contexto, então todos os clientes (e regiões) compartilham este.
+SSL_CONTEXT = httpx.create_ssl_context()
+
+
+class TLSSessionCache:
+    def __init__(self) -> None:
+        self._sessions: dict[str, ssl.SSLSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> ssl.SSLSession | None:
+        with self._lock:
+            return self._sessions.get(host)
+
+    def put(self, host: str, session: ssl.SSLSession | None) -> None:
+        if session is None:
+            return
+        with self._lock:
+            self._sessions[host] = session
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+SESSION_CACHE = TLSSessionCache()
+
+
+class ResumableStream(SyncStream):
+    def __init__(self, sock, cache: TLSSessionCache, host: str | None = None) -> None:
+        super().__init__(sock)
+        self._cache = cache
+        self._host = host
+        self._saved = False
+
+    def start_tls(
+        self,
+        ssl_context: ssl.SSLContext,
+        server_hostname: str | None = None,
+        timeout: float | None = None,
+    ) -> httpcore.NetworkStream:
+        if isinstance(self._sock, ssl.SSLSocket) or server_hostname is None:
+            return super().start_tls(ssl_context, server_hostname, timeout)
+        session = self._cache.get(server_hostname)
+        try:
+            self._sock.settimeout(timeout)
+            try:
+                sock = ssl_context.wrap_socket(
+                    self._sock, server_hostname=server_hostname, session=session
+                )
+            except ValueError:
+                # Sessão de outro SSLContext: handshake completo.
+                sock = ssl_context.wrap_socket(
+                    self._sock, server_hostname=server_hostname
+                )
+        except TimeoutError as exc:
+            self.close()
+            raise httpcore.ConnectTimeout(str(exc)) from exc
+        except OSError as exc:
+            self.close()
+            raise httpcore.ConnectError(str(exc)) from exc
+        TLS_HANDSHAKES.inc(host=server_hostname, resumed=int(sock.session_reused))
+        stream = ResumableStream(sock, self._cache, server_hostname)
+        stream._remember()
+        return stream
+
+    def _remember(self) -> None:
+        if self._host is None or not isinstance(self._sock, ssl.SSLSocket):
+            return
+        session = self._sock.session
+        self._cache.put(self._host, session)
+        self._saved = session is not None and session.has_ticket
+
+    def read(self, max_bytes: int, timeout: float | None = None) -> bytes:
+        data = super().read(max_bytes, timeout)
+        if not self._saved:
+            # No TLS 1.3 o ticket de sessão só chega depois do handshake.
+            self._remember()
+            self._saved = True
+        return data
+
+
+class SessionReuseBackend(httpcore.NetworkBackend):
+    def __init__(
+        self,
+        inner: httpcore.NetworkBackend | None = None,
+        cache: TLSSessionCache = SESSION_CACHE,
+    ) -> None:
+        self._inner = inner or httpcore.SyncBackend()
+        self._cache = cache
+
+    def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.NetworkStream:
+        stream = self._inner.connect_tcp(
+            host, port, timeout, local_address, socket_options
+        )
+        sock = stream.get_extra_info("socket")
+        if not TLS_RESUMPTION or sock is None:
+            return stream
+        return ResumableStream(sock, self._cache)
+
+    def connect_unix_socket(self, path: str, timeout=None, socket_options=None):
+        return self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    def sleep(self, seconds: float) -> None:
+        self._inner.sleep(seconds)
+
+
+def preload_auth(auth: httpx.Auth | None, url: str) -> None:
+    """Roda o fluxo de auth numa requisição descartável (carrega config e chave)."""
+    if auth is None:
+        return
+    flow = auth.sync_auth_flow(httpx.Request("GET", url))
+    try:
+        next(flow)
+    except StopIteration:
+        pass
+    finally:
+        flow.close()
+
+
+def _open_connection(transport: httpx.BaseTransport, url: str) -> None:
+    # Direto no transporte de rede: sem auth, retry, cota nem ledger.
+    response = transport.handle_request(httpx.Request("HEAD", url))
+    # Ler até o fim devolve a conexão ao pool; fechar sem ler a descarta.
+    response.read()
+    response.close()
+
+
+def warm_up(
+    transport: httpx.BaseTransport,
+    url: str,
+    *,
+    auth: httpx.Auth | None = None,
+    connections: int = WARMUP_CONNECTIONS,
+    wait: bool = False,
+) -> threading.Thread:
+    def _run() -> None:
+        started = time.perf_counter()
+        try:
+            preload_auth(auth, url)
+        except Exception as exc:
+            logger.debug("Warm-up: falha ao pré-carregar a auth: %s", exc)
+        opened = 0
+        if connections > 0:
+            with ThreadPoolExecutor(max_workers=connections) as pool:
+                futures = [
+                    pool.submit(_open_connection, transport, url)
+                    for _ in range(connections)
+                ]
+            for future in futures:
+                if future.exception() is None:
+                    opened += 1
+                else:
+                    logger.debug("Warm-up: conexão falhou: %s", future.exception())
+        logger.info(
+            "Warm-up %s: %d/%d conexões em %.0fms",
+            httpx.URL(url).host,
+            opened,
+            connections,
+            (time.perf_counter() - started) * 1000,
+        )
+
+    thread = threading.Thread(target=_run, name="oci-ai-warmup", daemon=True)
+    thread.start()
+    if wait:
+        thread.join()
+    return thread
+
+
+def benchmark(url: str, rounds: int = 5, connections: int = 2) -> None:
+    """Latência da primeira requisição com e sem warm-up (cliente novo a cada rodada)."""
+    from oci_ai.client import build_http_client
+
+    results: dict[str, list[float]] = {"sem warm-up": [], "com warm-up": []}
+    for _ in range(rounds):
+        for label in results:
+            # Sem warm-up equivale a um processo novo: nenhuma sessão TLS guardada.
+            SESSION_CACHE.clear()
+            warm = label == "com warm-up"
+            client = build_http_client(
+                rate_limiter=None,
+                resilience=None,
+                router=None,
+                ledger=None,
+                warmup_url=url,
+                warmup_connections=connections if warm else 0,
+                warmup_wait=True,
+            )
+            try:
+                started = time.perf_counter()
+                client.get(url)
+                results[label].append(time.perf_counter() - started)
+            finally:
+                client.close()
+    for label, values in results.items():
+        values.sort()
+        median = values[len(values) // 2]
+        print(
+            f"{label:<12} primeira requisição: mediana {median * 1000:.0f}ms "
+            f"min {values[0] * 1000:.0f}ms max {values[-1] * 1000:.0f}ms "
+            f"({rounds} rodadas)"
+        )
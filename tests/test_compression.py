@@ -0,0 +1,85 @@
+"""Corpos com input_file saem comprimidos, com a assinatura sobre o corpo final."""
+
+import base64
+import gzip
+import hashlib
+import http.server
+import threading
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from oci_ai.client import build_http_client
+from oci_ai.compression import CompressionPolicy
+from oci_ai.multimodal import input_file
+from oci_ai.signing import RequestSigner
+
+
+class _SignerAuth(httpx.Auth):
+    requires_request_body = True
+
+    def __init__(self, streams: bool) -> None:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._signer = RequestSigner("ocid1.tenancy.oc1..t/ocid1.user.oc1..u/aa:bb", key)
+        self.streams_inline_files = streams
+
+    def auth_flow(self, request: httpx.Request):
+        self._signer.sign(request)
+        yield request
+
+
+@pytest.fixture
+def server():
+    received = []
+
+    class _Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["content-length"]))
+            received.append(({k.lower(): v for k, v in self.headers.items()}, body))
+            self.send_response(200)
+            self.send_header("content-length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args) -> None:
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1/responses", received
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("auth", [None, "streams", "expands"])
+def test_multimodal_request_is_compressed(server, tmp_path, auth):
+    url, received = server
+    path = tmp_path / "doc.pdf"
+    # Repetitivo o bastante para o gzip reduzir também o base64.
+    data = b"%PDF-1.7\n" + b"conteudo repetido " * 20000
+    path.write_bytes(data)
+    client = build_http_client(
+        auth=None if auth is None else _SignerAuth(streams=auth == "streams"),
+        rate_limiter=None,
+        resilience=None,
+        router=None,
+        ledger=None,
+        compression=CompressionPolicy({"*": "gzip"}, min_bytes=1024),
+    )
+    try:
+        content = [input_file(str(path))]
+        payload = {"model": "openai.gpt-5", "input": [{"content": content}]}
+        assert client.post(url, json=payload).status_code == 200
+    finally:
+        client.close()
+
+    headers, body = received[-1]
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(body) < len(data)
+    expanded = gzip.decompress(body)
+    assert base64.b64encode(data) in expanded
+    assert b"oci-ai-inline:" not in expanded
+    if auth is not None:
+        digest = base64.b64encode(hashlib.sha256(body).digest()).decode("ascii")
+        assert headers["x-content-sha256"] == digest
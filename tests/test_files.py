@@ -0,0 +1,100 @@
+"""`file_id` apagado no servidor: o registro esquece o ID e reenvia uma vez."""
+
+import httpx
+import openai
+import pytest
+
+from oci_ai.files import FileRegistry
+from oci_ai.textcache import TextCache
+
+
+class _Files:
+    def __init__(self) -> None:
+        self.uploads = 0
+
+    def create(self, file, purpose):
+        self.uploads += 1
+        return openai.types.FileObject(
+            id=f"file-{self.uploads}",
+            object="file",
+            bytes=0,
+            created_at=0,
+            filename=file[0],
+            purpose=purpose,
+            status="processed",
+        )
+
+
+class _Client:
+    base_url = "http://files.test/v1"
+
+    def __init__(self) -> None:
+        self.files = _Files()
+
+
+def _status_error(status: int, message: str) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://files.test/v1/responses")
+    response = httpx.Response(status, request=request)
+    return openai.APIStatusError(message, response=response, body=None)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    cache = TextCache(str(tmp_path / "text.sqlite3"))
+    registry = FileRegistry(str(tmp_path / "files.sqlite3"), cache=cache)
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.7\n")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "status, message", [(404, "Not found"), (400, "Invalid file_id 'file-1'")]
+)
+def test_unknown_file_id_is_forgotten_and_retried(registry, pdf, status, message):
+    client = _Client()
+    seen = []
+
+    def request(part):
+        seen.append(part)
+        if len(seen) == 1:
+            raise _status_error(status, message)
+        return "ok"
+
+    assert registry.with_file(client, pdf, request) == "ok"
+    assert [part["file_id"] for part in seen] == ["file-1", "file-2"]
+    assert client.files.uploads == 2
+    # O ID novo fica no registro; o próximo pedido não reenvia.
+    assert registry.input_file(client, pdf) == {"type": "input_file", "file_id": "file-2"}
+
+
+def test_other_errors_are_not_retried(registry, pdf):
+    client = _Client()
+    calls = []
+
+    def request(part):
+        calls.append(part)
+        raise _status_error(400, "Invalid reasoning effort")
+
+    with pytest.raises(openai.APIStatusError):
+        registry.with_file(client, pdf, request)
+    assert len(calls) == 1
+    assert registry.input_file(client, pdf)["file_id"] == "file-1"
+
+
+def test_retries_only_once(registry, pdf):
+    client = _Client()
+    calls = []
+
+    def request(part):
+        calls.append(part)
+        raise _status_error(404, "Not found")
+
+    with pytest.raises(openai.APIStatusError):
+        registry.with_file(client, pdf, request)
+    assert len(calls) == 2
@@ -0,0 +1,66 @@
+"""Internos do httpx/httpcore de que o pacote depende.
+
+Falha aqui = a versão instalada mudou o que client.py, nettrace.py ou warmup.py
+usam; o pacote cai no caminho simples (ver os fallbacks), mas a faixa do
+pyproject.toml precisa ser revista.
+"""
+
+import httpcore
+import httpx
+
+from oci_ai import client
+
+
+def test_httpx_environment_proxies(monkeypatch):
+    from httpx._utils import URLPattern, get_environment_proxies
+
+    assert client.get_environment_proxies is get_environment_proxies
+    assert client.URLPattern is URLPattern
+    monkeypatch.setenv("HTTPS_PROXY", "proxy:8080")
+    monkeypatch.setenv("NO_PROXY", "localhost,.oraclecloud.com,10.0.0.1")
+    proxies = get_environment_proxies()
+    assert proxies["https://"] == "http://proxy:8080"
+    assert URLPattern("all://*.oraclecloud.com").matches(
+        httpx.URL("https://inference.generativeai.sa-saopaulo-1.oci.oraclecloud.com")
+    )
+    # O fallback pela stdlib monta as mesmas chaves.
+    monkeypatch.setattr(client, "get_environment_proxies", None)
+    assert client._environment_proxies() == proxies
+
+
+def test_httpcore_pool_network_backend():
+    from oci_ai.nettrace import TimedDNSBackend, install_network_backend
+
+    backend = TimedDNSBackend()
+    # Pool direto e pool de proxy (cada mount do cliente tem o seu).
+    for proxy in (None, httpx.Proxy("http://proxy:3128")):
+        transport = httpx.HTTPTransport(proxy=proxy)
+        assert type(transport._pool._network_backend) is httpcore.SyncBackend
+        assert install_network_backend(transport, backend)
+        assert transport._pool._network_backend is backend
+    # Sem o interno: transporte intocado, com o backend padrão.
+    assert not install_network_backend(httpx.MockTransport(lambda r: None), backend)
+
+
+def test_httpcore_sync_stream():
+    import socket
+
+    from httpcore._backends.sync import SyncStream
+
+    from oci_ai.warmup import TLS_RESUMPTION, ResumableStream, SessionReuseBackend
+
+    assert TLS_RESUMPTION
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        port = server.getsockname()[1]
+        stream = SessionReuseBackend().connect_tcp("127.0.0.1", port, timeout=5)
+        peer, _ = server.accept()
+        with peer:
+            assert isinstance(stream, ResumableStream)
+            assert isinstance(stream, SyncStream)
+            # ResumableStream.start_tls embrulha o socket de SyncStream._sock.
+            assert isinstance(stream._sock, socket.socket)
+            stream.write(b"ping", timeout=5)
+            assert peer.recv(4) == b"ping"
+            peer.sendall(b"pong")
+            assert stream.read(4, timeout=5) == b"pong"
+        stream.close()
@@ -0,0 +1,49 @@
+"""Cada nível da redução junta parciais, mesmo quando elas são grandes."""
+
+from oci_ai.mapreduce import MapReduce, Partial, reduce_groups
+from oci_ai.textcache import TextCache
+
+
+def _partials(count: int, tokens: int) -> list[Partial]:
+    return [Partial(f"parcial {i}", i, i, tokens) for i in range(count)]
+
+
+def test_reduce_groups_merge_oversized_partials():
+    groups = reduce_groups(_partials(5, 4000), fanin=8, max_tokens=6000)
+    assert [len(g) for g in groups] == [2, 2, 1]
+
+
+def test_reduce_groups_respect_fanin_and_tokens():
+    groups = reduce_groups(_partials(10, 100), fanin=4, max_tokens=250)
+    assert [len(g) for g in groups] == [2, 2, 2, 2, 2]
+    groups = reduce_groups(_partials(10, 10), fanin=4, max_tokens=6000)
+    assert [len(g) for g in groups] == [4, 4, 2]
+
+
+class _LongAnswers:
+    """Cliente falso: toda resposta é tão longa quanto o próprio chunk."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.responses = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        text = "palavra " * 3000
+        return iter([{"type": "response.output_text.delta", "delta": text}])
+
+
+def test_run_terminates_with_long_partials(tmp_path):
+    client = _LongAnswers()
+    mapreduce = MapReduce(
+        client,
+        "modelo",
+        cache=TextCache(str(tmp_path / "cache.sqlite3")),
+        use_cache=False,
+        max_tokens=2000,
+    )
+    pages = [f"página {i} " + "texto " * 1500 for i in range(5)]
+    result = mapreduce.run(pages, "Resuma o documento.")
+    # Cada nível pelo menos reduz à metade: map + ceil(log2(chunks)) níveis.
+    assert result.levels <= result.chunks.bit_length()
+    assert client.calls == result.calls < 2 * result.chunks
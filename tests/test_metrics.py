@@ -0,0 +1,21 @@
+"""Servidor de métricas do OCI_AI_METRICS_PORT."""
+
+import socket
+
+from oci_ai import metrics
+
+
+def test_serve_metrics_from_env_binds_once(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setenv("OCI_AI_METRICS_PORT", str(port))
+    monkeypatch.setattr(metrics, "_ENV_SERVER", None)
+    server = metrics.serve_metrics_from_env()
+    try:
+        # call_classif.main() chama de novo depois da CLI: não pode dar "address in use".
+        assert metrics.serve_metrics_from_env() is server
+        assert server.server_address == ("127.0.0.1", port)
+    finally:
+        server.shutdown()
+        server.server_close()
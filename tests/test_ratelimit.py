@@ -0,0 +1,25 @@
+"""Limitador padrão em todo cliente, sem custo para modelos sem rpm/tpm."""
+
+import inspect
+
+from oci_ai.client import build_http_client, build_openai_client
+from oci_ai.ratelimit import DEFAULT_RATE_LIMITER, RateLimiter
+
+
+def test_clients_use_default_rate_limiter():
+    for build in (build_http_client, build_openai_client):
+        default = inspect.signature(build).parameters["rate_limiter"].default
+        assert default is DEFAULT_RATE_LIMITER
+
+
+def test_unlimited_model_does_not_open_database(tmp_path):
+    path = tmp_path / "sub" / "ratelimit.sqlite3"
+    limiter = RateLimiter(path=str(path))
+    limiter.acquire("modelo-sem-limite", 1000)
+    assert not path.parent.exists()
+    limiter.acquire("limitado", 10)
+    assert not path.parent.exists()
+    limited = RateLimiter({"limitado": (60, None)}, path=str(path))
+    reservation = limited.acquire("limitado", 10)
+    assert reservation.model == "limitado"
+    assert path.exists()
@@ -0,0 +1,49 @@
+"""Retry-After e circuit breaker."""
+
+import email.utils
+import time
+
+import httpx
+
+from oci_ai.resilience import CLOSED, OPEN, Resilience, RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Headers({"retry-after": "3"})) == 3.0
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "250"})) == 0.25
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(httpx.Headers({"retry-after": date})) <= 30
+    # Malformado: sem exceção, o chamador usa o backoff.
+    assert parse_retry_after(httpx.Headers({"retry-after": "soon"})) is None
+
+
+def _calls(resilience: Resilience, status: int, count: int) -> None:
+    for _ in range(count):
+        resilience.call(
+            lambda: httpx.Response(status, headers={"retry-after": "soon"}),
+            model="m",
+            endpoint="e",
+        )
+
+
+def test_throttling_does_not_open_the_circuit():
+    resilience = Resilience(RetryPolicy(max_attempts=1), failure_threshold=3)
+    _calls(resilience, 429, 10)
+    assert resilience.breaker("m", "e").state == CLOSED
+
+
+def test_server_errors_open_the_circuit():
+    resilience = Resilience(RetryPolicy(max_attempts=1), failure_threshold=3)
+    _calls(resilience, 503, 3)
+    assert resilience.breaker("m", "e").state == OPEN
+
+
+def test_throttled_probe_frees_half_open_slot():
+    resilience = Resilience(
+        RetryPolicy(max_attempts=1), failure_threshold=1, reset_timeout=0.0
+    )
+    _calls(resilience, 503, 1)
+    # Meio-aberto: o 429 da sondagem não pode prender o circuito sem vagas.
+    _calls(resilience, 429, 3)
+    _calls(resilience, 200, 1)
+    assert resilience.breaker("m", "e").state == CLOSED
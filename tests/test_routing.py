@@ -0,0 +1,21 @@
+"""Escolha do modelo dentro de um tier."""
+
+from oci_ai.routing import ModelRouter
+
+
+def _router() -> ModelRouter:
+    return ModelRouter({"fast": ["a", "b"]}, resilience=None, exploration=0.0)
+
+
+def test_model_without_history_goes_first():
+    router = _router()
+    router.record("a", error=False, ttft=0.5)
+    assert router.choose("fast") == "b"
+
+
+def test_model_with_only_errors_loses_to_healthy_model():
+    router = _router()
+    router.record("b", error=False, ttft=2.0, output_tokens=100, generation_seconds=1.0)
+    router.record("a", error=True)
+    assert router.error_rate("a") < 0.5
+    assert [router.choose("fast") for _ in range(5)] == ["b"] * 5
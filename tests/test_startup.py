@@ -0,0 +1,16 @@
+"""`python -m oci_ai --help` dentro do orçamento de inicialização."""
+
+from oci_ai.cli import STARTUP_BUDGET_MS, heavy_imports, help_timings
+
+
+def test_help_within_startup_budget():
+    # Melhor de três: ruído da máquina só aumenta o tempo.
+    best = min(help_timings(3))
+    assert best <= STARTUP_BUDGET_MS, (
+        f"--help levou {best:.0f}ms (orçamento {STARTUP_BUDGET_MS:.0f}ms)"
+    )
+
+
+def test_help_imports_no_heavy_module():
+    loaded = heavy_imports()
+    assert not loaded, f"módulos pesados importados para o --help: {loaded}"